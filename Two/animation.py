@@ -0,0 +1,75 @@
+"""
+预计算的动画帧表
+
+所有帧（包括镜像帧）及其碰撞遮罩在加载时一次性切好、缩放好，运行时只根据累计时间查表，
+每帧不会创建新的 Surface。
+"""
+import pygame
+
+from assets import cache
+
+
+class Animation:
+    """
+    一组按时间播放的帧
+    :param frames: 朝右的帧序列
+    :param duration: 播放一轮的时长（秒）
+    :param mirrored: 朝左的帧序列，为 None 时在这里一次性翻转生成
+    :param loop: 是否循环；不循环时停在最后一帧
+    """
+
+    def __init__(self, frames, duration, mirrored=None, loop=True):
+        self.frames = tuple(frames)
+        if mirrored is None:
+            mirrored = [pygame.transform.flip(frame, True, False) for frame in self.frames]
+        self.mirrored = tuple(mirrored)
+        self.masks = tuple(cache.mask(frame) for frame in self.frames)
+        self.mirrored_masks = tuple(cache.mask(frame) for frame in self.mirrored)
+        self.count = len(self.frames)
+        self.frame_time = duration / self.count
+        self.loop = loop
+
+    def index(self, t):
+        """播放了 t 秒时的帧序号"""
+        i = int(t / self.frame_time)
+        if self.loop:
+            return i % self.count
+        return i if i < self.count else self.count - 1
+
+    def frame(self, t, facing_right=True):
+        table = self.frames if facing_right else self.mirrored
+        return table[self.index(t)]
+
+    def mask(self, t, facing_right=True):
+        table = self.masks if facing_right else self.mirrored_masks
+        return table[self.index(t)]
+
+
+class Animator:
+    """
+    带命名状态（如 run/jump/slide）的动画播放器
+    :param animations: 状态名 -> Animation
+    :param state: 初始状态
+    """
+
+    def __init__(self, animations, state):
+        self.animations = animations
+        self.state = state
+        self.current = animations[state]
+        self.time = 0.0
+
+    def set_state(self, state):
+        """切换状态，新状态从第一帧开始播放"""
+        if state != self.state:
+            self.state = state
+            self.current = self.animations[state]
+            self.time = 0.0
+
+    def update(self, dt):
+        self.time += dt
+
+    def image(self, facing_right=True):
+        return self.current.frame(self.time, facing_right)
+
+    def mask(self, facing_right=True):
+        return self.current.mask(self.time, facing_right)
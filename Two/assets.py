@@ -0,0 +1,164 @@
+"""
+进程内共享的图像资源缓存
+
+每张图片只从磁盘解码一次；按 (路径, 目标尺寸, 标志) 缓存缩放和 convert 后的结果，
+游戏循环里再次请求同一资源时不会访问文件系统。两个游戏共用同一个缓存实例 `cache`。
+逐像素碰撞用的遮罩也与图像一起缓存，每张图像只计算一次。
+"""
+import os
+import weakref
+
+import pygame
+
+
+class AssetCache:
+    def __init__(self):
+        self.sources = {}  # 路径 -> 解码后的原图（加载失败为 None）
+        self.images = {}  # (路径, 尺寸, alpha, 水平翻转) -> 处理后的图像
+        self.sheets = {}  # (路径, 帧尺寸, 帧数, 尺寸, 水平翻转) -> 切好的帧
+        self.solids = {}  # (尺寸, 颜色) -> 纯色图像
+        self.masks = weakref.WeakKeyDictionary()  # 图像 -> 碰撞遮罩，图像被回收时一起释放
+        self.fonts = {}  # (路径, 字号) -> 字体
+        self.hits = 0
+        self.misses = 0
+
+    def _source(self, path):
+        if path not in self.sources:
+            try:
+                self.sources[path] = pygame.image.load(path)
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"加载图像 {path} 时出错: {e}")
+                self.sources[path] = None
+        return self.sources[path]
+
+    def image(self, path, size=None, alpha=True, flip_x=False):
+        """
+        获取图像
+        :param path: 图像文件路径
+        :param size: 目标尺寸 (width, height)，为 None 时保持原尺寸
+        :param alpha: 是否保留透明通道（convert_alpha 或 convert）
+        :param flip_x: 是否水平翻转
+        :return: 处理后的图像，文件不存在或无法解码时返回 None
+        """
+        path = os.path.normpath(path)
+        key = (path, tuple(size) if size else None, alpha, flip_x)
+        image = self.images.get(key)
+        if image is not None or key in self.images:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self._source(path)
+        if image is not None:
+            if size and tuple(size) != image.get_size():
+                image = pygame.transform.scale(image, size)
+            if flip_x:
+                image = pygame.transform.flip(image, True, False)
+            # 没有显示窗口（无界面模式）时无法 convert，保持原格式
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha() if alpha else image.convert()
+        self.images[key] = image
+        return image
+
+    def frames(self, path, frame_size, count=None, size=None, flip_x=False):
+        """
+        把横向排列的精灵图切成帧，切片、缩放和翻转只在第一次请求时进行
+        :param frame_size: 精灵图中每帧的尺寸 (width, height)
+        :param count: 帧数，为 None 时按图片宽度计算；超出图片宽度的部分会被忽略
+        :param size: 每帧的目标尺寸，为 None 时保持原尺寸
+        :return: 帧组成的元组，加载失败时返回 None
+        """
+        path = os.path.normpath(path)
+        key = (path, tuple(frame_size), count, tuple(size) if size else None, flip_x)
+        frames = self.sheets.get(key)
+        if frames is not None or key in self.sheets:
+            self.hits += 1
+            return frames
+
+        self.misses += 1
+        sheet = self.image(path)
+        if sheet is not None:
+            width, height = frame_size[0], min(frame_size[1], sheet.get_height())
+            available = sheet.get_width() // width
+            count = max(1, min(count or available, available))
+            frames = []
+            for i in range(count):
+                frame = sheet.subsurface((i * width, 0, width, height)).copy()
+                if size and tuple(size) != frame.get_size():
+                    frame = pygame.transform.scale(frame, size)
+                if flip_x:
+                    frame = pygame.transform.flip(frame, True, False)
+                frames.append(frame)
+            frames = tuple(frames)
+        self.sheets[key] = frames
+        return frames
+
+    def solid(self, size, color):
+        """
+        纯色图像（障碍物、金币和缺图时的占位图），相同尺寸和颜色的精灵共用一张
+        :param size: 尺寸 (width, height)
+        :param color: 填充颜色
+        """
+        key = (tuple(size), tuple(color))
+        image = self.solids.get(key)
+        if image is None:
+            image = self.solids[key] = pygame.Surface(size)
+            image.fill(color)
+        return image
+
+    def mask(self, image):
+        """图像不透明部分的碰撞遮罩，每张图像只计算一次"""
+        mask = self.masks.get(image)
+        if mask is None:
+            mask = self.masks[image] = pygame.mask.from_surface(image)
+        return mask
+
+    def font(self, path, size):
+        """
+        字体，每个 (路径, 字号) 只创建一次
+        :param path: 字体文件路径，为 None 时使用 pygame 默认字体
+        """
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.Font(path, size)
+        return font
+
+    def source_size(self, path):
+        """原图尺寸，无法加载时返回 None"""
+        image = self._source(os.path.normpath(path))
+        return image.get_size() if image is not None else None
+
+    def preload(self, manifest):
+        """
+        预加载资源清单
+        :param manifest: 由路径或 (路径, 尺寸) 组成的列表
+        :return: 成功加载的数量
+        """
+        loaded = 0
+        for entry in manifest:
+            path, size = (entry, None) if isinstance(entry, str) else entry
+            if self.image(path, size) is not None:
+                loaded += 1
+        return loaded
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self.images) + len(self.sheets) + len(self.solids),
+            'sources': len(self.sources),
+        }
+
+    def clear(self):
+        self.sources.clear()
+        self.images.clear()
+        self.sheets.clear()
+        self.solids.clear()
+        self.masks.clear()
+        self.fonts.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+cache = AssetCache()
@@ -0,0 +1,64 @@
+"""
+音频环形缓冲区
+
+单生产者/单消费者：采集线程只负责写入并增加累计写入数 written，
+读取方按累计位置读取，不需要加锁。位置使用从开始采集起的累计样本数，
+因此读取方可以记住“上次读到哪里”，下次只读取新到达的部分。
+"""
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    :param capacity: 能保存的样本数
+    :param dtype: 样本类型
+    """
+
+    def __init__(self, capacity, dtype=np.float32):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.written = 0  # 累计写入的样本数，只由写入方修改
+
+    def write(self, samples):
+        """写入样本（只能由一个线程调用）"""
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            self.written += n - self.capacity
+            n = self.capacity
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        if first < n:
+            self.data[:n - first] = samples[first:]
+        # 数据写完后再发布新的位置，读取方看到的 written 之前的数据都已就绪
+        self.written += n
+
+    def oldest(self):
+        """仍然保存在缓冲区中的最早位置"""
+        return max(0, self.written - self.capacity)
+
+    def read(self, start, end=None, out=None):
+        """
+        读取累计位置 [start, end) 的样本，已被覆盖的部分会被跳过
+        :param out: 可选的输出数组，长度不小于要读取的样本数，用于避免分配
+        :return: 读取到的样本（out 的切片或新数组）
+        """
+        written = self.written
+        if end is None or end > written:
+            end = written
+        start = max(start, self.oldest())  # 第一次绕回之前，负的位置也不能读到缓冲区末尾的空数据
+        n = max(0, end - start)
+        if out is None:
+            out = np.empty(n, dtype=self.data.dtype)
+        i = start % self.capacity
+        first = min(n, self.capacity - i)
+        out[:first] = self.data[i:i + first]
+        if first < n:
+            out[first:n] = self.data[:n - first]
+        return out[:n]
+
+    def latest(self, n, out=None):
+        """最近写入的 n 个样本"""
+        written = self.written
+        return self.read(written - n, written, out)
@@ -0,0 +1,97 @@
+"""
+非阻塞的麦克风采集
+
+PyAudio 以回调模式运行，回调在 PortAudio 自己的线程里把每块音频写进环形缓冲区；
+游戏循环每帧只读取上次之后新到达的完整数据块，不会在 stream.read 上阻塞，
+也不会因为一帧只读一块而丢掉其余的数据。
+"""
+import time
+
+import numpy as np
+
+from audio_buffer import AudioRingBuffer
+
+
+class AudioCapture:
+    """
+    :param rate: 采样率
+    :param chunk: 每块的样本数
+    :param seconds: 环形缓冲区能保存的秒数
+    """
+
+    def __init__(self, rate, chunk, seconds=2.0):
+        self.rate = rate
+        self.chunk = chunk
+        self.buffer = AudioRingBuffer(int(rate * seconds), dtype=np.float32)
+        self.read_pos = 0  # 已经处理到的累计位置
+        self.chunk_out = np.zeros(chunk, dtype=np.float32)  # 复用的读取数组
+        self.overflows = 0  # 回调报告的输入溢出次数
+        self.dropped = 0  # 读取落后太多而跳过的样本数
+        self.last_callback_time = None
+        self.stream = None
+        self.input_overflow = 0  # pyaudio 的状态标志，start() 时取得
+        self.continue_flag = None
+
+    def start(self, audio):
+        """
+        开始采集
+        :param audio: pyaudio.PyAudio 实例
+        """
+        import pyaudio  # 首次使用时才导入
+
+        self.input_overflow = pyaudio.paInputOverflow
+        self.continue_flag = pyaudio.paContinue
+        self.stream = audio.open(format=pyaudio.paFloat32,
+                                 channels=1,
+                                 rate=self.rate,
+                                 input=True,
+                                 frames_per_buffer=self.chunk,
+                                 stream_callback=self._callback)
+        self.stream.start_stream()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        self.buffer.write(np.frombuffer(in_data, dtype=np.float32))
+        if status & self.input_overflow:
+            self.overflows += 1
+        self.last_callback_time = time.perf_counter()
+        return None, self.continue_flag
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+
+    def pending(self):
+        """已到达但还没处理的完整数据块数"""
+        return (self.buffer.written - max(self.read_pos, self.buffer.oldest())) // self.chunk
+
+    def chunks(self):
+        """
+        逐块返回上次读取之后到达的所有完整数据块
+        返回的数组在下一次迭代时会被覆盖，需要保留时请复制
+        """
+        oldest = self.buffer.oldest()
+        if self.read_pos < oldest:
+            # 落后超过缓冲区容量，跳到仍然有效的最早位置
+            skip = oldest - self.read_pos
+            skip += -skip % self.chunk
+            self.dropped += skip
+            self.read_pos += skip
+        while self.read_pos + self.chunk <= self.buffer.written:
+            data = self.buffer.read(self.read_pos, self.read_pos + self.chunk, self.chunk_out)
+            self.read_pos += self.chunk
+            yield data
+
+    def chunk_time(self):
+        """
+        估计 chunks() 最近返回的数据块最后一个样本到达的时间（time.perf_counter）
+        以最近一次回调的时间为准，按样本数往前推算
+        """
+        if self.last_callback_time is None:
+            return time.perf_counter()
+        return self.last_callback_time - (self.buffer.written - self.read_pos) / self.rate
+
+    def latest(self, n, out=None):
+        """最近 n 个样本（不影响读取位置）"""
+        return self.buffer.latest(n, out)
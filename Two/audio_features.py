@@ -0,0 +1,132 @@
+"""
+增量的音频特征提取
+
+每来一块音频就更新一次滑动窗口上的特征：
+- RMS 响度和峰值因子（峰值/RMS），用于排除单个样本的爆音、咔哒声
+- 频谱通量（spectral flux）起音检测，使用复用的 rFFT 输入/输出数组
+- 持续估计的噪声底和自适应阈值
+
+所有中间数组都在初始化时分配好，处理每一块时不再分配数组（rfft 的 out 参数需要 NumPy 2.0）。
+检测到起音时返回带强度的离散事件，强度可以直接映射为跳跃高度。
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# 起音事件：position 为该块结束时的累计样本位置，strength 为 0~1 的强度，rms 为该块响度
+OnsetEvent = namedtuple('OnsetEvent', ['position', 'strength', 'rms'])
+
+
+class OnsetDetector:
+    """
+    :param rate: 采样率
+    :param fft_size: 分析窗口长度（样本数）
+    :param sensitivity: 通量超过“均值 + sensitivity × 平均偏差”才算起音
+    :param min_ratio: 响度至少是噪声底的多少倍
+    :param min_rms: 响度的绝对下限
+    :param refractory: 两次起音之间的最短间隔（秒）
+    :param strength_db: 响度比噪声底高出多少分贝时强度为 1
+    :param max_crest: 块内峰值与 RMS 之比的上限；拍手、说话通常在 10 以内，
+        只有几个样本的咔哒声能量集中在一点，峰值因子接近 sqrt(块长)，超过上限的块不算起音
+    """
+
+    def __init__(self, rate, fft_size=2048, sensitivity=3.0, min_ratio=3.0, min_rms=0.01,
+                 refractory=0.15, strength_db=30.0, max_crest=12.0):
+        self.rate = rate
+        self.fft_size = fft_size
+        self.sensitivity = sensitivity
+        self.min_ratio = min_ratio
+        self.min_rms = min_rms
+        self.refractory = int(refractory * rate)
+        self.strength_db = strength_db
+        self.max_crest = max_crest
+
+        bins = fft_size // 2 + 1
+        self.ring = np.zeros(fft_size, dtype=np.float32)  # 滑动窗口（环形）
+        self.ring_pos = 0
+        self.window = np.hanning(fft_size).astype(np.float32)
+        self.frame = np.empty(fft_size, dtype=np.float32)  # 加窗后的 FFT 输入
+        self.spectrum = np.empty(bins, dtype=np.complex64)
+        self.magnitude = np.empty(bins, dtype=np.float32)
+        self.prev_magnitude = np.zeros(bins, dtype=np.float32)
+        self.diff = np.empty(bins, dtype=np.float32)
+
+        self.position = 0  # 累计处理的样本数
+        self.rms = 0.0
+        self.crest = 0.0
+        self.flux = 0.0
+        self.noise_floor = min_rms
+        self.flux_mean = 0.0
+        self.flux_dev = 0.0
+        self.armed = True  # 迟滞：起音后需要通量回落才能再次触发
+        self.last_onset = -self.refractory
+
+    def _push(self, chunk):
+        """把新样本写入环形窗口"""
+        n = len(chunk)
+        if n >= self.fft_size:
+            self.ring[:] = chunk[-self.fft_size:]
+            self.ring_pos = 0
+            return
+        first = min(n, self.fft_size - self.ring_pos)
+        self.ring[self.ring_pos:self.ring_pos + first] = chunk[:first]
+        if first < n:
+            self.ring[:n - first] = chunk[first:]
+        self.ring_pos = (self.ring_pos + n) % self.fft_size
+
+    def _spectral_flux(self):
+        # 按时间顺序加窗：环形窗口的 [pos:] 是较早的样本
+        split = self.fft_size - self.ring_pos
+        np.multiply(self.ring[self.ring_pos:], self.window[:split], out=self.frame[:split])
+        np.multiply(self.ring[:self.ring_pos], self.window[split:], out=self.frame[split:])
+        np.fft.rfft(self.frame, out=self.spectrum)
+        np.abs(self.spectrum, out=self.magnitude)
+        np.log1p(self.magnitude, out=self.magnitude)  # 对数压缩，降低对绝对音量的依赖
+        np.subtract(self.magnitude, self.prev_magnitude, out=self.diff)
+        np.maximum(self.diff, 0, out=self.diff)
+        self.prev_magnitude[:] = self.magnitude
+        return float(self.diff.sum())
+
+    def process(self, chunk):
+        """
+        处理一块音频
+        :param chunk: float32 样本
+        :return: 检测到起音时返回 OnsetEvent，否则返回 None
+        """
+        self._push(chunk)
+        self.position += len(chunk)
+        prev_rms = self.rms
+        self.rms = rms = float(np.sqrt(np.dot(chunk, chunk) / len(chunk)))
+        peak = max(float(chunk.max()), -float(chunk.min()))  # 不用 np.abs，避免分配临时数组
+        self.crest = crest = peak / rms if rms > 0 else 0.0
+        self.flux = flux = self._spectral_flux()
+
+        threshold = self.flux_mean + self.sensitivity * self.flux_dev
+        loud = rms > max(self.noise_floor * self.min_ratio, self.min_rms)
+        event = None
+        # 只在响度上升时触发，声音结束时窗口内容突变产生的通量不算起音；
+        # 峰值因子过大的是瞬态爆音，不改变 armed，紧随其后的真实声音仍能触发
+        if (self.armed and loud and rms > prev_rms and flux > threshold and crest <= self.max_crest
+                and self.position - self.last_onset >= self.refractory):
+            db = 20 * np.log10(rms / self.noise_floor)
+            strength = min(1.0, max(0.0, db / self.strength_db))
+            event = OnsetEvent(self.position, strength, rms)
+            self.armed = False
+            self.last_onset = self.position
+        elif not self.armed and flux <= self.flux_mean:
+            self.armed = True
+
+        # 更新通量统计和噪声底（噪声底下降快、上升慢，说话时几乎不被抬高）
+        self.flux_mean += 0.05 * (flux - self.flux_mean)
+        self.flux_dev += 0.05 * (abs(flux - self.flux_mean) - self.flux_dev)
+        if rms < self.noise_floor:
+            self.noise_floor += 0.1 * (rms - self.noise_floor)
+        else:
+            self.noise_floor += 0.002 * (rms - self.noise_floor)
+        self.noise_floor = max(self.noise_floor, 1e-5)
+        return event
+
+    @property
+    def active(self):
+        """当前是否有明显的声音"""
+        return self.rms > max(self.noise_floor * self.min_ratio, self.min_rms)
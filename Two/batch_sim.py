@@ -0,0 +1,313 @@
+"""
+批量的跑酷模拟
+
+同时推进 N 个互不相干的 runner_core.Simulation：玩家的位置、速度、跳跃/滑行/无敌状态，
+障碍物和金币的位置都保存在 NumPy 数组里，一次 step 对所有环境执行与 PlayerBody、Body 和
+Simulation.step 相同的规则（包括 pygame.Rect 坐标向零取整的行为），不为每个实体创建 Python 对象。
+每个环境仍使用自己的生成计划（与单个 Simulation 相同的种子得到相同的障碍物序列），
+但只有到了下一个计划时间的环境才会调用它，平均每步只涉及很少几个环境。
+用于难度调整和训练机器人；`python batch_sim.py --parity`（以及 tests/test_batch_sim.py）
+与逐个运行的 Simulation 逐步对比结果，包括撞上障碍物的步数和得分。
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from runner_core import (COIN_SCORE, COIN_SIZE, DIFFICULTY_INTERVAL, FPS, GRAVITY, GROUND_Y,
+                         INVINCIBILITY_DURATION, JUMP_FORCE, MIN_SPACING, OBSTACLE_SIZE, PLAYER_SIZE,
+                         PLAYER_X, POOL_SIZE, SCREEN_HEIGHT, SPACING_DECREASE, SPEED_INCREASE, Simulation,
+                         make_spawner, spawn_x)
+from spawner import DifficultyCurve
+
+SLIDE_HEIGHT = 25  # 滑行时的玩家高度，与 PlayerBody.slide 一致
+SLIDE_DURATION = 0.5
+
+
+class BodyArrays:
+    """
+    一类实体（障碍物或金币）在 N 个环境中的槽位，每个环境最多 slots 个，不够时自动加倍
+    :param size: 实体尺寸 (宽, 高)
+    """
+
+    def __init__(self, envs, size, slots=POOL_SIZE):
+        self.width, self.height = size
+        self.x = np.zeros((envs, slots), dtype=np.int64)
+        self.y = np.zeros((envs, slots), dtype=np.int64)
+        self.speed = np.zeros((envs, slots))
+        self.alive = np.zeros((envs, slots), dtype=bool)
+
+    def spawn(self, env, x, y, speed):
+        row = self.alive[env]
+        slot = int(row.argmin())
+        if row[slot]:
+            self._grow()
+            slot = len(row)
+        self.x[env, slot] = x
+        self.y[env, slot] = y
+        self.speed[env, slot] = speed
+        self.alive[env, slot] = True
+
+    def _grow(self):
+        pad = ((0, 0), (0, self.alive.shape[1]))
+        self.x = np.pad(self.x, pad)
+        self.y = np.pad(self.y, pad)
+        self.speed = np.pad(self.speed, pad)
+        self.alive = np.pad(self.alive, pad)
+
+    def update(self):
+        """与 Body.update 相同：按速度左移，完全离开屏幕左侧后失效"""
+        self.x[:] = np.trunc(self.x - self.speed)
+        self.alive &= self.x + self.width >= 0
+
+    def overlaps(self, px, py, pw, ph):
+        """
+        与各环境玩家矩形相交（pygame.Rect.colliderect 的规则）的存活实体
+        :return: (N, slots) 的布尔数组
+        """
+        return (self.alive
+                & (self.x < (px + pw)[:, None]) & (px[:, None] < self.x + self.width)
+                & (self.y < (py + ph)[:, None]) & (py[:, None] < self.y + self.height))
+
+    def clear(self, mask):
+        self.alive[mask] = False
+
+    def positions(self, env):
+        """:return: 环境中存活实体的 (x, y) 按 x 排序"""
+        alive = self.alive[env]
+        return sorted(zip(self.x[env, alive].tolist(), self.y[env, alive].tolist()))
+
+
+class BatchSimulation:
+    """
+    :param envs: 环境数量
+    :param seed: 第 i 个环境使用种子 seed + i，与 Simulation(seed=seed + i) 的障碍物序列相同
+    """
+
+    def __init__(self, envs, seed=0):
+        self.envs = envs
+        self.seeds = [seed + i for i in range(envs)]
+        self.difficulty = DifficultyCurve(DIFFICULTY_INTERVAL, SPEED_INCREASE, SPACING_DECREASE, MIN_SPACING)
+        self.spawners = [make_spawner(random.Random(s), self.difficulty) for s in self.seeds]
+        self.next_spawn = np.zeros(envs)  # 每个环境下一次需要查看生成计划的游戏时间
+
+        # 玩家状态，规则与 PlayerBody 一致
+        self.y = np.full(envs, SCREEN_HEIGHT - 100, dtype=np.int64)
+        self.height = np.full(envs, PLAYER_SIZE[1], dtype=np.int64)
+        self.velocity_y = np.zeros(envs)
+        self.jumping = np.zeros(envs, dtype=bool)
+        self.double_jump_available = np.zeros(envs, dtype=bool)
+        self.sliding = np.zeros(envs, dtype=bool)
+        self.slide_timer = np.zeros(envs)
+        self.invincible = np.zeros(envs, dtype=bool)
+        self.invincibility_timer = np.zeros(envs)
+        self.x = np.full(envs, PLAYER_X, dtype=np.int64)
+        self.width = np.full(envs, PLAYER_SIZE[0], dtype=np.int64)
+
+        self.obstacles = BodyArrays(envs, OBSTACLE_SIZE)
+        self.coins = BodyArrays(envs, COIN_SIZE)
+
+        self.elapsed = 0.0
+        self.score = np.zeros(envs, dtype=np.int64)
+        self.coin_bonus = np.zeros(envs, dtype=np.int64)
+        self.game_time = np.zeros(envs)
+        self.game_over = np.zeros(envs, dtype=bool)
+        self.game_started = np.zeros(envs, dtype=bool)
+        self.crashed = np.zeros(envs, dtype=bool)  # 本步撞上障碍物的环境
+        self.coins_collected = np.zeros(envs, dtype=np.int64)  # 本步收集的金币数
+
+    def start(self, mask=None):
+        """
+        与 Simulation.start 相同：未开始或已结束的环境开始新的一局
+        :param mask: 需要开始的环境，None 表示全部
+        :return: 真正开始了新一局的环境
+        """
+        restart = ~self.game_started | self.game_over
+        if mask is not None:
+            restart &= mask
+        self.game_started |= restart
+        self.game_over &= ~restart
+        self.score[restart] = 0
+        self.coin_bonus[restart] = 0
+        self.obstacles.clear(restart)
+        self.coins.clear(restart)
+        self.game_time[restart] = 0
+        self.next_spawn[restart] = 0
+        for env in np.flatnonzero(restart):
+            self.spawners[env].reset()
+        return restart
+
+    def jump(self, mask):
+        """与 PlayerBody.jump 相同：在地面起跳，空中还有二段跳时再跳一次"""
+        first = mask & ~self.jumping
+        second = mask & self.jumping & self.double_jump_available
+        self.velocity_y[first] = JUMP_FORCE
+        self.jumping |= first
+        self.velocity_y[second] = JUMP_FORCE * 0.8
+        self.double_jump_available &= ~second
+
+    def slide(self, mask):
+        """与 PlayerBody.slide 相同：地面上开始滑行，滑行期间无敌"""
+        start = mask & ~self.jumping & ~self.sliding
+        self.sliding |= start
+        self.slide_timer[start] = 0
+        self.height[start] = SLIDE_HEIGHT
+        self.invincible |= start
+        self.invincibility_timer[start] = 0
+
+    def update_players(self, dt):
+        """与 PlayerBody.update 相同"""
+        self.velocity_y += GRAVITY
+        self.y[:] = np.trunc(self.y + self.velocity_y)
+
+        landed = self.y + self.height > GROUND_Y
+        self.y[landed] = GROUND_Y - self.height[landed]
+        self.velocity_y[landed] = 0
+        self.jumping &= ~landed
+        self.double_jump_available |= landed
+        self.sliding &= ~landed
+
+        sliding = self.sliding
+        self.slide_timer[sliding] += dt
+        done = sliding & (self.slide_timer >= SLIDE_DURATION)
+        self.sliding &= ~done
+        self.slide_timer[done] = 0
+        self.height[done] = PLAYER_SIZE[1]
+
+        invincible = self.invincible
+        self.invincibility_timer[invincible] += dt
+        done = invincible & (self.invincibility_timer >= INVINCIBILITY_DURATION)
+        self.invincible &= ~done
+        self.invincibility_timer[done] = 0
+
+    def spawn_due(self, active):
+        """只对到了下一个计划时间的环境调用它们的生成计划"""
+        for env in np.flatnonzero(active & (self.game_time >= self.next_spawn)):
+            now = self.game_time[env]
+            spawner = self.spawners[env]
+            for entry in spawner.due(now):
+                bodies = self.obstacles if entry.kind == 'obstacle' else self.coins
+                bodies.spawn(env, spawn_x(entry, now), entry.y, entry.speed)
+            # 下一个条目到时间，或计划需要补充时再来
+            next_spawn = spawner.horizon - spawner.lookahead
+            if spawner.queue:
+                next_spawn = min(next_spawn, spawner.queue[0].time)
+            self.next_spawn[env] = next_spawn
+
+    def step(self, dt=1.0 / FPS):
+        """
+        所有环境推进一个模拟步，规则与 Simulation.step 相同
+        :return: 本步撞上障碍物的环境（布尔数组）
+        """
+        self.elapsed += dt
+        self.update_players(dt)
+        self.obstacles.update()
+        self.coins.update()
+
+        active = self.game_started & ~self.game_over
+        self.game_time[active] += dt
+        self.score[active] = (self.game_time[active] * 10).astype(np.int64) + self.coin_bonus[active]
+        self.spawn_due(active)
+
+        # 收集金币
+        hits = self.coins.overlaps(self.x, self.y, self.width, self.height) & active[:, None]
+        collected = hits.sum(axis=1)
+        self.coins.alive &= ~hits
+        self.coin_bonus += collected * COIN_SCORE
+        self.score += collected * COIN_SCORE
+        self.coins_collected[:] = collected
+
+        # 碰撞检测（考虑无敌状态）
+        hit = self.obstacles.overlaps(self.x, self.y, self.width, self.height).any(axis=1)
+        self.crashed[:] = active & ~self.invincible & hit
+        self.game_over |= self.crashed
+        return self.crashed
+
+
+def random_actions(rng, envs, jump=0.04, slide=0.01):
+    """:return: 随机的 (跳跃, 滑行) 掩码"""
+    return rng.random(envs) < jump, rng.random(envs) < slide
+
+
+def check_parity(envs, steps, seed=0):
+    """
+    用相同的种子和随机输入同时运行 BatchSimulation 和 envs 个 Simulation，逐步对比状态，
+    并对比每次撞上障碍物的步数、环境和得分
+    :return: (第一处不一致的说明，完全一致时为 None, 碰撞次数)
+    """
+    batch = BatchSimulation(envs, seed)
+    sims = [Simulation(seed=s) for s in batch.seeds]
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / FPS
+    expected_crashes = []  # (步数, 环境, 得分)
+    actual_crashes = []
+    for step in range(steps):
+        jump, slide = random_actions(rng, envs)
+        batch.start(batch.game_over | ~batch.game_started)
+        batch.jump(jump)
+        batch.slide(slide)
+        for i in np.flatnonzero(batch.step(dt)):
+            actual_crashes.append((step, int(i), int(batch.score[i])))
+        for i, sim in enumerate(sims):
+            if not sim.game_started or sim.game_over:
+                sim.start()
+            if jump[i]:
+                sim.jump()
+            if slide[i]:
+                sim.slide()
+            sim.step(dt)
+            if sim.game_over and any(kind == 'crash' for kind, _, _ in sim.events):
+                expected_crashes.append((step, i, sim.score))
+            rect = sim.player.rect
+            expected = (rect.y, rect.height, sim.player.velocity_y, sim.player.invincible,
+                        sim.score, sim.game_over,
+                        sorted(body.rect.topleft for body in sim.obstacles),
+                        sorted(body.rect.topleft for body in sim.coins))
+            actual = (int(batch.y[i]), int(batch.height[i]), float(batch.velocity_y[i]), bool(batch.invincible[i]),
+                      int(batch.score[i]), bool(batch.game_over[i]),
+                      batch.obstacles.positions(i), batch.coins.positions(i))
+            if actual != expected:
+                message = f"第 {step} 步环境 {i} 不一致:\n  Simulation      {expected}\n  BatchSimulation {actual}"
+                return message, len(expected_crashes)
+    if actual_crashes != expected_crashes:
+        message = f"碰撞不一致:\n  Simulation      {expected_crashes}\n  BatchSimulation {actual_crashes}"
+        return message, len(expected_crashes)
+    return None, len(expected_crashes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量运行跑酷模拟")
+    parser.add_argument('--envs', type=int, default=1000, help="环境数量")
+    parser.add_argument('--seconds', type=float, default=60, help="每个环境模拟的游戏时间（秒）")
+    parser.add_argument('--seed', type=int, default=0, help="第一个环境的随机数种子")
+    parser.add_argument('--parity', action='store_true', help="与逐个运行的 Simulation 对比，而不是测速")
+    args = parser.parse_args()
+
+    steps = int(round(args.seconds * FPS))
+    if args.parity:
+        mismatch, crashes = check_parity(args.envs, steps, args.seed)
+        if mismatch is not None:
+            print(mismatch)
+            raise SystemExit(1)
+        print(f"{args.envs} 个环境 {steps} 步与 Simulation 完全一致（其中碰撞 {crashes} 次）")
+        return
+
+    batch = BatchSimulation(args.envs, args.seed)
+    rng = np.random.default_rng(args.seed)
+    deaths = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        jump, slide = random_actions(rng, args.envs)
+        batch.start(batch.game_over | ~batch.game_started)
+        batch.jump(jump)
+        batch.slide(slide)
+        deaths += int(batch.step().sum())
+    wall = time.perf_counter() - start
+    total = steps * args.envs
+    print(f"{args.envs} 个环境 × {steps} 步，耗时 {wall:.2f} 秒（{total / max(wall, 1e-9):.0f} 环境步/秒），"
+          f"死亡 {deaths} 次，平均得分 {batch.score.mean():.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""
+两个跑酷游戏的无界面性能基准
+
+使用 SDL 的 dummy 视频/音频驱动运行 runner_game.Game 和 sound_runner.Game，
+键盘输入由脚本按游戏状态发出，麦克风和语音识别换成脚本化的替身，结果可以复现。
+每个场景统计 update/draw/整帧耗时的分位数，另用 tracemalloc 单独跑一遍统计每帧的内存分配。
+结果可以保存为基线 JSON，之后与基线比较，变慢超过容差时以非零状态退出：
+
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json
+
+仓库里的 bench_baseline.json 是在一台机器上完整运行（--scale 1）得到的，耗时与机器有关。
+换了比较用的机器、升级了 Python/pygame/numpy，或者有意改变了某个场景的性能时，
+在那台机器上用 --save-baseline 重新生成并与改动一起提交，meta 中记录了生成时的版本。
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+from runner_core import (SCREEN_WIDTH, SCREEN_HEIGHT, GROUND_Y, OBSTACLE_SIZE, PLAYER_SIZE, PLAYER_X,
+                         SCROLL_SPEED)
+from voice import VoiceCommand
+
+DT = 1.0 / 60
+WARMUP_FRAMES = 60  # 不计入统计的预热帧数
+ALLOC_FRAMES = 200  # 统计内存分配时运行的帧数
+TOLERANCE = 0.25  # 比基线慢超过这个比例视为退化
+TIME_SLACK_MS = 0.2  # 耗时比较时允许的绝对误差，避免亚毫秒级的抖动误报
+ALLOC_SLACK_KB = 1.0  # 内存分配比较时允许的绝对误差
+PERCENTILES = (50, 95, 99)
+
+MAX_DIFFICULTY = 12  # 速度约为初始的 3 倍（每步约 16 像素），障碍物仍要约 50 步才穿过屏幕
+
+# 场景：名字、游戏（'runner' 或 'sound'）、帧数、参数
+# 参数 min_entities 为计时期间场上平均实体数的下限，达不到说明场景没有产生预期的负载
+Scenario = namedtuple('Scenario', ['name', 'game', 'frames', 'options'])
+
+SCENARIOS = [
+    Scenario('runner/baseline', 'runner', 1200, {}),
+    Scenario('runner/entities_64', 'runner', 600, {'entities': 64, 'min_entities': 48}),
+    Scenario('runner/entities_256', 'runner', 600, {'entities': 256, 'min_entities': 192}),
+    Scenario('runner/particles_1000', 'runner', 600, {'particles': 1000}),
+    Scenario('runner/particles_4000', 'runner', 600, {'particles': 4000}),
+    Scenario('runner/max_difficulty', 'runner', 3600, {'difficulty': MAX_DIFFICULTY, 'min_entities': 1}),
+    Scenario('sound/baseline', 'sound', 1200, {}),
+    Scenario('sound/dense_obstacles', 'sound', 600, {'spawn_rate': 0.2}),
+    Scenario('sound/long_session', 'sound', 3600, {}),
+]
+
+
+class ScriptedVoice:
+    """代替 VoiceController：由脚本说出命令，时间戳与真实识别的命令格式相同"""
+
+    def __init__(self):
+        self.queue = []
+
+    def say(self, name, delay=0.3):
+        """
+        :param delay: 假设的识别耗时（秒），作为采集到识别完成的间隔
+        """
+        now = time.perf_counter()
+        self.queue.append(VoiceCommand(name, name, now - delay, now - delay / 2, now))
+
+    def get_next_command(self):
+        return self.queue.pop(0) if self.queue else None
+
+    def stop(self):
+        pass
+
+
+class ScriptedCapture:
+    """
+    代替 AudioCapture：生成带底噪的音频，每隔一段时间插入一次拍手声
+    :param rate: 采样率
+    :param chunk: 每块的样本数
+    :param clap_every: 每隔多少块插入一次拍手声
+    """
+
+    def __init__(self, rate, chunk, clap_every=40, seed=0):
+        self.rate = rate
+        self.chunk = chunk
+        self.clap_every = clap_every
+        self.rng = np.random.default_rng(seed)
+        self.noise = self.rng.normal(0, 0.003, (16, chunk)).astype(np.float32)
+        clap = self.rng.normal(0, 0.3, chunk) * np.exp(-np.arange(chunk) / 200.0)
+        self.clap = (self.noise[0] + clap).astype(np.float32)
+        self.produced = 0  # 已产生的块数
+        self.due = 0.0  # 按帧累计应到达的块数
+
+    def advance(self, dt):
+        """推进 dt 秒，之后 chunks() 返回这段时间内到达的块"""
+        self.due += dt * self.rate / self.chunk
+
+    def chunks(self):
+        while self.produced + 1 <= self.due:
+            self.produced += 1
+            if self.produced % self.clap_every == 0:
+                yield self.clap
+            else:
+                yield self.noise[self.produced % len(self.noise)]
+
+    def chunk_time(self):
+        return time.perf_counter()
+
+
+def press(key):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+
+
+class RunnerDriver:
+    """驱动 runner_game.Game：按障碍物距离按空格，游戏结束时说“开始”"""
+
+    def __init__(self, options, seed):
+        import runner_game
+
+        runner_game.init_display()
+        self.voice = ScriptedVoice()
+        self.game = runner_game.Game(seed=seed, voice_controller=self.voice)
+        # 直接进入高难度：开局等级相当于已经提升了若干次，并固定在这一级，
+        # 否则速度继续增长，障碍物几步就穿过屏幕，场上反而没有实体
+        if 'difficulty' in options:
+            difficulty = self.game.sim.difficulty
+            difficulty.start_level = difficulty.max_level = options['difficulty']
+        self.options = options
+        self.rng = random.Random(seed)
+        self.frame = 0
+
+    def script(self):
+        game = self.game
+        sim = game.sim
+        options = self.options
+        if not sim.game_started or sim.game_over:
+            self.voice.say('start')
+            return
+        player_rect = sim.player.rect
+        for obstacle in sim.obstacles:
+            if 0 <= obstacle.rect.left - player_rect.right <= 120:
+                press(pygame.K_SPACE)
+                break
+        if self.frame % 150 == 75:
+            self.voice.say('jump')
+
+        entities = options.get('entities')
+        if entities:
+            # 在屏幕上随机补充实体，保持场上实体数量
+            while len(sim.obstacles) + len(sim.coins) < entities:
+                x = self.rng.randint(PLAYER_X + PLAYER_SIZE[0] + 100, SCREEN_WIDTH)
+                if self.rng.random() < 0.5:
+                    sim.spawn('obstacle', sim.obstacles, x, GROUND_Y - OBSTACLE_SIZE[1], sim.current_speed)
+                else:
+                    sim.spawn('coin', sim.coins, x, self.rng.randint(SCREEN_HEIGHT - 200, SCREEN_HEIGHT - 100),
+                              SCROLL_SPEED)
+        particles = options.get('particles')
+        if particles:
+            # 粒子寿命约 1 秒，每帧补充 1/60 即可维持目标数量
+            game.particles.create_explosion(self.rng.randint(0, SCREEN_WIDTH), self.rng.randint(0, SCREEN_HEIGHT),
+                                            particles // 60 + 1)
+
+    def entity_count(self):
+        return len(self.game.sim.obstacles) + len(self.game.sim.coins)
+
+    def frame_step(self, timings):
+        game = self.game
+        self.script()
+        t0 = time.perf_counter()
+        game.handle_events()
+        game.apply_inputs()
+        t1 = time.perf_counter()
+        game.update(DT)
+        t2 = time.perf_counter()
+        game.draw(1.0)
+        t3 = time.perf_counter()
+        self.frame += 1
+        if timings is not None:
+            timings.append((t2 - t1, t3 - t2, t3 - t0))
+
+
+class SoundDriver:
+    """驱动 sound_runner.Game：脚本化的麦克风定时“拍手”，撞到障碍物后继续运行以保持负载"""
+
+    def __init__(self, options, seed):
+        import sound_runner
+
+        sound_runner.init_display()
+        self.game = sound_runner.Game(seed=seed)
+        if 'spawn_rate' in options:
+            self.game.obstacle_spawn_rate = options['spawn_rate']
+            self.game.spawner.min_gap = 0  # 只为制造负载，不要求障碍物能跳过
+        self.capture = ScriptedCapture(sound_runner.RATE, sound_runner.CHUNK, seed=seed)
+        self.frame = 0
+
+    def entity_count(self):
+        return len(self.game.obstacle_index)
+
+    def frame_step(self, timings):
+        game = self.game
+        self.capture.advance(DT)
+        t0 = time.perf_counter()
+        game.handle_events()
+        game.check_sound(self.capture)
+        game.apply_inputs()
+        t1 = time.perf_counter()
+        game.update()
+        game.game_over = False  # 基准只关心负载，碰撞后继续
+        t2 = time.perf_counter()
+        game.draw(1.0)
+        t3 = time.perf_counter()
+        self.frame += 1
+        if timings is not None:
+            timings.append((t2 - t1, t3 - t2, t3 - t0))
+
+
+def percentiles(values):
+    values = np.asarray(values) * 1000
+    return {f'p{p}': round(float(np.percentile(values, p)), 4) for p in PERCENTILES}
+
+
+def run_scenario(scenario, seed=0, scale=1.0):
+    """
+    运行一个场景
+    :param scale: 帧数的倍数，用于快速检查
+    :return: 各项指标（毫秒、KB）
+    """
+    driver_class = RunnerDriver if scenario.game == 'runner' else SoundDriver
+    frames = max(1, int(scenario.frames * scale))
+
+    # 计时
+    driver = driver_class(scenario.options, seed)
+    for _ in range(WARMUP_FRAMES):
+        driver.frame_step(None)
+    timings = []
+    entities = 0
+    for _ in range(frames):
+        driver.frame_step(timings)
+        entities += driver.entity_count()
+    update, draw, frame = zip(*timings)
+    entities /= frames
+    min_entities = scenario.options.get('min_entities')
+    if min_entities is not None and entities < min_entities:
+        raise RuntimeError(f"{scenario.name}: 场上平均只有 {entities:.1f} 个实体，低于 {min_entities}，"
+                           f"场景没有产生预期的负载")
+
+    # 内存分配：tracemalloc 本身开销很大，单独跑一遍
+    alloc_frames = max(1, int(ALLOC_FRAMES * scale))
+    allocated = 0
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    for _ in range(alloc_frames):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        driver.frame_step(None)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks
+
+    return {
+        'frames': frames,
+        'update_ms': percentiles(update),
+        'draw_ms': percentiles(draw),
+        'frame_ms': percentiles(frame),
+        'alloc_kb_per_frame': round(allocated / alloc_frames / 1024, 3),
+        'blocks_per_frame': round(blocks / alloc_frames, 3),
+        'entities': round(entities, 2),
+    }
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    与基线比较
+    :return: 退化项的说明列表，为空表示没有退化
+    """
+    failures = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in ('update_ms', 'draw_ms', 'frame_ms'):
+            for p in ('p50', 'p95'):
+                old, new = base[metric][p], result[metric][p]
+                if new > old * (1 + tolerance) + TIME_SLACK_MS:
+                    failures.append(f'{name} {metric} {p}: {old:.3f} -> {new:.3f}ms (+{(new / old - 1) * 100:.0f}%)')
+        old, new = base['alloc_kb_per_frame'], result['alloc_kb_per_frame']
+        if new > old * (1 + tolerance) + ALLOC_SLACK_KB:
+            failures.append(f'{name} alloc_kb_per_frame: {old:.2f} -> {new:.2f}KB')
+    return failures
+
+
+def print_result(name, result):
+    frame, update, draw = result['frame_ms'], result['update_ms'], result['draw_ms']
+    print(f"{name:<24} frame {frame['p50']:7.3f}/{frame['p95']:7.3f}/{frame['p99']:7.3f}ms"
+          f"  update {update['p50']:6.3f}/{update['p95']:6.3f}  draw {draw['p50']:6.3f}/{draw['p95']:6.3f}"
+          f"  alloc {result['alloc_kb_per_frame']:7.2f}KB  blocks {result['blocks_per_frame']:+.2f}/frame"
+          f"  entities {result['entities']:6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="两个跑酷游戏的无界面性能基准")
+    parser.add_argument('scenarios', nargs='*', help="只运行名字包含这些字符串的场景")
+    parser.add_argument('--seed', type=int, default=0, help="随机数种子")
+    parser.add_argument('--scale', type=float, default=1.0, help="帧数倍数，小于 1 时可快速检查")
+    parser.add_argument('--baseline', help="与这个基线 JSON 比较，退化时以状态 1 退出")
+    parser.add_argument('--save-baseline', help="把结果保存为基线 JSON")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="允许比基线慢的比例")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.scenarios or any(f in s.name for f in args.scenarios)]
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = run_scenario(scenario, args.seed, args.scale)
+        print_result(scenario.name, results[scenario.name])
+    pygame.quit()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'meta': {'python': sys.version.split()[0], 'pygame': pygame.version.ver,
+                                'numpy': np.__version__, 'seed': args.seed, 'scale': args.scale},
+                       'scenarios': results}, f, indent=2, ensure_ascii=False)
+        print(f"基线已保存到 {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['scenarios']
+        failures = compare(results, baseline, args.tolerance)
+        if failures:
+            print(f"性能退化（容差 {args.tolerance * 100:.0f}%）:", file=sys.stderr)
+            for failure in failures:
+                print(f"  FAIL {failure}", file=sys.stderr)
+            sys.exit(1)
+        print(f"与基线 {args.baseline} 相比没有超过 {args.tolerance * 100:.0f}% 的退化")
+
+
+if __name__ == '__main__':
+    main()
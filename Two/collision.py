@@ -0,0 +1,153 @@
+"""
+碰撞检测的粗筛结构
+
+跑酷游戏中的实体都从右侧进入、向左滚动，天然按 x 坐标有序。
+ScrollIndex 保持这个顺序，碰撞查询用二分查找定位到与玩家 x 范围重叠的一小段，
+只对这一段做矩形检测；“越过玩家”的计分用一个只前进不后退的游标完成。
+需要精确碰撞时，只对矩形相交的实体再做一次遮罩重叠检测（masks_overlap）。
+"""
+
+
+class ScrollIndex:
+    """
+    按 rect.left 升序排列的实体列表
+    :param max_width: 实体的最大宽度，用于确定二分查找的起点
+    """
+
+    def __init__(self, max_width):
+        self.items = []
+        self.max_width = max_width
+        self.passed = 0  # 游标：items[:passed] 已经越过玩家
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    def append(self, item):
+        """加入实体；新实体通常在最右侧，直接追加，否则插入到有序位置"""
+        items = self.items
+        if not items or items[-1].rect.left <= item.rect.left:
+            items.append(item)
+        else:
+            i = self._lower_bound(item.rect.left)
+            items.insert(max(i, self.passed), item)
+
+    def _lower_bound(self, x):
+        """第一个 rect.left >= x 的下标"""
+        items = self.items
+        lo, hi = 0, len(items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if items[mid].rect.left < x:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(self, rect, out):
+        """
+        找出与 rect 相交的实体
+        :param out: 用于存放结果的列表，会先被清空（复用以避免每帧分配）
+        :return: out
+        """
+        out.clear()
+        items = self.items
+        right = rect.right
+        for i in range(self._lower_bound(rect.left - self.max_width), len(items)):
+            item = items[i]
+            if item.rect.left >= right:
+                break
+            if item.rect.colliderect(rect):
+                out.append(item)
+        return out
+
+    def first_hit(self, rect, predicate=None):
+        """
+        返回第一个与 rect 相交（并满足 predicate）的实体，没有则返回 None
+        :param predicate: 可选的精确检测函数 predicate(item)，只对矩形相交的实体调用
+        """
+        items = self.items
+        right = rect.right
+        for i in range(self._lower_bound(rect.left - self.max_width), len(items)):
+            item = items[i]
+            if item.rect.left >= right:
+                break
+            if item.rect.colliderect(rect) and (predicate is None or predicate(item)):
+                return item
+        return None
+
+    def advance(self, x):
+        """
+        游标前移，越过所有 rect.right < x 的实体
+        :return: 本次新越过的实体数量，它们是 items[passed - n:passed]
+        """
+        items = self.items
+        start = self.passed
+        i = start
+        while i < len(items) and items[i].rect.right < x:
+            i += 1
+        self.passed = i
+        return i - start
+
+    def pop_passed(self):
+        """移除并返回游标之前的所有实体"""
+        passed = self.items[:self.passed]
+        del self.items[:self.passed]
+        self.passed = 0
+        return passed
+
+    def compact(self, on_removed=None):
+        """
+        原地移除 alive 为 False 的实体，并恢复有序（实体移动后可能交换先后顺序）
+        :param on_removed: 对每个被移除的实体调用一次
+        """
+        items = self.items
+        for item in items:
+            if not item.alive:
+                break
+        else:
+            return
+
+        j = 0
+        passed = self.passed
+        for i, item in enumerate(items):
+            if item.alive:
+                items[j] = item
+                j += 1
+            else:
+                if i < self.passed:
+                    passed -= 1
+                if on_removed is not None:
+                    on_removed(item)
+        del items[j:]
+        self.passed = passed
+
+        # 不同速度的实体可能交换先后顺序，发现乱序时重新排序（通常已经有序）
+        for i in range(1, len(items)):
+            if items[i - 1].rect.left > items[i].rect.left:
+                items.sort(key=_left)
+                break
+
+    def clear(self, on_removed=None):
+        if on_removed is not None:
+            for item in self.items:
+                on_removed(item)
+        self.items.clear()
+        self.passed = 0
+
+
+def masks_overlap(rect_a, mask_a, rect_b, mask_b):
+    """
+    逐像素检测两个遮罩在各自矩形位置上是否有重叠的不透明像素
+    应只在矩形已经相交时调用，例如作为 ScrollIndex.first_hit 的 predicate
+    """
+    return mask_a.overlap(mask_b, (rect_b.x - rect_a.x, rect_b.y - rect_a.y)) is not None
+
+
+def _left(item):
+    return item.rect.left
@@ -0,0 +1,67 @@
+"""
+脏矩形渲染
+
+每帧只在上一帧画过东西的区域恢复背景，再把本帧的精灵画上去，
+最后用 pygame.display.update(rects) 只提交变化的区域，而不是整屏 flip。
+背景在滚动（或被替换）时自动退回整屏重绘。
+"""
+import pygame
+
+
+class DirtyRenderer:
+    """
+    :param screen: 目标显示 Surface
+    :param enabled: 为 False 时每帧整屏重绘并 flip，行为与普通渲染相同
+    """
+
+    def __init__(self, screen, enabled=True):
+        self.screen = screen
+        self.enabled = enabled
+        self.background = None
+        self.full = True
+        self.prev_rects = []  # 上一帧画过的区域
+        self.rects = []  # 本帧画过的区域
+
+    def begin(self, background=None, full=False):
+        """
+        开始一帧，恢复上一帧画过区域的背景
+        :param background: 与屏幕同样大小的静态背景；为 None 表示调用者已自行画好整屏背景
+        :param full: 强制整屏重绘（例如视差背景正在滚动）
+        """
+        self.full = (full or not self.enabled or background is None
+                     or background is not self.background)
+        self.background = background
+        self.rects = []
+        if background is None:
+            return
+        if self.full:
+            self.screen.blit(background, (0, 0))
+        else:
+            for rect in self.prev_rects:
+                self.screen.blit(background, rect, rect)
+
+    def blit(self, image, pos):
+        """绘制并记录区域"""
+        rect = self.screen.blit(image, pos)
+        self.rects.append(rect)
+        return rect
+
+    def add(self, rect):
+        """记录由其他方式（GUI、粒子等）绘制的区域"""
+        if rect:
+            self.rects.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        """下一帧强制整屏重绘"""
+        self.background = None
+
+    def refresh(self, image):
+        """image 的内容变了；直接从 Surface 绘制，不需要处理（与 TextureRenderer 的接口一致）"""
+
+    def end(self):
+        """提交本帧"""
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.prev_rects + self.rects)
+        self.prev_rects = self.rects
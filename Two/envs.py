@@ -0,0 +1,285 @@
+"""
+供训练智能体使用的环境接口
+
+两个游戏都提供 Gym 风格的 reset()/step(action)：
+    obs, info = env.reset(seed=0)
+    obs, reward, terminated, truncated, info = env.step(action)
+
+观测有两种：
+    'features'  紧凑的特征向量（玩家状态 + 前方最近 k 个障碍物的距离和种类）
+    'pixels'    缩小后的游戏画面，形状 (高, 宽, 3) 的 uint8 数组
+
+画面观测不复制像素：每步把游戏画面缩放到一张小的观测 Surface，返回的是
+pygame.surfarray.pixels3d 对这张 Surface 的视图，每步原地更新。需要保存历史观测时请自行 copy()。
+默认使用 SDL 的 dummy 驱动，不需要显示器。`python envs.py` 测量各环境每秒的步数。
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+import pygame
+
+from input_bus import InputEvent
+from runner_core import FPS, JUMP_FORCE, SCREEN_HEIGHT, SCREEN_WIDTH, SCROLL_SPEED, Simulation
+
+OBS_TYPES = ('features', 'pixels')
+NEAREST = 3  # 特征向量中包含的前方障碍物数
+DOWNSAMPLE = 4  # 画面观测的缩小倍数
+MAX_STEPS = 10000  # 一局最多的步数，超过后 truncated
+
+
+def use_dummy_display():
+    """还没有创建窗口时改用 SDL 的 dummy 视频/音频驱动"""
+    if not pygame.display.get_init():
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+
+class PixelObserver:
+    """
+    把屏幕缩小到观测 Surface，并保留对它的 pixels3d 视图
+    :param size: 屏幕尺寸 (宽, 高)
+    :param downsample: 缩小倍数
+    """
+
+    def __init__(self, size, downsample=DOWNSAMPLE):
+        width, height = size
+        self.size = (width // downsample, height // downsample)
+        self.surface = pygame.Surface(self.size)
+        # pixels3d 的形状是 (宽, 高, 3)，转置成常用的 (高, 宽, 3)，仍然是同一块内存的视图
+        self.view = pygame.surfarray.pixels3d(self.surface).transpose(1, 0, 2)
+
+    def observe(self, screen):
+        pygame.transform.scale(screen, self.size, self.surface)
+        return self.view
+
+
+class RunnerEnv:
+    """
+    runner_game 的环境，动作为 0 不动、1 跳跃、2 滑行，奖励为得分的增量，撞上障碍物时 terminated
+    特征观测只运行 runner_core.Simulation，不绘制，但碰撞与游戏一样逐像素确认（runner_game.PixelCollider）；
+    画面观测运行完整的 runner_game.Game。同一个 Game/Simulation 在每局开始时 reset，不重复创建
+    :param obs_type: 'features' 或 'pixels'
+    :param seed: 第一局的随机数种子，之后每局的种子由它派生
+    :param nearest: 特征向量包含的前方实体数
+    :param downsample: 画面观测的缩小倍数
+    :param max_steps: 一局最多的步数
+    :param headless: 为 True 时使用 dummy 驱动
+    """
+    ACTIONS = ('noop', 'jump', 'slide')
+
+    def __init__(self, obs_type='features', seed=None, nearest=NEAREST, downsample=DOWNSAMPLE,
+                 max_steps=MAX_STEPS, headless=True):
+        if obs_type not in OBS_TYPES:
+            raise ValueError(f"未知的观测类型: {obs_type}")
+        self.obs_type = obs_type
+        self.nearest = nearest
+        self.max_steps = max_steps
+        self.rng = random.Random(seed)
+        self.game = None
+        self.sim = None
+        self.collider = None
+        self.steps = 0
+        self.observer = None
+        if headless:
+            use_dummy_display()
+        if obs_type == 'pixels':
+            import runner_game
+
+            runner_game.init_display()
+            self.observer = PixelObserver((SCREEN_WIDTH, SCREEN_HEIGHT), downsample)
+
+    def reset(self, seed=None):
+        """
+        开始新的一局
+        :return: (观测, info)
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+        episode_seed = self.rng.randrange(2 ** 31)
+        if self.obs_type == 'pixels':
+            if self.game is None:
+                import runner_game
+                from replay import NullVoice
+
+                self.game = runner_game.Game(seed=episode_seed, voice_controller=NullVoice())
+            else:
+                self.game.reset(episode_seed)  # 复用同一个 Game，不重建对象池、粒子数组和 HUD
+            self.game.start()
+            self.sim = self.game.sim
+        else:
+            if self.sim is None:
+                import runner_game
+
+                self.sim = Simulation(seed=episode_seed)
+                self.collider = runner_game.PixelCollider(self.sim)
+            else:
+                self.sim.reset(episode_seed)
+                self.collider.reset()
+            self.sim.start()
+        self.steps = 0
+        return self.observe(), {'seed': episode_seed}
+
+    def step(self, action):
+        """
+        :param action: ACTIONS 中的序号
+        :return: (观测, 奖励, terminated, truncated, info)
+        """
+        name = self.ACTIONS[action]
+        score = self.sim.score
+        if self.game is not None:
+            if name != 'noop':
+                self.game.apply_input(InputEvent(name, 'keyboard', None))
+            self.game.update(1.0 / FPS)
+        else:
+            if name == 'jump':
+                self.sim.jump()
+            elif name == 'slide':
+                self.sim.slide()
+            self.sim.step(1.0 / FPS)
+            self.collider.player.update(1.0 / FPS)  # 与 Game.update 相同，模拟步之后推进动画
+        self.steps += 1
+        reward = self.sim.score - score
+        return (self.observe(), reward, self.sim.game_over, self.steps >= self.max_steps,
+                {'score': self.sim.score})
+
+    def observe(self):
+        if self.game is not None:
+            self.game.draw()
+            return self.observer.observe(self.game.screen)
+        return self.features()
+
+    def features(self):
+        """
+        :return: [玩家 y, y 速度, 是否在空中, 能否二段跳, 是否滑行, 是否无敌, 滚动速度]
+                 + 前方最近 nearest 个实体的 [x 距离, y 距离, 种类（障碍物 1，金币 -1，没有 0）]，
+                 位置都除以屏幕尺寸
+        """
+        sim = self.sim
+        player = sim.player
+        rect = player.rect
+        obs = np.zeros(7 + 3 * self.nearest, dtype=np.float32)
+        obs[:7] = (rect.y / SCREEN_HEIGHT, player.velocity_y / -JUMP_FORCE, player.jumping,
+                   player.double_jump_available, player.sliding, player.invincible,
+                   sim.current_speed / SCROLL_SPEED)
+        ahead = [(body.rect.left - rect.right, body.rect.y - rect.y, 1.0)
+                 for body in sim.obstacles if body.rect.right >= rect.left]
+        ahead += [(body.rect.left - rect.right, body.rect.y - rect.y, -1.0)
+                  for body in sim.coins if body.rect.right >= rect.left]
+        ahead.sort()
+        for i, (dx, dy, kind) in enumerate(ahead[:self.nearest]):
+            obs[7 + 3 * i:10 + 3 * i] = (dx / SCREEN_WIDTH, dy / SCREEN_HEIGHT, kind)
+        obs[7 + 3 * len(ahead[:self.nearest])::3] = 1.0  # 没有实体的位置视为在一个屏幕之外
+        return obs
+
+
+class SoundRunnerEnv:
+    """
+    sound_runner 的环境，动作为 0 不跳，其余值作为起跳强度（0~1，1 对应最高的一跳），
+    奖励为跨过障碍物得到的分数，撞上障碍物时 terminated
+    参数与 RunnerEnv 相同；这个游戏的规则在精灵里，两种观测都运行完整的 sound_runner.Game，
+    同样在每局开始时 reset 而不重复创建
+    """
+
+    def __init__(self, obs_type='features', seed=None, nearest=NEAREST, downsample=DOWNSAMPLE,
+                 max_steps=MAX_STEPS, headless=True):
+        if obs_type not in OBS_TYPES:
+            raise ValueError(f"未知的观测类型: {obs_type}")
+        self.obs_type = obs_type
+        self.nearest = nearest
+        self.max_steps = max_steps
+        self.rng = random.Random(seed)
+        self.game = None
+        self.steps = 0
+        if headless:
+            use_dummy_display()
+        import sound_runner
+
+        self.module = sound_runner
+        self.screen = sound_runner.init_display()
+        self.observer = None
+        if obs_type == 'pixels':
+            self.observer = PixelObserver((sound_runner.SCREEN_WIDTH, sound_runner.SCREEN_HEIGHT), downsample)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng.seed(seed)
+        episode_seed = self.rng.randrange(2 ** 31)
+        if self.game is None:
+            self.game = self.module.Game(seed=episode_seed)
+        else:
+            self.game.reset(episode_seed)
+        self.steps = 0
+        return self.observe(), {'seed': episode_seed}
+
+    def step(self, action):
+        game = self.game
+        score = game.score
+        if action:
+            game.apply_input(InputEvent('jump', 'sound', None, float(action)))
+        game.update()
+        self.steps += 1
+        reward = game.score - score
+        return (self.observe(), reward, game.game_over, self.steps >= self.max_steps,
+                {'score': game.score})
+
+    def observe(self):
+        if self.observer is not None:
+            self.game.draw()
+            return self.observer.observe(self.screen)
+        return self.features()
+
+    def features(self):
+        """
+        :return: [玩家 y, y 速度, 是否在空中, 能否二段跳]
+                 + 前方最近 nearest 个障碍物的 [x 距离, 种类（enemy_one 1，enemy_two 2，没有 0）]
+        """
+        width, height = self.module.SCREEN_WIDTH, self.module.SCREEN_HEIGHT
+        player = self.game.player
+        rect = player.rect
+        obs = np.zeros(4 + 2 * self.nearest, dtype=np.float32)
+        obs[:4] = (rect.y / height, player.velocity_y / 20, player.jumping, player.double_jump_available)
+        ahead = [obstacle for obstacle in self.game.obstacle_index if obstacle.rect.right >= rect.left]
+        for i, obstacle in enumerate(ahead[:self.nearest]):
+            obs[4 + 2 * i] = (obstacle.rect.left - rect.right) / width
+            obs[5 + 2 * i] = 1.0 if obstacle.obstacle_type == "enemy_one" else 2.0
+        obs[4 + 2 * len(ahead[:self.nearest])::2] = 1.0
+        return obs
+
+
+ENVS = {'runner': RunnerEnv, 'sound': SoundRunnerEnv}
+
+
+def benchmark(name, obs_type, steps, seed=0):
+    """
+    用随机动作运行 steps 步
+    :return: 每秒步数
+    """
+    env = ENVS[name](obs_type, seed=seed)
+    actions = random.Random(seed)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        action = 1 if actions.random() < 0.05 else 0
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量环境每秒的步数")
+    parser.add_argument('--steps', type=int, default=5000, help="每种环境运行的步数")
+    parser.add_argument('--seed', type=int, default=0, help="随机数种子")
+    args = parser.parse_args()
+    use_dummy_display()
+    for name in ENVS:
+        for obs_type in OBS_TYPES:
+            rate = benchmark(name, obs_type, args.steps, args.seed)
+            print(f"{name:<8}{obs_type:<10}{rate:>10.0f} 步/秒")
+
+
+if __name__ == '__main__':
+    main()
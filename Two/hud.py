@@ -0,0 +1,145 @@
+"""
+缓存的 HUD 文字
+
+每种字体、字号和颜色对应一张字形图集：ASCII 字符（数字、字母、标点）在创建时一次渲染好，
+中文等其他字符第一次出现时补进图集。文字控件只在显示的值变化时用 Surface.blits 从图集
+拼出新的文字图像，其余帧只把缓存的图像画到屏幕上，不再每帧调用 Font.render。
+"""
+import string
+
+import pygame
+
+from assets import cache
+
+ASCII = ''.join(chr(c) for c in range(32, 127))  # 预先渲染的字符：空格到 ~
+DIGITS = string.digits
+
+
+class GlyphAtlas:
+    """
+    一种字体、颜色的字形图集
+    :param font: pygame.font.Font
+    :param color: 文字颜色
+    :param chars: 预先渲染的字符
+    """
+
+    def __init__(self, font, color, chars=ASCII):
+        self.font = font
+        self.color = color
+        self.height = font.render(DIGITS, True, color).get_height()  # 渲染结果比 get_height() 略高
+        self.surface = pygame.Surface((1, self.height), pygame.SRCALPHA)
+        self.glyphs = {}  # 字符 -> (在图集中的区域, 前进宽度)
+        self.add(chars)
+
+    def add(self, chars):
+        """把还没有的字符补进图集（整张图集重建一次）"""
+        missing = [char for char in dict.fromkeys(chars) if char not in self.glyphs]
+        if not missing:
+            return
+        rendered = [(char, self.font.render(char, True, self.color)) for char in missing]
+        width = self.surface.get_width()
+        surface = pygame.Surface((width + sum(glyph.get_width() for _, glyph in rendered), self.height),
+                                 pygame.SRCALPHA)
+        # 透明底上用 BLEND_RGBA_ADD 逐通道复制，保留字形边缘原本的颜色和透明度
+        surface.blit(self.surface, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        x = width
+        for (char, glyph), metrics in zip(rendered, self.font.metrics(''.join(missing))):
+            surface.blit(glyph, (x, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            # 拼字时按字体给出的前进宽度排列，与整行渲染的字距一致
+            advance = metrics[4] if metrics else glyph.get_width()
+            self.glyphs[char] = (pygame.Rect(x, 0, glyph.get_width(), glyph.get_height()), advance)
+            x += glyph.get_width()
+        self.surface = surface
+
+    def size(self, text):
+        """:return: 拼出 text 的宽和高"""
+        self.add(text)
+        return sum(self.glyphs[char][1] for char in text), self.height
+
+    def compose(self, text, target=None):
+        """
+        用图集拼出一行文字
+        :param target: 足够大的透明 Surface，为 None 时新建
+        :return: 画好文字的 Surface
+        """
+        width, height = self.size(text)
+        if target is None:
+            target = pygame.Surface((max(width, 1), height), pygame.SRCALPHA)
+        else:
+            target.fill((0, 0, 0, 0))
+        atlas = self.surface
+        sequence = []
+        x = 0
+        for char in text:
+            area, advance = self.glyphs[char]
+            sequence.append((atlas, (x, 0), area, pygame.BLEND_RGBA_ADD))
+            x += advance
+        target.blits(sequence, doreturn=False)
+        return target
+
+
+_atlases = {}  # (字体路径, 字号, 颜色) -> GlyphAtlas
+
+
+def atlas(path, size, color):
+    """
+    取得字体、字号和颜色对应的共享图集
+    :param path: 字体文件路径，None 为默认字体
+    """
+    key = (path, size, tuple(color))
+    glyphs = _atlases.get(key)
+    if glyphs is None:
+        glyphs = _atlases[key] = GlyphAtlas(cache.font(path, size), color)
+    return glyphs
+
+
+class HudText:
+    """
+    一行缓存的文字
+    :param atlas: GlyphAtlas
+    :param pos: 位置，默认是左上角
+    :param template: 格式模板，显示 template.format(value)
+    :param anchor: 对齐到 pos 的 Rect 属性名，如 'topleft'、'center'
+    """
+
+    def __init__(self, atlas, pos, template='{}', value='', anchor='topleft'):
+        self.atlas = atlas
+        self.pos = pos
+        self.template = template
+        self.anchor = anchor
+        self.value = None
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.renders = 0  # 重新拼字的次数
+        self.changed = False  # 图像重新拼过、还没有画到屏幕上
+        self.set(value)
+
+    def set(self, value):
+        """
+        设置显示的值，与当前值相同时什么都不做
+        :return: 是否重新拼了文字
+        """
+        if value == self.value:
+            return False
+        self.value = value
+        text = self.template.format(value)
+        width, height = self.atlas.size(text)
+        image = self.image
+        if image is None or image.get_width() < width:
+            # 留出余量，数字变长时不必每次都新建 Surface
+            image = self.image = pygame.Surface((width + width // 2 + 1, height), pygame.SRCALPHA)
+        self.atlas.compose(text, image)
+        self.rect = pygame.Rect(0, 0, width, height)
+        setattr(self.rect, self.anchor, self.pos)
+        self.renders += 1
+        self.changed = True
+        return True
+
+    def draw(self, renderer):
+        """通过 DirtyRenderer 绘制（空文字不画）"""
+        if self.changed:
+            renderer.refresh(self.image)
+            self.changed = False
+        if self.rect.width:
+            renderer.screen.blit(self.image, self.rect, (0, 0, self.rect.width, self.rect.height))
+            renderer.add(self.rect)
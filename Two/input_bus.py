@@ -0,0 +1,83 @@
+"""
+带时间戳的输入事件总线
+
+键盘、语音命令和声音起音都以 InputEvent 的形式投递到同一条总线，投递可以来自任意线程。
+游戏每帧调用一次 drain() 把积压的事件整批取出：按采集时间排序，并合并短时间内重复触发的
+同一动作。随后在每个模拟步之前用 due(该步的结束时间) 取出在这一步之前采集的事件，
+让输入作用在它被采集时对应的模拟步上，而不是每帧只处理一个、越积越晚。
+"""
+import time
+from collections import deque, namedtuple
+
+COALESCE_WINDOW = 0.1  # 同一动作在这个时间（秒）内重复触发只算一次
+
+# 输入事件，时间均为 time.perf_counter()
+# action: 动作名（如 'jump'）；source: 来源（'keyboard'、'voice'、'sound'）；strength: 0~1 的强度
+# ended_at/recognized_at: 采集结束和识别完成的时间，没有单独阶段的输入可以省略
+InputEvent = namedtuple('InputEvent', ['action', 'source', 'captured_at', 'strength', 'ended_at', 'recognized_at'],
+                        defaults=(1.0, None, None))
+
+
+class InputBus:
+    """
+    :param coalesce: 合并重复事件的时间窗口（秒）
+    """
+
+    def __init__(self, coalesce=COALESCE_WINDOW):
+        self.coalesce = coalesce
+        self.incoming = deque()  # 投递方写入；deque 的 append/popleft 是线程安全的
+        self.batch = deque()  # 本帧取出、按时间排好序、还没作用的事件
+        self.coalesced = 0  # 累计被合并掉的事件数
+
+    def post(self, action, source, captured_at=None, strength=1.0, ended_at=None, recognized_at=None):
+        """投递一个事件，captured_at 缺省为当前时间"""
+        if captured_at is None:
+            captured_at = time.perf_counter()
+        self.incoming.append(InputEvent(action, source, captured_at, strength, ended_at, recognized_at))
+
+    def drain(self):
+        """
+        取出所有已投递的事件并入本帧的批次（每帧调用一次）
+        :return: 本帧待作用的事件数
+        """
+        incoming = self.incoming
+        if not incoming:
+            return len(self.batch)
+        events = list(self.batch)
+        while incoming:
+            events.append(incoming.popleft())
+        events.sort(key=_captured_at)
+
+        # 合并：同一动作在窗口内的重复事件只保留最早的一个，强度取最大值
+        batch = self.batch
+        batch.clear()
+        last = {}  # 动作 -> 该动作最近一个保留事件在 kept 中的下标
+        kept = []
+        for event in events:
+            i = last.get(event.action)
+            if i is not None and event.captured_at - kept[i].captured_at <= self.coalesce:
+                if event.strength > kept[i].strength:
+                    kept[i] = kept[i]._replace(strength=event.strength)
+                self.coalesced += 1
+                continue
+            last[event.action] = len(kept)
+            kept.append(event)
+        batch.extend(kept)
+        return len(batch)
+
+    def due(self, until=None):
+        """
+        逐个取出采集时间不晚于 until 的事件
+        :param until: 模拟步的结束时间，为 None 时取出批次中的全部事件
+        """
+        batch = self.batch
+        while batch and (until is None or batch[0].captured_at <= until):
+            yield batch.popleft()
+
+    def clear(self):
+        self.incoming.clear()
+        self.batch.clear()
+
+
+def _captured_at(event):
+    return event.captured_at
@@ -0,0 +1,190 @@
+"""
+端到端输入延迟统计
+
+每一次输入（键盘、语音命令、声音起音）从产生到角色在屏幕上动起来，记录四个时间点：
+- captured_at：输入被采集（按键被轮询到 / 语音开始 / 音频块到达）
+- recognized_at：输入被识别（语音识别完成 / 起音检测完成）
+- dequeued_at：游戏循环取出输入并作用到玩家
+- rendered_at：作用之后第一帧提交到屏幕
+时间都使用 time.perf_counter()。各阶段的耗时按输入来源累计到对数分桶的直方图里，
+可以随时查看分位数，也可以把每条记录导出为 CSV。
+"""
+import csv
+import time
+from collections import deque
+
+import numpy as np
+
+# 直方图分桶：0.1ms ~ 10s，对数均匀的 100 个桶
+BUCKET_EDGES = np.geomspace(0.1, 10000.0, 101)
+STAGES = ('capture', 'recognize', 'queue', 'render', 'total')
+PERCENTILES = (50, 90, 99)
+HISTORY = 10000  # 保留用于导出 CSV 的最近记录数
+
+
+class LatencyHistogram:
+    """对数分桶的延迟直方图（毫秒），添加和查询分位数都不需要保存所有样本"""
+
+    def __init__(self, edges=BUCKET_EDGES):
+        self.edges = edges
+        self.counts = np.zeros(len(edges) + 1, dtype=np.int64)  # 两端各多一个溢出桶
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[np.searchsorted(self.edges, ms, side='right')] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """
+        :param p: 0~100
+        :return: 该分位数所在桶的上界（毫秒，不超过最大值），没有样本时返回 0
+        """
+        if not self.count:
+            return 0.0
+        i = int(np.searchsorted(np.cumsum(self.counts), self.count * p / 100.0))
+        if i >= len(self.edges):
+            return self.max
+        return min(float(self.edges[i]), self.max)
+
+
+class InputTrace:
+    """一次输入经过各阶段的时间点"""
+    __slots__ = ('source', 'name', 'captured_at', 'ended_at', 'recognized_at', 'dequeued_at', 'rendered_at')
+
+    def __init__(self, source, name, captured_at, ended_at, recognized_at, dequeued_at):
+        self.source = source
+        self.name = name
+        self.captured_at = captured_at
+        self.ended_at = ended_at  # 采集结束（语音结束）；其他输入与 captured_at 相同
+        self.recognized_at = recognized_at
+        self.dequeued_at = dequeued_at
+        self.rendered_at = None
+
+    def stages(self):
+        """各阶段耗时（毫秒），顺序与 STAGES 相同"""
+        return ((self.ended_at - self.captured_at) * 1000,
+                (self.recognized_at - self.ended_at) * 1000,
+                (self.dequeued_at - self.recognized_at) * 1000,
+                (self.rendered_at - self.dequeued_at) * 1000,
+                (self.rendered_at - self.captured_at) * 1000)
+
+
+class LatencyTracker:
+    """
+    收集输入延迟
+    游戏在把输入作用到玩家时调用 record()，在每帧提交到屏幕后调用 frame_presented()
+    """
+
+    def __init__(self, history=HISTORY):
+        self.pending = []  # 已经作用、还没显示出来的输入
+        self.traces = deque(maxlen=history)
+        self.histograms = {}  # (来源, 阶段) -> LatencyHistogram
+        self.version = 0  # 每完成一批记录加一，用于判断显示是否需要刷新
+
+    def record(self, source, name, captured_at, recognized_at=None, dequeued_at=None, ended_at=None):
+        """
+        记录一次已经作用到玩家的输入
+        :param source: 输入来源，如 'keyboard'、'voice'、'sound'
+        :param name: 输入对应的动作，如 'jump'
+        :param captured_at: 采集时间；缺省的后续时间点视为与前一个时间点相同
+        """
+        if ended_at is None:
+            ended_at = captured_at
+        if recognized_at is None:
+            recognized_at = ended_at
+        if dequeued_at is None:
+            dequeued_at = time.perf_counter()
+        self.pending.append(InputTrace(source, name, captured_at, ended_at, recognized_at, dequeued_at))
+
+    def frame_presented(self, now=None):
+        """一帧已经提交到屏幕，之前作用的所有输入都在这一帧第一次显示出来"""
+        if not self.pending:
+            return
+        if now is None:
+            now = time.perf_counter()
+        for trace in self.pending:
+            trace.rendered_at = now
+            for stage, ms in zip(STAGES, trace.stages()):
+                self.histogram(trace.source, stage).add(ms)
+            self.traces.append(trace)
+        self.pending.clear()
+        self.version += 1
+
+    def histogram(self, source, stage):
+        key = (source, stage)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        return histogram
+
+    def summary(self, stages=STAGES, percentiles=PERCENTILES):
+        """
+        :return: 每个来源、每个阶段一行的文字摘要，如 "voice total n=12 p50=310.0 p90=... max=..."
+        """
+        lines = []
+        for source in sorted({source for source, _ in self.histograms}):
+            for stage in stages:
+                histogram = self.histograms.get((source, stage))
+                if histogram is None or not histogram.count:
+                    continue
+                values = ' '.join(f'p{p}={histogram.percentile(p):.1f}' for p in percentiles)
+                lines.append(f'{source} {stage} n={histogram.count} {values} max={histogram.max:.1f}ms')
+        return lines
+
+    def export_csv(self, path):
+        """
+        把保留的每条记录写入 CSV，时间点以秒为单位，各阶段耗时以毫秒为单位
+        :return: 写入的记录数
+        """
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['source', 'name', 'captured_at', 'ended_at', 'recognized_at', 'dequeued_at',
+                             'rendered_at'] + [f'{stage}_ms' for stage in STAGES])
+            for trace in self.traces:
+                writer.writerow([trace.source, trace.name, trace.captured_at, trace.ended_at, trace.recognized_at,
+                                 trace.dequeued_at, trace.rendered_at]
+                                + [f'{ms:.3f}' for ms in trace.stages()])
+        return len(self.traces)
+
+
+class LatencyOverlay:
+    """
+    在屏幕上显示延迟分位数，文字只在有新记录时重新渲染
+    :param tracker: LatencyTracker
+    :param font: pygame.font.Font
+    """
+
+    def __init__(self, tracker, font, color=(255, 255, 0)):
+        self.tracker = tracker
+        self.font = font
+        self.color = color
+        self.visible = False
+        self.surfaces = []
+        self.version = -1
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, renderer, pos=(10, 90)):
+        """
+        通过 DirtyRenderer 绘制
+        :param pos: 第一行的左上角
+        """
+        if not self.visible:
+            return
+        if self.version != self.tracker.version:
+            lines = self.tracker.summary() or ['latency: no input yet']
+            self.surfaces = [self.font.render(line, True, self.color) for line in lines]
+            self.version = self.tracker.version
+        x, y = pos
+        for surface in self.surfaces:
+            renderer.blit(surface, (x, y))
+            y += surface.get_height()
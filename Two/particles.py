@@ -0,0 +1,109 @@
+"""
+基于 NumPy 的粒子系统
+
+粒子按“数组结构”存放在固定容量的数组里（位置、速度、寿命、颜色），
+更新和压缩都是批量的数组运算，绘制时用预先渲染好的圆点贴图配合 Surface.blits 一次提交。
+"""
+import numpy as np
+import pygame
+
+DUST_COLOR = (200, 200, 200)
+EXPLOSION_COLOR = (255, 100, 0)
+PARTICLE_RADIUS = 2
+ALPHA_LEVELS = 16  # 透明度分级数，每个颜色预渲染这么多张圆点贴图
+
+
+class ParticleSystem:
+    """
+    固定容量的粒子系统
+    :param capacity: 最多同时存在的粒子数，超出的新粒子会被丢弃
+    :param seed: 随机数种子
+    """
+
+    def __init__(self, capacity=4096, seed=None):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.intp)
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        self.palette = []
+        self.stamps = []  # 下标为 颜色序号 * ALPHA_LEVELS + 透明度等级
+
+    def color_index(self, color):
+        """返回颜色在调色板中的序号，新颜色会预渲染一组圆点贴图"""
+        color = tuple(color)
+        if color in self.palette:
+            return self.palette.index(color)
+        self.palette.append(color)
+        size = PARTICLE_RADIUS * 2 + 1
+        for level in range(ALPHA_LEVELS):
+            alpha = int(255 * (level + 1) / ALPHA_LEVELS)
+            stamp = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(stamp, (*color, alpha), (PARTICLE_RADIUS, PARTICLE_RADIUS), PARTICLE_RADIUS)
+            self.stamps.append(stamp)
+        return len(self.palette) - 1
+
+    def emit(self, x, y, vx, vy, color):
+        """批量发射粒子，vx/vy 为等长数组"""
+        n = min(len(vx), self.capacity - self.count)
+        if n <= 0:
+            return 0
+        start, end = self.count, self.count + n
+        self.pos[start:end, 0] = x
+        self.pos[start:end, 1] = y
+        self.vel[start:end, 0] = vx[:n]
+        self.vel[start:end, 1] = vy[:n]
+        self.life[start:end] = 1.0
+        self.color[start:end] = self.color_index(color)
+        self.count = end
+        return n
+
+    def create_dust(self, x, y, count=5):
+        vx = self.rng.uniform(-2, 2, count)
+        vy = self.rng.uniform(0, 2, count)
+        return self.emit(x, y, vx, vy, DUST_COLOR)
+
+    def create_explosion(self, x, y, count=10):
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        speed = self.rng.uniform(2, 5, count)
+        return self.emit(x, y, np.cos(angle) * speed, np.sin(angle) * speed, EXPLOSION_COLOR)
+
+    def update(self, dt):
+        n = self.count
+        if n == 0:
+            return
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= dt
+
+        # 压缩：把仍然存活的粒子挪到数组前部
+        alive = self.life[:n] > 0
+        k = int(np.count_nonzero(alive))
+        if k < n:
+            self.pos[:k] = self.pos[:n][alive]
+            self.vel[:k] = self.vel[:n][alive]
+            self.life[:k] = self.life[:n][alive]
+            self.color[:k] = self.color[:n][alive]
+            self.count = k
+
+    def clear(self):
+        self.count = 0
+
+    def draw(self, surface):
+        """绘制所有粒子，返回覆盖它们的矩形（没有粒子时返回 None）"""
+        n = self.count
+        if n == 0:
+            return None
+        level = np.minimum((self.life[:n] * ALPHA_LEVELS).astype(np.intp), ALPHA_LEVELS - 1)
+        stamp_ids = (self.color[:n] * ALPHA_LEVELS + level).tolist()
+        topleft = (self.pos[:n] - PARTICLE_RADIUS).astype(np.intp).tolist()
+        stamps = self.stamps
+        surface.blits([(stamps[i], p) for i, p in zip(stamp_ids, topleft)], False)
+        xy = self.pos[:n]
+        left, top = (xy.min(axis=0) - PARTICLE_RADIUS).astype(int)
+        right, bottom = (xy.max(axis=0) + PARTICLE_RADIUS + 1).astype(int)
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,66 @@
+"""
+对象池
+
+障碍物、金币等实体在生成/消失时不再新建和丢弃对象，而是从池中取出、重置后复用，
+离开屏幕后放回池中，避免游戏过程中频繁分配对象和 Surface。
+池中的对象需要实现 reset(*args) 方法。
+"""
+
+
+class Pool:
+    """
+    单一类型的对象池
+    :param factory: 创建新对象的无参可调用对象
+    :param size: 预先分配的对象数量
+    """
+
+    def __init__(self, factory, size=0):
+        self.factory = factory
+        self.free = [factory() for _ in range(size)]
+        self.created = size  # 共创建过的对象数
+        self.reused = 0  # 从池中复用的次数
+        self.active = 0  # 当前在用的对象数
+
+    def acquire(self, *args):
+        """取出一个对象并用 args 重置；池空时新建"""
+        if self.free:
+            obj = self.free.pop()
+            self.reused += 1
+        else:
+            obj = self.factory()
+            self.created += 1
+        obj.reset(*args)
+        self.active += 1
+        return obj
+
+    def release(self, obj):
+        """把对象放回池中"""
+        self.free.append(obj)
+        self.active -= 1
+
+    def stats(self):
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'active': self.active,
+            'free': len(self.free),
+        }
+
+
+class EntityFactory:
+    """
+    按类型管理多个对象池
+    :param pools: 类型名 -> Pool
+    """
+
+    def __init__(self, pools):
+        self.pools = pools
+
+    def spawn(self, kind, *args):
+        return self.pools[kind].acquire(*args)
+
+    def despawn(self, kind, obj):
+        self.pools[kind].release(obj)
+
+    def stats(self):
+        return {kind: pool.stats() for kind, pool in self.pools.items()}
@@ -0,0 +1,226 @@
+"""
+逐帧的分阶段性能分析
+
+用 `with profiler.scope('名字'):` 包住需要计时的代码，可以嵌套。每帧的各段耗时写进固定大小的
+环形缓冲区（只保留最近若干帧），可以在屏幕上显示为堆叠柱状图，也可以导出为 Chrome
+trace-event JSON（在 chrome://tracing 或 Perfetto 中打开）。
+关闭时 scope() 返回一个什么都不做的共享对象，几乎没有开销。
+"""
+import json
+import time
+
+import numpy as np
+import pygame
+
+FRAMES = 300  # 环形缓冲区保存的帧数
+MAX_SCOPES = 64  # 最多能区分的段名数
+GRAPH_HEIGHT = 100  # 柱状图高度（像素）
+GRAPH_SCALE = 3.0  # 每毫秒多少像素，16.7ms 约为 50 像素
+GRAPH_COLORS = [(230, 80, 80), (80, 200, 80), (80, 140, 240), (240, 200, 60),
+                (200, 90, 220), (60, 210, 210), (240, 140, 60), (160, 160, 160)]
+
+
+class _NullScope:
+    """关闭时使用的空计时段"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    """一个命名计时段，同名的段复用同一个对象，进入和退出时不分配内存（记录事件除外）"""
+    __slots__ = ('profiler', 'name', 'column', 'start', 'depth')
+
+    def __init__(self, profiler, name, column):
+        self.profiler = profiler
+        self.name = name
+        self.column = column
+        self.start = 0.0
+        self.depth = 0
+
+    def __enter__(self):
+        profiler = self.profiler
+        self.depth = profiler.depth
+        profiler.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        profiler = self.profiler
+        profiler.depth -= 1
+        duration = end - self.start
+        profiler.durations[profiler.row, self.column] += duration * 1000
+        profiler.events[profiler.row].append((self.column, self.start, duration, self.depth))
+        return False
+
+
+class FrameProfiler:
+    """
+    :param frames: 环形缓冲区保存的帧数
+    :param enabled: 是否开始就记录
+    """
+
+    def __init__(self, frames=FRAMES, enabled=False):
+        self.frames = frames
+        self.enabled = enabled
+        self.toggle_pending = False  # 开关请求，等到下一次 begin_frame 才生效
+        self.names = []  # 列号 -> 段名
+        self.scopes = {}  # 段名 -> _Scope
+        self.durations = np.zeros((frames, MAX_SCOPES))  # 每帧每段的累计耗时（毫秒）
+        self.frame_times = np.zeros(frames)  # 每帧从 begin_frame 到 end_frame 的耗时（毫秒）
+        self.frame_starts = np.zeros(frames)
+        self.events = [[] for _ in range(frames)]  # 每帧的 (列号, 开始时间, 耗时, 嵌套深度)
+        self.frame = 0  # 已记录的帧数
+        self.row = 0  # 当前帧在环形缓冲区中的行
+        self.depth = 0
+        self.origin = time.perf_counter()  # trace 的时间零点
+
+    def toggle(self):
+        """开关记录；在帧中间按下时从下一帧开始（或在本帧结束后停止），不会记录半帧"""
+        self.toggle_pending = not self.toggle_pending
+
+    def scope(self, name):
+        """
+        :param name: 段名，如 'update' 或 'draw.particles'
+        :return: 用于 with 语句的计时段
+        """
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            if len(self.names) >= MAX_SCOPES:
+                return _NULL_SCOPE
+            scope = self.scopes[name] = _Scope(self, name, len(self.names))
+            self.names.append(name)
+        return scope
+
+    def begin_frame(self):
+        if self.toggle_pending:
+            self.enabled = not self.enabled
+            self.toggle_pending = False
+        if not self.enabled:
+            return
+        self.row = row = self.frame % self.frames
+        self.durations[row] = 0
+        self.events[row].clear()
+        self.frame_starts[row] = time.perf_counter()
+        self.depth = 0
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        row = self.row
+        self.frame_times[row] = (time.perf_counter() - self.frame_starts[row]) * 1000
+        self.frame += 1
+
+    def recent(self):
+        """按时间顺序返回环形缓冲区中已记录帧的行号"""
+        count = min(self.frame, self.frames)
+        start = self.frame - count
+        return [(start + i) % self.frames for i in range(count)]
+
+    def summary(self):
+        """
+        :return: 段名 -> (平均毫秒, 最大毫秒)，按最近记录的帧统计
+        """
+        rows = self.recent()
+        if not rows:
+            return {}
+        table = self.durations[rows, :len(self.names)]
+        return {name: (float(table[:, i].mean()), float(table[:, i].max())) for i, name in enumerate(self.names)}
+
+    def dump_trace(self, path):
+        """
+        把环形缓冲区中的帧导出为 Chrome trace-event JSON
+        :return: 导出的帧数
+        """
+        trace = []
+        rows = self.recent()
+        for row in rows:
+            trace.append({'name': 'frame', 'ph': 'X', 'pid': 0, 'tid': 0,
+                          'ts': (self.frame_starts[row] - self.origin) * 1e6, 'dur': self.frame_times[row] * 1000})
+            for column, start, duration, depth in self.events[row]:
+                trace.append({'name': self.names[column], 'ph': 'X', 'pid': 0, 'tid': 0,
+                              'ts': (start - self.origin) * 1e6, 'dur': duration * 1e6, 'args': {'depth': depth}})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        return len(rows)
+
+
+class ProfilerOverlay:
+    """
+    最近各帧的堆叠柱状图（只画没有嵌套的顶层段）和各段平均耗时
+    图像每帧只向左滚动一列并画出新的一列，不重画整张图
+    :param profiler: FrameProfiler
+    :param font: 图例使用的字体
+    """
+
+    def __init__(self, profiler, font):
+        self.profiler = profiler
+        self.font = font
+        self.graph = pygame.Surface((profiler.frames, GRAPH_HEIGHT))
+        self.graph.set_alpha(200)
+        self.drawn = 0  # 已画进图像的帧数
+        self.legend = []
+        self.legend_frame = -1
+
+    @property
+    def visible(self):
+        return self.profiler.enabled
+
+    def _draw_column(self, row):
+        profiler = self.profiler
+        graph = self.graph
+        x = graph.get_width() - 1
+        graph.scroll(-1, 0)
+        graph.fill((0, 0, 0), (x, 0, 1, GRAPH_HEIGHT))
+        y = GRAPH_HEIGHT
+        for column, _, duration, depth in profiler.events[row]:
+            if depth:
+                continue
+            height = int(duration * 1000 * GRAPH_SCALE)
+            if height:
+                y -= height
+                graph.fill(GRAPH_COLORS[column % len(GRAPH_COLORS)], (x, y, 1, height))
+        # 60 FPS 的帧预算线
+        graph.set_at((x, GRAPH_HEIGHT - int(1000 / 60 * GRAPH_SCALE)), (255, 255, 255))
+
+    def draw(self, renderer, pos=(10, 10)):
+        """
+        通过 DirtyRenderer 绘制
+        :param pos: 图像左上角
+        """
+        profiler = self.profiler
+        if not profiler.enabled:
+            return
+        # 只画上次之后新记录的帧（跳过已经被环形缓冲区覆盖的部分）
+        first = max(self.drawn, profiler.frame - profiler.frames)
+        for frame in range(first, profiler.frame):
+            self._draw_column(frame % profiler.frames)
+        if first < profiler.frame:
+            renderer.refresh(self.graph)
+        self.drawn = profiler.frame
+
+        if profiler.frame - self.legend_frame >= 30:  # 图例每 30 帧刷新一次
+            self.legend = []
+            for i, (name, (mean, peak)) in enumerate(profiler.summary().items()):
+                color = GRAPH_COLORS[i % len(GRAPH_COLORS)]
+                self.legend.append(self.font.render(f'{name} {mean:.2f} / {peak:.2f}ms', True, color))
+            self.legend_frame = profiler.frame
+
+        x, y = pos
+        renderer.blit(self.graph, (x, y))
+        y += GRAPH_HEIGHT
+        for surface in self.legend:
+            renderer.blit(surface, (x, y))
+            y += surface.get_height()
+
+
+profiler = FrameProfiler()
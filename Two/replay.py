@@ -0,0 +1,184 @@
+"""
+输入录制与回放
+
+两个游戏的模拟都以固定步长推进，随机数只来自带种子的生成器，因此只要记下种子和
+“第几步作用了什么输入”，就能完全复现一局游戏。录像文件是紧凑的二进制格式：
+
+    文件头  magic(4s) 版本(B) 游戏(B) 种子(q) 步长(d)
+    记录    步号(I) 动作(B) 来源(B) 强度(d)，每条 14 字节
+    结束    动作为 END 的记录，步号为总步数，强度字段保存最终得分
+
+回放时在同一步作用同样的输入即可得到同样的结果。可以带画面按实时速度回放，
+也可以不绘制、以最快速度批量回放来检查行为和性能：
+
+    python replay.py replays/*.rpl
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+
+from input_bus import InputEvent
+
+MAGIC = b'RRPL'
+VERSION = 1
+HEADER = struct.Struct('<4sBBqd')
+RECORD = struct.Struct('<IBBd')
+REPLAY_DIR = 'replays'
+
+GAMES = ('runner_game', 'sound_runner')
+ACTIONS = ('jump', 'slide', 'start', 'double_jump')
+SOURCES = ('keyboard', 'voice', 'sound')
+END = 255  # 结束记录的动作编号
+
+# 一局录像的结束信息：总步数和最终得分
+SessionEnd = namedtuple('SessionEnd', ['ticks', 'score'])
+
+
+class ReplayError(Exception):
+    pass
+
+
+class ReplayWriter:
+    """
+    边玩边写录像
+    :param path: 录像文件路径，所在目录不存在时会创建
+    :param game: GAMES 中的游戏名
+    :param seed: 本局的随机数种子
+    :param step: 模拟步长（秒）
+    """
+
+    def __init__(self, path, game, seed, step):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, GAMES.index(game), seed, step))
+        self.count = 0
+
+    def record(self, tick, event):
+        """
+        记录在第 tick 步之前作用的输入
+        :param event: InputEvent
+        """
+        if event.action not in ACTIONS:
+            return
+        source = SOURCES.index(event.source) if event.source in SOURCES else 0
+        self.file.write(RECORD.pack(tick, ACTIONS.index(event.action), source, event.strength))
+        self.count += 1
+
+    def close(self, ticks, score):
+        """写入结束记录并关闭文件"""
+        if self.file is None:
+            return
+        self.file.write(RECORD.pack(ticks, END, 0, score))
+        self.file.close()
+        self.file = None
+
+
+class Replay:
+    """
+    读入的录像
+    :param game: 游戏名
+    :param seed: 随机数种子
+    :param step: 模拟步长
+    :param inputs: (步号, InputEvent) 按步号排列的列表
+    :param end: SessionEnd，录制中途退出（没有结束记录）时为 None
+    """
+
+    def __init__(self, game, seed, step, inputs, end):
+        self.game = game
+        self.seed = seed
+        self.step = step
+        self.inputs = inputs
+        self.end = end
+        self.cursor = 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ReplayError(f"{path}: 文件太短")
+        magic, version, game, seed, step = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError(f"{path}: 不是可识别的录像文件")
+        inputs = []
+        end = None
+        usable = len(data) - (len(data) - HEADER.size) % RECORD.size  # 忽略写到一半的记录
+        for tick, action, source, strength in RECORD.iter_unpack(data[HEADER.size:usable]):
+            if action == END:
+                end = SessionEnd(tick, int(strength))
+                break
+            inputs.append((tick, InputEvent(ACTIONS[action], SOURCES[source], None, strength)))
+        return cls(GAMES[game], seed, step, inputs, end)
+
+    @property
+    def ticks(self):
+        """需要回放的步数：有结束记录时为总步数，否则到最后一个输入为止"""
+        if self.end is not None:
+            return self.end.ticks
+        return self.inputs[-1][0] if self.inputs else 0
+
+    def due(self, tick):
+        """逐个取出应在第 tick 步之前作用的输入"""
+        inputs = self.inputs
+        while self.cursor < len(inputs) and inputs[self.cursor][0] <= tick:
+            yield inputs[self.cursor][1]
+            self.cursor += 1
+
+
+class NullVoice:
+    """回放时代替 VoiceController，不产生任何命令"""
+
+    def get_next_command(self):
+        return None
+
+    def stop(self):
+        pass
+
+
+def session_path(game):
+    """按时间生成录像文件路径"""
+    return os.path.join(REPLAY_DIR, f"{game}_{time.strftime('%Y%m%d_%H%M%S')}.rpl")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="以最快速度回放录像，检查结果是否与录制时一致")
+    parser.add_argument('paths', nargs='+', help="录像文件")
+    parser.add_argument('--render', action='store_true', help="带画面按实时速度回放")
+    args = parser.parse_args()
+    if not args.render:
+        # 不绘制时使用无窗口的驱动
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    mismatches = 0
+    for path in args.paths:
+        replay = Replay.load(path)
+        if replay.game == 'runner_game':
+            import runner_game as module
+        else:
+            import sound_runner as module
+        start = time.perf_counter()
+        ticks, score = module.replay_session(replay, render=args.render)
+        wall = time.perf_counter() - start
+        if replay.end is None:
+            status = "无结束记录"
+        elif (ticks, score) == tuple(replay.end):
+            status = "一致"
+        else:
+            status = f"不一致（录制时 {replay.end.ticks} 步、得分 {replay.end.score}）"
+            mismatches += 1
+        print(f"{path}: {replay.game} {ticks} 步，得分 {score}，{len(replay.inputs)} 个输入，"
+              f"耗时 {wall:.2f} 秒（{ticks / max(wall, 1e-9):.0f} 步/秒），{status}")
+    if mismatches:
+        print(f"{mismatches} 个录像的回放结果与录制时不一致", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+"""
+跑酷游戏的无界面模拟核心
+
+只包含玩家物理、障碍物/金币生成、难度、碰撞和计分，不打开窗口、不启动麦克风。
+随机数使用可设定种子的 random.Random，障碍物和金币按游戏时间由 spawner.SpawnScheduler 预先排好，
+因此可以在 CI 中以远超实时的速度推进游戏，用于回归和平衡性测试。
+"""
+import random
+import time
+
+import pygame
+
+from collision import ScrollIndex
+from pooling import EntityFactory, Pool
+from spawner import DifficultyCurve, SpawnScheduler, SpawnStream, polled_interval
+
+# 游戏常量
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+FPS = 60
+GRAVITY = 0.8
+JUMP_FORCE = -15
+SCROLL_SPEED = 5
+OBSTACLE_SPAWN_RANGE = (2, 4)  # 障碍物生成间隔（秒），按原来每帧重抽的规则平均约 2.2 秒
+COIN_SPAWN_INTERVAL = 3  # 金币生成间隔（秒）
+COIN_SCORE = 50  # 每个金币的加分
+INVINCIBILITY_DURATION = 1.0  # 无敌时间（秒）
+DIFFICULTY_INTERVAL = 30  # 难度提升间隔（秒）
+SPEED_INCREASE = 0.1  # 速度增加比例
+SPACING_DECREASE = 0.05  # 每提升一级障碍物生成间隔缩短的比例
+MIN_SPACING = 0.5  # 生成间隔最多缩短到原来的一半
+GROUND_Y = SCREEN_HEIGHT - 50  # 地面高度
+
+PLAYER_X = 100
+PLAYER_SIZE = (50, 50)
+OBSTACLE_SIZE = (30, 50)
+COIN_SIZE = (20, 20)
+POOL_SIZE = 16  # 每类实体预分配的数量
+JUMP_AIRTIME = 2 * -JUMP_FORCE / GRAVITY / FPS  # 一次跳跃的滞空时间（秒）
+MIN_OBSTACLE_GAP = JUMP_AIRTIME + 0.2  # 相邻障碍物到达玩家的最小间隔：落地后还有反应时间
+
+
+class PlayerBody:
+    """玩家的物理状态，规则与原 Player.update/jump/slide 一致"""
+
+    def __init__(self):
+        self.rect = pygame.Rect(PLAYER_X, SCREEN_HEIGHT - 100, *PLAYER_SIZE)
+        self.prev_pos = self.rect.topleft  # 上一步的位置，用于绘制插值
+        self.velocity_y = 0
+        self.jumping = False
+        self.double_jump_available = False
+        self.sliding = False
+        self.slide_timer = 0
+        self.slide_duration = 0.5
+        self.invincible = False
+        self.invincibility_timer = 0
+        self.original_height = PLAYER_SIZE[1]
+        self.facing_right = True
+
+    def update(self, dt):
+        self.prev_pos = self.rect.topleft
+
+        # 重力效果
+        self.velocity_y += GRAVITY
+        self.rect.y += self.velocity_y
+
+        # 地面碰撞检测
+        if self.rect.bottom > GROUND_Y:
+            self.rect.bottom = GROUND_Y
+            self.velocity_y = 0
+            self.jumping = False
+            self.double_jump_available = True
+            self.sliding = False
+
+        # 滑行状态更新
+        if self.sliding:
+            self.slide_timer += dt
+            if self.slide_timer >= self.slide_duration:
+                self.sliding = False
+                self.slide_timer = 0
+                self.rect.height = self.original_height
+
+        # 无敌状态更新
+        if self.invincible:
+            self.invincibility_timer += dt
+            if self.invincibility_timer >= INVINCIBILITY_DURATION:
+                self.invincible = False
+                self.invincibility_timer = 0
+
+    def jump(self):
+        if not self.jumping:
+            self.velocity_y = JUMP_FORCE
+            self.jumping = True
+            self.facing_right = True
+        elif self.double_jump_available:
+            self.velocity_y = JUMP_FORCE * 0.8
+            self.double_jump_available = False
+
+    def slide(self):
+        if not self.jumping and not self.sliding:
+            self.sliding = True
+            self.slide_timer = 0
+            self.rect.height = 25
+            self.invincible = True
+            self.invincibility_timer = 0
+
+
+class Body:
+    """障碍物或金币的纯数据表示，由对象池复用"""
+    __slots__ = ('kind', 'rect', 'prev_pos', 'speed', 'alive')
+
+    def __init__(self, kind, size):
+        self.kind = kind
+        self.rect = pygame.Rect(0, 0, *size)
+        self.prev_pos = (0, 0)
+        self.speed = 0
+        self.alive = False
+
+    def reset(self, x, y, speed):
+        self.rect.x = x
+        self.rect.y = y
+        self.prev_pos = self.rect.topleft
+        self.speed = speed
+        self.alive = True
+
+    def update(self):
+        self.prev_pos = self.rect.topleft
+        self.rect.x -= self.speed
+        if self.rect.right < 0:
+            self.alive = False
+
+
+class Simulation:
+    """
+    无界面的游戏模拟
+    :param seed: 随机数种子，相同种子和相同输入得到相同结果
+    """
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.elapsed = 0.0
+        self.player = PlayerBody()
+        # 障碍物和金币按滚动顺序保存，碰撞只检测与玩家 x 范围重叠的部分
+        self.obstacles = ScrollIndex(OBSTACLE_SIZE[0])
+        self.coins = ScrollIndex(COIN_SIZE[0])
+        self.coin_hits = []
+        self.events = []
+        self.entities = EntityFactory({
+            'obstacle': Pool(lambda: Body('obstacle', OBSTACLE_SIZE), POOL_SIZE),
+            'coin': Pool(lambda: Body('coin', COIN_SIZE), POOL_SIZE),
+        })
+        # 实体生成/回收时的回调，供显示层同步精灵
+        self.on_spawn = None
+        self.on_despawn = None
+        # 可选的精确碰撞检测 hit_test(obstacle)，只在矩形相交时调用
+        self.hit_test = None
+        self.score = 0
+        self.coin_bonus = 0
+        self.game_over = False
+        self.game_started = False
+        self.difficulty = DifficultyCurve(DIFFICULTY_INTERVAL, SPEED_INCREASE, SPACING_DECREASE, MIN_SPACING)
+        self.spawner = make_spawner(self.rng, self.difficulty)
+        self.current_speed = SCROLL_SPEED
+        self.game_time = 0
+
+    def start(self):
+        """开始（或重新开始）一局，返回是否真正开始了新的一局"""
+        if self.game_started and not self.game_over:
+            return False
+        self.game_started = True
+        self.game_over = False
+        self.score = 0
+        self.coin_bonus = 0
+        self.obstacles.clear(self.release)
+        self.coins.clear(self.release)
+        self.spawner.reset()
+        self.current_speed = SCROLL_SPEED * self.difficulty.speed(self.difficulty.level(0))
+        self.game_time = 0
+        return True
+
+    def reset(self, seed=None):
+        """
+        回到刚创建、尚未开始时的状态，之后的结果与新建的 Simulation(seed) 相同
+        场上的实体放回对象池，对象池、索引和生成计划都继续复用
+        :param seed: 新的随机数种子
+        """
+        self.seed = seed
+        self.rng.seed(seed)
+        self.elapsed = 0.0
+        self.player = PlayerBody()
+        self.obstacles.clear(self.release)
+        self.coins.clear(self.release)
+        self.score = 0
+        self.coin_bonus = 0
+        self.game_over = False
+        self.game_started = False
+        self.spawner.reset()
+        self.current_speed = SCROLL_SPEED
+        self.game_time = 0
+
+    def jump(self):
+        self.player.jump()
+
+    def slide(self):
+        self.player.slide()
+
+    def spawn(self, kind, bodies, x, y, speed):
+        """从对象池取出实体并加入索引"""
+        body = self.entities.spawn(kind, x, y, speed)
+        bodies.append(body)
+        if self.on_spawn is not None:
+            self.on_spawn(body)
+        return body
+
+    def release(self, body):
+        """把实体放回对象池"""
+        body.alive = False
+        self.entities.despawn(body.kind, body)
+        if self.on_despawn is not None:
+            self.on_despawn(body)
+
+    def remove_dead(self, bodies):
+        """原地移除已失效的实体并放回对象池"""
+        bodies.compact(self.release)
+
+    def spawn_due(self):
+        """生成计划中已经到时间的实体"""
+        now = self.game_time
+        for entry in self.spawner.due(now):
+            bodies = self.obstacles if entry.kind == 'obstacle' else self.coins
+            self.spawn(entry.kind, bodies, spawn_x(entry, now), entry.y, entry.speed)
+        self.current_speed = SCROLL_SPEED * self.difficulty.speed(self.difficulty.level(now))
+
+    def step(self, dt):
+        """
+        推进一个模拟步
+        :param dt: 本步的时长（秒）
+        :return: 本步产生的事件列表，元素为 (类型, x, y)，类型为 'coin' 或 'crash'
+        """
+        self.elapsed += dt
+        events = self.events
+        events.clear()
+
+        self.player.update(dt)
+        for body in self.obstacles:
+            body.update()
+        for body in self.coins:
+            body.update()
+        self.remove_dead(self.obstacles)
+        self.remove_dead(self.coins)
+
+        if not self.game_over and self.game_started:
+            # 每1秒加10分，金币分数单独累计
+            self.game_time += dt
+            self.score = int(self.game_time * 10) + self.coin_bonus
+
+            # 生成计划中到时间的障碍物和金币
+            self.spawn_due()
+
+            # 收集金币
+            player_rect = self.player.rect
+            coin_hits = self.coins.query(player_rect, self.coin_hits)
+            if coin_hits:
+                for coin in coin_hits:
+                    coin.alive = False
+                    self.coin_bonus += COIN_SCORE
+                    self.score += COIN_SCORE
+                    events.append(('coin', coin.rect.centerx, coin.rect.centery))
+                self.remove_dead(self.coins)
+
+            # 碰撞检测（考虑无敌状态）
+            if (not self.player.invincible
+                    and self.obstacles.first_hit(player_rect, self.hit_test) is not None):
+                self.game_over = True
+                events.append(('crash', player_rect.centerx, player_rect.centery))
+        return events
+
+    def run(self, duration, dt=1.0 / FPS, policy=None):
+        """
+        以固定步长连续推进 duration 秒的游戏时间
+        :param policy: 每步调用一次的 policy(sim)，可在其中调用 jump/slide/start
+        :return: 实际推进的步数
+        """
+        steps = int(round(duration / dt))
+        for _ in range(steps):
+            if policy is not None:
+                policy(self)
+            self.step(dt)
+        return steps
+
+
+def make_spawner(rng, difficulty):
+    """
+    障碍物和金币的生成计划：按游戏时间预先排好，相邻障碍物之间保证来得及跳过
+    :param rng: 只供生成计划使用的 random.Random
+    :param difficulty: DifficultyCurve
+    """
+    def obstacle_interval(rng, level):
+        # 与原来每帧重新抽间隔时的生成密度相同
+        return polled_interval(rng, *OBSTACLE_SPAWN_RANGE, FPS) * difficulty.spacing(level)
+
+    def make_obstacle(rng, level):
+        # 障碍物立在地面上（底边为 GROUND_Y），不跳就会撞上
+        return 'obstacle', GROUND_Y - OBSTACLE_SIZE[1], SCROLL_SPEED * difficulty.speed(level)
+
+    def coin_interval(rng, level):
+        return COIN_SPAWN_INTERVAL
+
+    def make_coin(rng, level):
+        return 'coin', rng.randint(SCREEN_HEIGHT - 200, SCREEN_HEIGHT - 100), SCROLL_SPEED
+
+    return SpawnScheduler(rng, [
+        SpawnStream(obstacle_interval, make_obstacle, True),
+        SpawnStream(coin_interval, make_coin, False),
+    ], difficulty, MIN_OBSTACLE_GAP, SCREEN_WIDTH - PLAYER_X - PLAYER_SIZE[0], FPS)
+
+
+def spawn_x(entry, now):
+    """计划条目在 now 才生成时的 x 坐标：放到按计划时间出现的话已经移动到的位置"""
+    return SCREEN_WIDTH - int((now - entry.time) * FPS * entry.speed)
+
+
+def auto_jump_policy(sim, distance=60):
+    """简单的自动玩家：未开始或结束时重新开始，最近的障碍物进入距离内时跳跃"""
+    if not sim.game_started or sim.game_over:
+        sim.start()
+        return
+    player_rect = sim.player.rect
+    for obstacle in sim.obstacles:
+        gap = obstacle.rect.left - player_rect.right
+        if 0 <= gap <= distance:
+            sim.jump()
+            break
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="无界面运行跑酷模拟")
+    parser.add_argument('--seconds', type=float, default=3600, help="模拟的游戏时间（秒）")
+    parser.add_argument('--seed', type=int, default=0, help="随机数种子")
+    args = parser.parse_args()
+
+    sim = Simulation(seed=args.seed)
+    deaths = 0
+
+    def policy(s):
+        nonlocal deaths
+        if s.game_over:
+            deaths += 1
+        auto_jump_policy(s)
+
+    start = time.perf_counter()
+    steps = sim.run(args.seconds, policy=policy)
+    wall = time.perf_counter() - start
+    print(f"模拟 {args.seconds:.0f} 游戏秒 / {steps} 步，耗时 {wall:.2f} 秒"
+          f"（{args.seconds / max(wall, 1e-9):.0f} 倍实时），死亡 {deaths} 次，最终得分 {sim.score}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,25 @@
 import pygame
-import random
 import sys
-import speech_recognition as sr
-import threading
-import queue
-import time
-import pygame_gui
 import os
+import random
+import time
 from pygame import mixer
-import math
-
-# 初始化Pygame
-pygame.init()
-pygame.mixer.init()
-
-# 游戏常量
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-FPS = 60
-GRAVITY = 0.8
-JUMP_FORCE = -15
-SCROLL_SPEED = 5
-OBSTACLE_SPAWN_RANGE = (2, 4)  # 障碍物生成间隔（秒）
-INVINCIBILITY_DURATION = 1.0  # 无敌时间（秒）
-DIFFICULTY_INTERVAL = 30  # 难度提升间隔（秒）
-SPEED_INCREASE = 0.1  # 速度增加比例
+
+from animation import Animation, Animator
+from assets import cache
+from collision import masks_overlap
+from dirty_render import DirtyRenderer
+from hud import HudText, atlas
+from input_bus import InputBus
+from latency import LatencyOverlay, LatencyTracker
+from particles import ParticleSystem
+from pooling import EntityFactory, Pool
+from profiler import ProfilerOverlay, profiler
+from replay import NullVoice, ReplayWriter, session_path
+from runner_core import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, OBSTACLE_SIZE, POOL_SIZE, Simulation
+from startup import StartupLoader
+from timestep import FixedTimestep, lerp_pos
+from voice import VoiceController
 
 # 颜色定义
 WHITE = (255, 255, 255)
@@ -35,148 +30,81 @@ BLUE = (0, 0, 255)
 GRAY = (128, 128, 128)
 YELLOW = (255, 255, 0)
 
-# 设置游戏窗口
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("2D跑酷游戏 - 语音控制版")
-clock = pygame.time.Clock()
-
-# 语音控制相关
-class VoiceController:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.command_queue = queue.Queue()
-        self.running = True
-        self.thread = None
+DIRTY_RENDERING = False  # 脏矩形渲染，适合低功耗设备
+TEXTURE_RENDERING = False  # 用 SDL2 纹理渲染（pygame._sdl2.video），关闭时在 Surface 上软件绘制
+SOFTWARE_RENDERER = False  # 纹理渲染使用 SDL 的软件渲染器，用于没有 GPU 的机器
+WINDOW_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)  # 纹理渲染时的窗口尺寸，画面按逻辑分辨率缩放
+LATENCY_CSV = 'latency.csv'  # 按 F4 导出输入延迟记录的文件
+PROFILE_TRACE = 'profile_trace.json'  # 按 F5 导出的 Chrome trace 文件
 
-    def start(self):
-        self.thread = threading.Thread(target=self._listen_loop)
-        self.thread.daemon = True
-        self.thread.start()
-
-    def stop(self):
-        self.running = False
-        if self.thread:
-            self.thread.join()
-
-    def _listen_loop(self):
-        with sr.Microphone() as source:
-            print("正在调整麦克风...")
-            self.recognizer.adjust_for_ambient_noise(source, duration=2)  # 增加环境噪音调整时间
-            print("麦克风已就绪！")
-
-            while self.running:
-                try:
-                    print("正在听...")
-                    # 增加超时时间和语音时长限制
-                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
-                    try:
-                        text = self.recognizer.recognize_google(audio, language='zh-CN')
-                        print(f"识别到: {text}")
-                        self._process_command(text)
-                    except sr.UnknownValueError:
-                        print("无法识别语音")
-                    except sr.RequestError as e:
-                        print(f"无法连接到Google语音识别服务: {e}")
-                except Exception as e:
-                    print(f"语音识别错误: {e}")
-                    time.sleep(0.5)  # 增加错误后的等待时间
-
-    def _process_command(self, text):
-        if "跳" in text:
-            self.command_queue.put("jump")
-        elif "蹲" in text:
-            self.command_queue.put("slide")
-        elif "开始" in text:
-            self.command_queue.put("start")
-        elif "二段跳" in text:
-            self.command_queue.put("double_jump")
-
-    def get_next_command(self):
-        try:
-            return self.command_queue.get_nowait()
-        except queue.Empty:
-            return None
+STARTED_AT = time.perf_counter()  # 启动计时的零点
+clock = pygame.time.Clock()
+texture_renderer = None  # 纹理渲染时的 TextureRenderer，由 init_display() 创建
+
+def init_display(texture=TEXTURE_RENDERING, software=SOFTWARE_RENDERER, window_size=WINDOW_SIZE):
+    """
+    初始化 Pygame 并创建游戏窗口（只在真正运行游戏时调用）
+    :param texture: 是否使用纹理渲染后端
+    :return: 用于绘制加载画面的 Surface，纹理渲染时是与窗口无关的画布，由 present() 显示
+    """
+    global texture_renderer
+    pygame.init()
+    pygame.mixer.init()
+    if texture_renderer is not None:
+        texture_renderer.close()
+        texture_renderer = None
+    if texture:
+        from texture_render import TextureRenderer
+
+        texture_renderer = TextureRenderer("2D跑酷游戏 - 语音控制版", (SCREEN_WIDTH, SCREEN_HEIGHT),
+                                           window_size, software)
+        return pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("2D跑酷游戏 - 语音控制版")
+    return screen
+
+def present(screen, rects=None):
+    """
+    显示 screen 上画好的内容（游戏画面之外的加载画面等）
+    :param rects: 只更新这些区域，为 None 时整屏更新
+    """
+    if texture_renderer is not None:
+        texture_renderer.present_surface(screen)
+    elif rects is None:
+        pygame.display.flip()
+    else:
+        pygame.display.update(rects)
 
 # 加载资源
 def load_image(name, scale=1):
-    try:
-        image = pygame.image.load(os.path.join('assets', name)).convert_alpha()
-        if scale != 1:
-            new_size = (int(image.get_width() * scale), int(image.get_height() * scale))
-            image = pygame.transform.scale(image, new_size)
-        return image
-    except:
-        # 如果找不到图片，创建一个占位图
-        surface = pygame.Surface((50, 50))
-        surface.fill(BLUE)
-        return surface
-
-class SpriteSheet:
-    def __init__(self, image, frame_width, frame_height, frames, duration):
-        self.sheet = image
-        self.frame_width = frame_width
-        self.frame_height = frame_height
-        self.frames = frames
-        self.duration = duration
-        self.current_frame = 0
-        self.animation_timer = 0
-        self.rect = pygame.Rect(0, 0, frame_width, frame_height)
-
-    def update(self, dt):
-        self.animation_timer += dt
-        if self.animation_timer >= self.duration / self.frames:
-            self.animation_timer = 0
-            self.current_frame = (self.current_frame + 1) % self.frames
-
-    def get_current_frame(self):
-        self.rect.x = self.current_frame * self.frame_width
-        return self.sheet.subsurface(self.rect)
-
-class ParticleSystem:
-    def __init__(self):
-        self.particles = []
-        self.emitters = []
-
-    def create_dust(self, x, y):
-        for _ in range(5):
-            particle = {
-                'x': x,
-                'y': y,
-                'vx': random.uniform(-2, 2),
-                'vy': random.uniform(0, 2),
-                'life': 1.0,
-                'color': (200, 200, 200)
-            }
-            self.particles.append(particle)
-
-    def create_explosion(self, x, y):
-        for _ in range(10):
-            angle = random.uniform(0, 2 * 3.14159)
-            speed = random.uniform(2, 5)
-            particle = {
-                'x': x,
-                'y': y,
-                'vx': math.cos(angle) * speed,
-                'vy': math.sin(angle) * speed,
-                'life': 1.0,
-                'color': (255, 100, 0)
-            }
-            self.particles.append(particle)
-
-    def update(self, dt):
-        for particle in self.particles[:]:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['life'] -= dt
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
-
-    def draw(self, surface):
-        for particle in self.particles:
-            alpha = int(particle['life'] * 255)
-            color = (*particle['color'], alpha)
-            pos = (int(particle['x']), int(particle['y']))
-            pygame.draw.circle(surface, color, pos, 2)
+    path = os.path.join('assets', name)
+    size = None
+    source_size = cache.source_size(path)
+    if source_size and scale != 1:
+        size = (int(source_size[0] * scale), int(source_size[1] * scale))
+    image = cache.image(path, size)
+    if image is None:
+        # 如果找不到图片，使用共享的占位图
+        image = cache.solid((50, 50), BLUE)
+    return image
+
+def load_player_animations():
+    """
+    从精灵图切出玩家的动画表（run/jump/slide），切片、缩放和镜像都由资源缓存只做一次
+    :return: 状态名 -> Animation
+    """
+    path = os.path.join('assets', 'player.png')
+
+    def frames(size=None, flip_x=False):
+        # 如果找不到精灵图，使用占位图
+        return cache.frames(path, (50, 50), 6, size, flip_x) or [load_image('player.png')]
+
+    run = Animation(frames(), 0.5, frames(flip_x=True))
+    return {
+        'run': run,
+        'jump': Animation(run.frames[:1], 0.5, run.mirrored[:1]),
+        'slide': Animation(frames((50, 25)), 0.5, frames((50, 25), True)),
+    }
 
 class ParallaxBackground:
     def __init__(self):
@@ -188,8 +116,10 @@ class ParallaxBackground:
             self.layers.append({
                 'surface': layer,
                 'speed': speed,
-                'x': 0
+                'x': 0,
+                'solid': True  # 纯色层滚动时画面不变
             })
+        self.snapshot = None
 
     def update(self):
         for layer in self.layers:
@@ -202,146 +132,188 @@ class ParallaxBackground:
             surface.blit(layer['surface'], (layer['x'], 0))
             surface.blit(layer['surface'], (layer['x'] + SCREEN_WIDTH, 0))
 
+    @property
+    def moving(self):
+        """是否有非纯色的层在滚动（此时画面每帧都会变化）"""
+        return any(layer['speed'] and not layer['solid'] for layer in self.layers)
+
+    def render(self):
+        """画面静止时返回缓存的整屏背景"""
+        if self.snapshot is None:
+            self.snapshot = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.draw(self.snapshot)
+        return self.snapshot
+
 class Player(pygame.sprite.Sprite):
-    def __init__(self):
+    """玩家的显示精灵，物理状态由 runner_core.PlayerBody 负责"""
+
+    def __init__(self, body):
         super().__init__()
-        # 加载角色精灵图
-        self.sprite_sheet = SpriteSheet(load_image('player.png'), 50, 50, 6, 0.5)
-        self.image = self.sprite_sheet.get_current_frame()
-        self.rect = self.image.get_rect()
-        self.rect.x = 100
-        self.rect.y = SCREEN_HEIGHT - 100
-        self.velocity_y = 0
-        self.jumping = False
-        self.double_jump_available = False
-        self.sliding = False
-        self.slide_timer = 0
-        self.slide_duration = 0.5
-        self.invincible = False
-        self.invincibility_timer = 0
-        self.original_height = 50
-        self.facing_right = True
+        self.body = body
+        # 加载角色动画
+        self.animator = Animator(load_player_animations(), 'run')
+        self.image = self.animator.image()
+        self.mask = self.animator.mask()
+        self.rect = self.image.get_rect(topleft=body.rect.topleft)
+
+    def reset(self, body):
+        """换成新一局的物理状态，动画回到第一帧"""
+        self.body = body
+        self.animator.set_state('run')
+        self.animator.time = 0.0
+        self.image = self.animator.image()
+        self.mask = self.animator.mask()
+        self.rect.topleft = body.rect.topleft
 
     def update(self, dt):
         # 更新动画
-        self.sprite_sheet.update(dt)
-        self.image = self.sprite_sheet.get_current_frame()
-        if not self.facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
-
-        # 重力效果
-        self.velocity_y += GRAVITY
-        self.rect.y += self.velocity_y
-
-        # 地面碰撞检测
-        if self.rect.bottom > SCREEN_HEIGHT - 50:
-            self.rect.bottom = SCREEN_HEIGHT - 50
-            self.velocity_y = 0
-            self.jumping = False
-            self.double_jump_available = True
-            self.sliding = False
-
-        # 滑行状态更新
-        if self.sliding:
-            self.slide_timer += dt
-            if self.slide_timer >= self.slide_duration:
-                self.sliding = False
-                self.slide_timer = 0
-                self.rect.height = self.original_height
-
-        # 无敌状态更新
-        if self.invincible:
-            self.invincibility_timer += dt
-            if self.invincibility_timer >= INVINCIBILITY_DURATION:
-                self.invincible = False
-                self.invincibility_timer = 0
-
-    def jump(self):
-        if not self.jumping:
-            self.velocity_y = JUMP_FORCE
-            self.jumping = True
-            self.facing_right = True
-        elif self.double_jump_available:
-            self.velocity_y = JUMP_FORCE * 0.8
-            self.double_jump_available = False
-
-    def slide(self):
-        if not self.jumping and not self.sliding:
-            self.sliding = True
-            self.slide_timer = 0
-            self.rect.height = 25
-            self.invincible = True
-            self.invincibility_timer = 0
+        body = self.body
+        if body.sliding:
+            self.animator.set_state('slide')
+        elif body.jumping:
+            self.animator.set_state('jump')
+        else:
+            self.animator.set_state('run')
+        self.animator.update(dt)
+        self.image = self.animator.image(body.facing_right)
+        self.mask = self.animator.mask(body.facing_right)
+
+    def interpolate(self, alpha):
+        self.rect.topleft = lerp_pos(self.body.prev_pos, self.body.rect.topleft, alpha)
 
 class Coin(pygame.sprite.Sprite):
+    """金币的显示精灵，由对象池复用"""
+
     def __init__(self):
         super().__init__()
-        self.image = pygame.Surface((20, 20))
-        self.image.fill(YELLOW)
+        self.body = None
+        self.image = cache.solid((20, 20), YELLOW)  # 所有金币共用同一张图像
         self.rect = self.image.get_rect()
-        self.rect.x = SCREEN_WIDTH
-        self.rect.y = random.randint(SCREEN_HEIGHT - 200, SCREEN_HEIGHT - 100)
-        self.speed = SCROLL_SPEED
 
-    def update(self):
-        self.rect.x -= self.speed
-        if self.rect.right < 0:
-            self.kill()
+    def reset(self, body):
+        self.body = body
+        self.rect.x = body.rect.x
+        self.rect.y = body.rect.y
+
+    def interpolate(self, alpha):
+        self.rect.topleft = lerp_pos(self.body.prev_pos, self.body.rect.topleft, alpha)
 
 class Obstacle(pygame.sprite.Sprite):
-    def __init__(self, speed):
+    """障碍物的显示精灵，由对象池复用"""
+
+    def __init__(self):
         super().__init__()
-        self.image = pygame.Surface((30, 50))
-        self.image.fill(RED)
+        self.body = None
+        self.image = obstacle_image()  # 所有障碍物共用同一张图像和遮罩
+        self.mask = cache.mask(self.image)
         self.rect = self.image.get_rect()
-        self.rect.x = SCREEN_WIDTH
-        self.rect.y = SCREEN_HEIGHT - 50
-        self.speed = speed
 
-    def update(self):
-        self.rect.x -= self.speed
-        if self.rect.right < 0:
-            self.kill()
+    def reset(self, body):
+        self.body = body
+        self.rect.x = body.rect.x
+        self.rect.y = body.rect.y
+
+    def interpolate(self, alpha):
+        self.rect.topleft = lerp_pos(self.body.prev_pos, self.body.rect.topleft, alpha)
+
+def obstacle_image():
+    return cache.solid(OBSTACLE_SIZE, RED)
+
+class PixelCollider:
+    """
+    逐像素碰撞规则：矩形相交后，用玩家当前动画帧和障碍物的遮罩确认，作为 Simulation 的 hit_test
+    Game 和只运行 Simulation 的训练环境共用这个规则，不绘制时碰撞结果也与游戏一致
+    :param sim: runner_core.Simulation
+    :param player: 提供遮罩的玩家精灵，为 None 时新建一个；调用方在每个模拟步之后 update 它
+    """
+
+    def __init__(self, sim, player=None):
+        self.sim = sim
+        self.player = player if player is not None else Player(sim.player)
+        self.obstacle_mask = cache.mask(obstacle_image())
+        sim.hit_test = self.hit
+
+    def reset(self):
+        """Simulation.reset 换了新的玩家实体后调用"""
+        self.player.reset(self.sim.player)
+
+    def hit(self, body):
+        return masks_overlap(self.sim.player.rect, self.player.mask, body.rect, self.obstacle_mask)
 
 class Game:
-    def __init__(self):
+    """
+    窗口版游戏：负责输入、语音命令、粒子和绘制，游戏规则交给 runner_core.Simulation
+    :param seed: 随机数种子
+    :param voice_controller: 语音控制器，为 None 时创建并启动默认的 VoiceController
+    :param dirty_rendering: 是否使用脏矩形渲染（纹理渲染时不起作用）
+    """
+
+    def __init__(self, seed=None, voice_controller=None, dirty_rendering=DIRTY_RENDERING):
+        if texture_renderer is not None:
+            self.renderer = texture_renderer  # 精灵、背景层和粒子都作为纹理绘制
+        else:
+            self.renderer = DirtyRenderer(pygame.display.get_surface(), dirty_rendering)
+        self.screen = self.renderer.screen
+        self.sim = Simulation(seed=seed)
+        self.sim.on_spawn = self.add_body_sprite
+        self.sim.on_despawn = self.remove_body_sprite
+        self.sprite_pools = EntityFactory({
+            'obstacle': Pool(Obstacle, POOL_SIZE),
+            'coin': Pool(Coin, POOL_SIZE),
+        })
         self.background = ParallaxBackground()
-        self.player = Player()
+        self.player = Player(self.sim.player)
+        self.collider = PixelCollider(self.sim, self.player)  # 玩家精灵随 all_sprites 更新动画
         self.all_sprites = pygame.sprite.Group()
         self.obstacles = pygame.sprite.Group()
         self.coins = pygame.sprite.Group()
         self.all_sprites.add(self.player)
-        self.score = 0
-        self.game_over = False
-        self.font = pygame.font.Font(None, 36)
-        self.last_obstacle_time = 0
-        self.last_coin_time = 0
-        self.voice_controller = VoiceController()
-        self.game_started = False
-        self.voice_controller.start()
-        self.current_speed = SCROLL_SPEED
-        self.last_difficulty_increase = 0
-        self.game_time = 0
-        
+        self.body_sprites = {}  # 模拟实体 -> 显示精灵
+        if voice_controller is None:
+            voice_controller = VoiceController()
+            voice_controller.start()
+        self.voice_controller = voice_controller
+        self.input_bus = InputBus()  # 键盘和语音输入都经由总线，在对应的模拟步作用
+        self.ticks = 0  # 已执行的模拟步数
+        self.recorder = None  # 可选的 ReplayWriter，记录每个输入作用在第几步
+        self.last_poll = time.perf_counter()
+
         # 初始化粒子系统
         self.particles = ParticleSystem()
-        
-        # 初始化GUI
-        self.gui_manager = pygame_gui.UIManager((SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.score_label = pygame_gui.elements.UILabel(
-            relative_rect=pygame.Rect((10, 10), (200, 30)),
-            text='Score: 0',
-            manager=self.gui_manager
-        )
-        self.command_feedback = pygame_gui.elements.UILabel(
-            relative_rect=pygame.Rect((10, 50), (200, 30)),
-            text='',
-            manager=self.gui_manager
-        )
+
+        # 输入延迟统计，F3 显示分位数，F4 导出 CSV
+        self.latency = LatencyTracker()
+        self.latency_overlay = LatencyOverlay(self.latency, cache.font(None, 24))
+        # 分阶段性能分析，F2 开关并显示柱状图，F5 导出 trace
+        self.profiler_overlay = ProfilerOverlay(profiler, cache.font(None, 20))
+
+        # HUD 文字从字形图集拼出，只在得分或提示变化时重新拼字
+        label_glyphs = atlas(None, 24, WHITE)
+        self.score_label = HudText(label_glyphs, (10, 10), 'Score: {}', 0)
+        self.command_feedback = HudText(label_glyphs, (10, 50))
+        message_glyphs = atlas(None, 36, RED)
+        self.start_text = HudText(message_glyphs, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2),
+                                  value='说"开始"来开始游戏')
+        self.game_over_text = HudText(message_glyphs, (SCREEN_WIDTH//2 - 200, SCREEN_HEIGHT//2),
+                                      value='游戏结束！说"开始"重新开始')
+
+    @property
+    def score(self):
+        return self.sim.score
+
+    @property
+    def game_over(self):
+        return self.sim.game_over
+
+    @property
+    def game_started(self):
+        return self.sim.game_started
 
     def handle_events(self):
-        time_delta = clock.tick(FPS)/1000.0
-        
+        # 按键事件没有可用的时间戳，按键发生在上次轮询和本次轮询之间，取中点作为采集时间
+        polled_at = time.perf_counter()
+        pressed_at = (self.last_poll + polled_at) / 2
+        self.last_poll = polled_at
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
@@ -349,135 +321,266 @@ class Game:
                 if event.key == pygame.K_ESCAPE:
                     return False
                 if event.key == pygame.K_SPACE:
-                    self.player.jump()
-                    self.particles.create_dust(self.player.rect.centerx, self.player.rect.bottom)
+                    self.input_bus.post('jump', 'keyboard', pressed_at)
                 if event.key == pygame.K_DOWN:
-                    self.player.slide()
-            
-            self.gui_manager.process_events(event)
-        
-        self.gui_manager.update(time_delta)
+                    self.input_bus.post('slide', 'keyboard', pressed_at)
+                if event.key == pygame.K_F3:
+                    self.latency_overlay.toggle()
+                if event.key == pygame.K_F4:
+                    count = self.latency.export_csv(LATENCY_CSV)
+                    print(f'已导出 {count} 条延迟记录到 {LATENCY_CSV}')
+                if event.key == pygame.K_F2:
+                    profiler.toggle()
+                if event.key == pygame.K_F5:
+                    count = profiler.dump_trace(PROFILE_TRACE)
+                    print(f'已导出 {count} 帧的性能记录到 {PROFILE_TRACE}')
+
+        with profiler.scope('events.voice'):
+            self.handle_voice_commands()
+            self.input_bus.drain()
         return True
 
+    def jump(self):
+        self.sim.jump()
+        body = self.sim.player.rect
+        self.particles.create_dust(body.centerx, body.bottom)
+
     def handle_voice_commands(self):
-        command = self.voice_controller.get_next_command()
-        if command:
-            if command == "jump":
-                self.player.jump()
-                self.particles.create_dust(self.player.rect.centerx, self.player.rect.bottom)
-                self.command_feedback.set_text("跳跃!")
-            elif command == "slide":
-                self.player.slide()
-                self.command_feedback.set_text("滑行!")
-            elif command == "start" and not self.game_started:
-                self.game_started = True
-                self.game_over = False
-                self.score = 0
-                self.obstacles.empty()
-                self.coins.empty()
-                self.last_obstacle_time = 0
-                self.last_coin_time = 0
-                self.current_speed = SCROLL_SPEED
-                self.last_difficulty_increase = 0
-                self.game_time = 0
-                self.command_feedback.set_text("游戏开始!")
-            elif command == "double_jump":
-                self.player.jump()
-                self.command_feedback.set_text("二段跳!")
-
-    def spawn_obstacle(self):
-        current_time = pygame.time.get_ticks() / 1000
-        if current_time - self.last_obstacle_time >= random.uniform(*OBSTACLE_SPAWN_RANGE):
-            obstacle = Obstacle(self.current_speed)
-            self.obstacles.add(obstacle)
-            self.all_sprites.add(obstacle)
-            self.last_obstacle_time = current_time
-
-    def spawn_coin(self):
-        current_time = pygame.time.get_ticks() / 1000
-        if current_time - self.last_coin_time >= 3:  # 每3秒生成一个金币
-            coin = Coin()
-            self.coins.add(coin)
-            self.all_sprites.add(coin)
-            self.last_coin_time = current_time
-
-    def update_difficulty(self):
-        current_time = pygame.time.get_ticks() / 1000
-        if current_time - self.last_difficulty_increase >= DIFFICULTY_INTERVAL:
-            self.current_speed *= (1 + SPEED_INCREASE)
-            self.last_difficulty_increase = current_time
+        """把识别出的所有语音命令投递到输入总线（不再每帧只取一个）"""
+        while True:
+            command = self.voice_controller.get_next_command()
+            if command is None:
+                break
+            self.input_bus.post(command.name, 'voice', command.captured_at,
+                                ended_at=command.ended_at, recognized_at=command.recognized_at)
+
+    def apply_inputs(self, until=None):
+        """
+        作用输入总线中采集时间不晚于 until 的事件
+        :param until: 即将执行的模拟步的结束时间，为 None 时作用本帧剩余的全部事件
+        """
+        for event in self.input_bus.due(until):
+            self.apply_input(event)
+
+    def apply_input(self, event):
+        if self.recorder is not None:
+            self.recorder.record(self.ticks, event)
+        action = event.action
+        voice = event.source == 'voice'
+        if action == "jump":
+            self.jump()
+            if voice:
+                self.command_feedback.set("跳跃!")
+        elif action == "slide":
+            self.sim.slide()
+            if voice:
+                self.command_feedback.set("滑行!")
+        elif action == "start":
+            self.start()  # 未开始或已结束时开始新的一局（游戏结束画面提示说“开始”重新开始），进行中时忽略
+        elif action == "double_jump":
+            self.sim.jump()
+            self.command_feedback.set("二段跳!")
+        if event.captured_at is not None:
+            self.latency.record(event.source, action, event.captured_at, event.recognized_at,
+                                ended_at=event.ended_at)
+
+    def start(self):
+        if self.sim.start():
+            self.command_feedback.set("游戏开始!")
+
+    def reset(self, seed=None):
+        """
+        回到刚创建时的状态，之后的结果与新建的 Game(seed) 相同
+        精灵对象池、粒子数组、背景层和 HUD 图集都继续复用，适合训练时反复开局
+        :param seed: 新的随机数种子
+        """
+        self.sim.reset(seed)
+        self.collider.reset()
+        for layer in self.background.layers:
+            layer['x'] = 0
+        self.particles.clear()
+        self.input_bus.clear()
+        self.ticks = 0
+        self.score_label.set(0)
+        self.command_feedback.set('')
+        self.renderer.invalidate()
+
+    def add_body_sprite(self, body):
+        """模拟生成实体时，从对象池取出对应的显示精灵"""
+        sprite = self.sprite_pools.spawn(body.kind, body)
+        self.body_sprites[body] = sprite
+        if body.kind == 'obstacle':
+            self.obstacles.add(sprite)
+        else:
+            self.coins.add(sprite)
+        self.all_sprites.add(sprite)
+
+    def remove_body_sprite(self, body):
+        """模拟回收实体时，把显示精灵放回对象池"""
+        sprite = self.body_sprites.pop(body)
+        sprite.kill()
+        self.sprite_pools.despawn(body.kind, sprite)
+
+    def pool_stats(self):
+        return {'bodies': self.sim.entities.stats(), 'sprites': self.sprite_pools.stats()}
 
     def update(self, dt):
+        """推进一个固定时长的模拟步"""
         self.background.update()
-        self.all_sprites.update(dt)
-        self.obstacles.update()
-        self.coins.update()
-        self.particles.update(dt)
 
-        # 处理语音命令
-        self.handle_voice_commands()
+        with profiler.scope('update.sim'):
+            events = self.sim.step(dt)
+        for kind, x, y in events:
+            self.particles.create_explosion(x, y)
+        with profiler.scope('update.sprites'):
+            self.all_sprites.update(dt)
+        with profiler.scope('update.particles'):
+            self.particles.update(dt)
 
         if not self.game_over and self.game_started:
-            # 更新游戏时间
-            self.game_time += dt
-            # 每1秒加10分
-            self.score = int(self.game_time * 10)
-            self.score_label.set_text(f'Score: {self.score}')
-
-            # 生成障碍物和金币
-            self.spawn_obstacle()
-            self.spawn_coin()
-
-            # 更新难度
-            self.update_difficulty()
-
-            # 收集金币
-            coin_hits = pygame.sprite.spritecollide(self.player, self.coins, True)
-            for coin in coin_hits:
-                self.score += 50
-                self.particles.create_explosion(coin.rect.centerx, coin.rect.centery)
-
-            # 碰撞检测（考虑无敌状态）
-            if not self.player.invincible:
-                hits = pygame.sprite.spritecollide(self.player, self.obstacles, False)
-                if hits:
-                    self.game_over = True
-                    self.particles.create_explosion(self.player.rect.centerx, self.player.rect.centery)
-
-    def draw(self):
-        self.background.draw(screen)
-        self.all_sprites.draw(screen)
-        self.particles.draw(screen)
+            self.score_label.set(self.score)
+        self.ticks += 1
+
+    def draw(self, alpha=1.0):
+        """
+        绘制一帧
+        :param alpha: 当前帧在上一模拟步和当前模拟步之间的位置，用于插值精灵坐标
+        """
+        screen = self.screen
+        renderer = self.renderer
+        with profiler.scope('draw.background'):
+            if self.background.moving:
+                self.background.draw(screen)
+                renderer.begin(full=True)
+            else:
+                renderer.begin(self.background.render())
+
+        with profiler.scope('draw.sprites'):
+            for sprite in self.all_sprites:
+                sprite.interpolate(alpha)
+                renderer.blit(sprite.image, sprite.rect)
+        with profiler.scope('draw.particles'):
+            renderer.add(self.particles.draw(screen))
         
-        # 绘制GUI
-        self.gui_manager.draw_ui(screen)
-
-        if not self.game_started:
-            start_text = self.font.render('说"开始"来开始游戏', True, RED)
-            screen.blit(start_text, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2))
-        elif self.game_over:
-            game_over_text = self.font.render('游戏结束！说"开始"重新开始', True, RED)
-            screen.blit(game_over_text, (SCREEN_WIDTH//2 - 200, SCREEN_HEIGHT//2))
-
-        pygame.display.flip()
+        # 绘制 HUD 文字（缓存的图像）
+        with profiler.scope('draw.hud'):
+            self.score_label.draw(renderer)
+            self.command_feedback.draw(renderer)
+            if not self.game_started:
+                self.start_text.draw(renderer)
+            elif self.game_over:
+                self.game_over_text.draw(renderer)
+
+        self.latency_overlay.draw(renderer)
+        self.profiler_overlay.draw(renderer, (SCREEN_WIDTH - profiler.frames - 10, 10))
+        with profiler.scope('draw.present'):
+            renderer.end()
+        self.latency.frame_presented()
 
     def cleanup(self):
         self.voice_controller.stop()
 
+def preload_assets():
+    """把游戏用到的图像放进资源缓存（在后台线程运行）"""
+    load_player_animations()
+
+def preload_fonts():
+    """创建游戏用到的字体；SDL_ttf 不保证线程安全，只在主线程调用，创建字体本身很快"""
+    for size in (20, 24, 36):
+        cache.font(None, size)
+
+def start_voice():
+    """创建并启动语音控制器（加载关键词模板、打开麦克风）"""
+    voice_controller = VoiceController()
+    voice_controller.start()
+    return voice_controller
+
+def wait_for_loader(screen, loader):
+    """显示加载进度，直到后台启动任务全部完成"""
+    screen.fill(BLACK)
+    text = cache.font(None, 36).render('Loading...', True, WHITE)
+    screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 30)))
+    present(screen)
+    loader.mark('加载画面')
+    progress_rect = pygame.Rect(SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2, SCREEN_WIDTH // 2, 16)
+    loaded = False
+    while not loaded:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+        loaded = loader.done()
+        present(screen, loader.draw_progress(screen, progress_rect))
+        clock.tick(30)
+    loader.mark('加载完成')
+
 def main():
-    game = Game()
+    screen = init_display()
+    loader = StartupLoader(STARTED_AT)
+    loader.mark('窗口')
+    preload_fonts()
+    loader.mark('字体')
+    # 耗时的导入和准备工作放到后台，窗口先显示加载进度
+    loader.add('资源', preload_assets)
+    loader.add('语音', start_voice)
+    wait_for_loader(screen, loader)
+
+    seed = random.randrange(2 ** 31)
+    game = Game(seed=seed, voice_controller=loader.result('语音'))
+    game.recorder = ReplayWriter(session_path('runner_game'), 'runner_game', seed, 1.0 / FPS)
+    loader.shutdown()
+    loader.mark('进入游戏')
+    print('启动耗时:')
+    for line in loader.report():
+        print(f'  {line}')
+    timestep = FixedTimestep(1.0 / FPS)
     running = True
 
     try:
         while running:
-            dt = clock.tick(FPS)/1000.0
-            running = game.handle_events()
-            game.update(dt)
-            game.draw()
+            profiler.begin_frame()
+            with profiler.scope('wait'):
+                frame_time = clock.tick(FPS)/1000.0
+            now = time.perf_counter()
+            with profiler.scope('handle_events'):
+                running = game.handle_events()
+            steps = timestep.advance(frame_time)
+            with profiler.scope('update'):
+                # 每个输入在它被采集时对应的模拟步之前作用，晚于最后一步的输入在本帧最后作用
+                for tick_end in timestep.tick_times(now, steps):
+                    game.apply_inputs(tick_end)
+                    game.update(timestep.step)
+                game.apply_inputs()
+            with profiler.scope('draw'):
+                game.draw(timestep.alpha)
+            profiler.end_frame()
     finally:
+        game.recorder.close(game.ticks, game.score)
+        print(f'本局录像已保存到 {game.recorder.path}')
         game.cleanup()
         pygame.quit()
         sys.exit()
 
+def replay_session(replay, render=False):
+    """
+    回放一局录像（replay.Replay）
+    :param render: 为 True 时按实时速度绘制，否则不绘制、以最快速度推进
+    :return: (总步数, 最终得分)
+    """
+    init_display()
+    game = Game(seed=replay.seed, voice_controller=NullVoice())
+    for tick in range(replay.ticks):
+        for event in replay.due(tick):
+            game.apply_input(event)
+        game.update(replay.step)
+        if render:
+            if pygame.event.peek(pygame.QUIT):
+                break
+            game.draw()
+            clock.tick(round(1 / replay.step))
+    for event in replay.due(game.ticks):
+        game.apply_input(event)
+    return game.ticks, game.score
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,14 +1,28 @@
 import pygame
-import pyaudio
-import numpy as np
+import io
 import random
 import sys
 import os
-import cv2
-
-# 初始化 Pygame
-pygame.init()
-pygame.mixer.init()
+import time
+
+from animation import Animation, Animator
+from assets import cache
+from audio_capture import AudioCapture
+from audio_features import OnsetDetector
+from collision import ScrollIndex, masks_overlap
+from dirty_render import DirtyRenderer
+from hud import HudText, atlas
+from input_bus import InputBus
+from latency import LatencyOverlay, LatencyTracker
+from pooling import EntityFactory, Pool
+from profiler import ProfilerOverlay, profiler
+from replay import ReplayWriter, session_path
+from spawner import SpawnScheduler, SpawnStream
+from startup import StartupLoader
+from timestep import FixedTimestep, lerp_pos
+from video import VideoPlayer
+
+STARTED_AT = time.perf_counter()  # 启动计时的零点
 
 # 游戏常量
 SCREEN_WIDTH = 900
@@ -23,71 +37,139 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 GRAY = (128, 128, 128)
 
-# 设置游戏窗口
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("声音跑酷")
+DIRTY_RENDERING = False  # 脏矩形渲染，适合低功耗设备
+OBSTACLE_POOL_SIZE = 8  # 每种障碍物预分配的数量
+OBSTACLE_SPEED = 10  # 障碍物移动速度（像素/步）
+PLAYER_X = 100
+MIN_OBSTACLE_GAP = 1.0  # 相邻障碍物到达玩家的最小间隔（秒），最高的一跳滞空约 0.83 秒
+
+screen = None  # 游戏窗口，由 init_display() 创建
 clock = pygame.time.Clock()
 
 # 音频设置
 CHUNK = 1024
-FORMAT = pyaudio.paFloat32
-CHANNELS = 1
 RATE = 44100
-THRESHOLD = 0.1
+MIN_SOUND_RMS = 0.01  # 低于这个响度的声音不触发跳跃
+
+LATENCY_CSV = "latency.csv"  # 按 F4 导出输入延迟记录的文件
+PROFILE_TRACE = "profile_trace.json"  # 按 F5 导出的 Chrome trace 文件
+
+# 启动时预加载的资源（路径, 尺寸）
+ASSET_MANIFEST = [
+    "assets/metest(1).png", "assets/metest(2).png", "assets/metest(3).png",
+    "assets/jump_1.png", "assets/jump_2.png",
+    ("assets/enemy_one.png", (30, 70)),
+    ("assets/enemy_two.png", (50, 100)),
+    ("assets/background.png", (SCREEN_WIDTH, SCREEN_HEIGHT)),
+]
+
+
+def init_display():
+    """初始化 Pygame 并创建游戏窗口（只在真正运行游戏时调用）"""
+    global screen
+    pygame.init()
+    pygame.mixer.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("声音跑酷")
+    return screen
+
+
+def preload_fonts():
+    """创建游戏用到的字体；SDL_ttf 不保证线程安全，只在主线程调用，创建字体本身很快"""
+    for size in (20, 24, 48):
+        cache.font(None, size)
+
+
+def read_file(path):
+    """把文件读进内存，文件不存在时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        print(f"读取 {path} 时出错: {e}")
+        return None
+
+
+def open_microphone():
+    """
+    打开麦克风并开始采集（PyAudio 初始化和枚举设备较慢，在后台线程中进行）
+    :return: (PyAudio 实例, AudioCapture)
+    """
+    import pyaudio
+
+    audio = pyaudio.PyAudio()
+    capture = AudioCapture(RATE, CHUNK)
+    try:
+        capture.start(audio)  # 回调模式，在独立线程中写入环形缓冲区
+    except Exception:
+        audio.terminate()
+        raise
+    return audio, capture
 
 
 def load_image(path, scale=None):
     """
-    加载图像并根据需要进行缩放
+    加载图像并根据需要进行缩放，结果由共享的资源缓存保存，同一资源只解码一次
     :param path: 图像文件路径
     :param scale: 缩放比例，格式为 (width, height)
     :return: 加载并处理后的图像
     """
-    try:
-        image = pygame.image.load(path).convert_alpha()
-        if scale:
-            image = pygame.transform.scale(image, scale)
-        return image
-    except pygame.error as e:
-        print(f"加载图像 {path} 时出错: {e}")
-        return None
+    return cache.image(path, scale)
+
+
+def load_player_animations():
+    """
+    玩家的动画表，帧和镜像帧都从资源缓存中取，只在第一次加载时缩放和翻转
+    :return: 状态名 -> Animation
+    """
+    run_paths = [f"assets/metest({i + 1}).png" for i in range(3)]  # 非跳跃状态下的动画帧
+    jump_paths = [f"assets/jump_{i + 1}.png" for i in range(2)]  # 跳跃状态下的动画帧
+
+    # 调整帧大小，放大 1.25 倍，并设置高度比大障碍物高 50px
+    target_height = 70 + 50  # 大障碍物高度为 70
+    scale_factor = target_height / cache.source_size(run_paths[0])[1]
+
+    def frames(paths, flip_x=False):
+        return [
+            cache.image(path, (int(cache.source_size(path)[0] * scale_factor), target_height), flip_x=flip_x)
+            for path in paths
+        ]
+
+    # 每 10 帧切换一次动画
+    frame_time = 10 / FPS
+    return {
+        'run': Animation(frames(run_paths), frame_time * len(run_paths), frames(run_paths, True)),
+        'jump': Animation(frames(jump_paths), frame_time * len(jump_paths), frames(jump_paths, True)),
+    }
 
 
 class Player(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
-        self.run_frames = [
-            load_image(f"assets/metest({i + 1}).png") for i in range(3)
-        ]  # 非跳跃状态下的动画帧
-        self.jump_frames = [
-            load_image(f"assets/jump_{i + 1}.png") for i in range(2)
-        ]  # 跳跃状态下的动画帧
-
-        # 调整帧大小，放大 1.25 倍，并设置高度比大障碍物高 50px
-        target_height = 70 + 50  # 大障碍物高度为 70
-        scale_factor = target_height / self.run_frames[0].get_height()
-        self.run_frames = [
-            pygame.transform.scale(frame, (int(frame.get_width() * scale_factor), target_height))
-            for frame in self.run_frames
-        ]
-        self.jump_frames = [
-            pygame.transform.scale(frame, (int(frame.get_width() * scale_factor), target_height))
-            for frame in self.jump_frames
-        ]
-
-        self.current_frame = 0
-        self.image = self.run_frames[self.current_frame]
+        self.animator = Animator(load_player_animations(), 'run')
+        self.image = self.animator.image()
         self.rect = self.image.get_rect()
-        self.rect.x = 100
+        self.gravity = 0.8
+        self.reset()
+
+    def reset(self):
+        """回到开局时的位置和状态"""
+        self.animator.set_state('run')
+        self.animator.time = 0.0
+        self.image = self.animator.image()
+        self.mask = self.animator.mask()
+        self.rect.x = PLAYER_X
         self.rect.y = SCREEN_HEIGHT - 100
+        self.prev_pos = self.rect.topleft  # 上一步的位置，用于绘制插值
         self.velocity_y = 0
         self.jumping = False
-        self.gravity = 0.8
         self.double_jump_available = True
-        self.animation_timer = 0
         self.sound_active = False
 
     def update(self):
+        """推进一个固定步长（1/FPS 秒）"""
+        self.prev_pos = self.rect.topleft
+
         # 重力效果
         self.velocity_y += self.gravity
         self.rect.y += self.velocity_y
@@ -102,22 +184,20 @@ class Player(pygame.sprite.Sprite):
             self.double_jump_available = True
 
         # 更新动画帧
-        self.animation_timer += 1
-        if self.animation_timer >= 10:  # 每 10 帧切换一次动画
-            if self.jumping or self.velocity_y != 0:  # 跳跃状态
-                self.current_frame = (self.current_frame + 1) % len(self.jump_frames)
-                self.image = self.jump_frames[self.current_frame]
-            else:  # 非跳跃状态
-                self.current_frame = (self.current_frame + 1) % len(self.run_frames)
-                self.image = self.run_frames[self.current_frame]
-            self.animation_timer = 0
-
-    def jump(self):
+        self.animator.set_state('jump' if self.jumping or self.velocity_y != 0 else 'run')
+        self.animator.update(1.0 / FPS)
+        self.image = self.animator.image()
+        self.mask = self.animator.mask()
+
+    def jump(self, strength=1.0):
+        """
+        :param strength: 0~1 的声音强度，越响跳得越高，1 对应原来的跳跃高度
+        """
         if not self.jumping and self.rect.bottom >= SCREEN_HEIGHT - 50:
-            self.velocity_y = -20
+            self.velocity_y = -(12 + 8 * strength)
             self.jumping = True
         elif self.jumping and self.double_jump_available:  # 检查是否可以二连跳
-            self.velocity_y = -14  # 二连跳的高度更高
+            self.velocity_y = -(10 + 4 * strength)  # 二连跳的高度更高
             self.double_jump_available = False
 
 
@@ -129,12 +209,15 @@ class Ground(pygame.sprite.Sprite):
         self.rect = self.image.get_rect()
         self.rect.x = 0
         self.rect.y = y
+        self.prev_pos = self.rect.topleft
 
     def update(self):
         pass  # 地面不需要移动
 
 
 class Obstacle(pygame.sprite.Sprite):
+    """障碍物精灵，由 Game 的对象池按类型复用，离开玩家身后时由 Game 回收"""
+
     def __init__(self, obstacle_type):
         super().__init__()
         if obstacle_type == "enemy_one":
@@ -142,33 +225,75 @@ class Obstacle(pygame.sprite.Sprite):
         else:  # obstacle_type == "enemy_two"
             self.image = load_image("assets/enemy_two.png", (50, 100))
 
+        self.mask = cache.mask(self.image)
         self.rect = self.image.get_rect()
+        self.speed = OBSTACLE_SPEED
+        self.obstacle_type = obstacle_type
+        self.reset()
+
+    def reset(self):
         self.rect.x = SCREEN_WIDTH
         self.rect.y = SCREEN_HEIGHT - 50 - self.rect.height  # 调整位置，使其在地面上
-        self.speed = 5
-        self.obstacle_type = obstacle_type
+        self.prev_pos = self.rect.topleft
 
     def update(self):
+        self.prev_pos = self.rect.topleft
         self.rect.x -= self.speed
-        if self.rect.right < 0:
-            self.kill()
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, dirty_rendering=DIRTY_RENDERING, seed=None):
+        self.rng = random.Random(seed)  # 障碍物生成只用这个生成器，相同种子和输入可以复现
         self.player = Player()
         self.all_sprites = pygame.sprite.Group()
         self.obstacles = pygame.sprite.Group()
         self.all_sprites.add(self.player)
         self.ground = Ground(SCREEN_HEIGHT)  # 初始化地面
         self.all_sprites.add(self.ground)
+        self.obstacle_index = ScrollIndex(50)  # 按滚动顺序排列的障碍物，最宽的 enemy_two 为 50
+        self.obstacle_pools = EntityFactory({
+            obstacle_type: Pool(lambda obstacle_type=obstacle_type: Obstacle(obstacle_type), OBSTACLE_POOL_SIZE)
+            for obstacle_type in ("enemy_one", "enemy_two")
+        })
 
         self.background = load_image("assets/background.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
+        if self.background is None:
+            self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.background.fill(BLACK)
+        self.renderer = DirtyRenderer(screen, dirty_rendering)
+        self.onsets = OnsetDetector(RATE, min_rms=MIN_SOUND_RMS)  # 声音起音检测
+        self.input_bus = InputBus()  # 起音事件带着音频块的时间戳，在对应的模拟步作用
+        self.latency = LatencyTracker()  # 从发声到角色起跳显示出来的延迟
+        self.latency_overlay = LatencyOverlay(self.latency, cache.font(None, 24))  # F3 显示
+        self.profiler_overlay = ProfilerOverlay(profiler, cache.font(None, 20))  # F2 开关性能分析
 
         self.score = 0  # 初始化得分
         self.game_over = False
-        self.font = pygame.font.Font(None, 48)  # 调整字体大小
-        self.obstacle_spawn_rate = 0.01  # 降低障碍物生成率
+        # 得分和结束提示从字形图集拼出，得分变化时才重新拼字
+        self.score_text = HudText(atlas(None, 48, GREEN), (10, 10), 'Score: {}', 0)  # 绿色，左上角
+        self.game_over_text = HudText(atlas(None, 48, RED), (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2),
+                                      value='Game Over! Press SPACE to restart')
+        self.obstacle_spawn_rate = 0.01  # 平均每步生成障碍物的概率，换算成按游戏时间排好的生成间隔
+        self.spawner = SpawnScheduler(self.rng, [SpawnStream(self.obstacle_interval, self.make_obstacle, True)],
+                                      min_gap=MIN_OBSTACLE_GAP, distance=SCREEN_WIDTH - PLAYER_X, fps=FPS)
+        self.ticks = 0  # 已执行的模拟步数
+        self.recorder = None  # 可选的 ReplayWriter，记录每个输入作用在第几步
+
+    def reset(self, seed=None):
+        """
+        回到刚创建时的状态，之后的结果与新建的 Game(seed=seed) 相同
+        障碍物放回对象池，图像、对象池和 HUD 图集继续复用；起音检测的噪声底保留
+        :param seed: 新的随机数种子
+        """
+        self.rng.seed(seed)
+        self.obstacle_index.clear(self.despawn_obstacle)
+        self.player.reset()
+        self.input_bus.clear()
+        self.spawner.reset()
+        self.score = 0
+        self.game_over = False
+        self.ticks = 0
+        self.renderer.invalidate()
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -177,105 +302,156 @@ class Game:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return False
+                if event.key == pygame.K_F3:
+                    self.latency_overlay.toggle()
+                if event.key == pygame.K_F4:
+                    count = self.latency.export_csv(LATENCY_CSV)
+                    print(f"已导出 {count} 条延迟记录到 {LATENCY_CSV}")
+                if event.key == pygame.K_F2:
+                    profiler.toggle()
+                if event.key == pygame.K_F5:
+                    count = profiler.dump_trace(PROFILE_TRACE)
+                    print(f"已导出 {count} 帧的性能记录到 {PROFILE_TRACE}")
         return True
 
-    def check_sound(self, stream):
-        try:
-            data = np.frombuffer(stream.read(CHUNK, exception_on_overflow=False), dtype=np.float32)
-            if np.max(np.abs(data)) > THRESHOLD:
-                self.player.sound_active = True  # 声音检测到时设置标志
-                self.player.jump()
-            else:
-                self.player.sound_active = False  # 没有声音时重置标志
-        except Exception as e:
-            print(f"音频读取错误: {e}")
+    def check_sound(self, capture):
+        """处理上一帧之后到达的每一个音频块（不阻塞），起音作为跳跃事件投递到输入总线"""
+        with profiler.scope('update.audio'):
+            for data in capture.chunks():
+                # 只在声音开始（起音）时跳一次，持续的声音不会连续触发
+                event = self.onsets.process(data)
+                self.player.sound_active = self.onsets.active
+                if event is not None:
+                    self.input_bus.post('jump', 'sound', capture.chunk_time(), event.strength,
+                                        recognized_at=time.perf_counter())
+            self.input_bus.drain()
+
+    def calibrate(self, capture):
+        """读完采集到的积压音频，只用来更新起音检测的噪声底，不触发跳跃"""
+        for data in capture.chunks():
+            self.onsets.process(data)
+
+    def apply_inputs(self, until=None):
+        """
+        作用输入总线中采集时间不晚于 until 的事件
+        :param until: 即将执行的模拟步的结束时间，为 None 时作用本帧剩余的全部事件
+        """
+        for event in self.input_bus.due(until):
+            self.apply_input(event)
+
+    def apply_input(self, event):
+        if self.recorder is not None:
+            self.recorder.record(self.ticks, event)
+        if event.action == 'jump':
+            self.player.jump(event.strength)
+        if event.captured_at is not None:
+            self.latency.record(event.source, event.action, event.captured_at, event.recognized_at)
+
+    def obstacle_interval(self, rng, level):
+        # 每步以 obstacle_spawn_rate 的概率生成，等价于平均间隔 1 / (rate * FPS) 秒的指数分布
+        return rng.expovariate(self.obstacle_spawn_rate * FPS)
+
+    def make_obstacle(self, rng, level):
+        obstacle_type = "enemy_one" if rng.random() < 0.75 else "enemy_two"  # 75% 为 enemy_one
+        return obstacle_type, None, OBSTACLE_SPEED
+
+    def spawn_obstacle(self, obstacle_type, late=0):
+        """
+        从对象池取出障碍物并放到屏幕右侧
+        :param late: 比计划晚了多少像素，障碍物放到已经移动到的位置
+        """
+        obstacle = self.obstacle_pools.spawn(obstacle_type)
+        if late:
+            obstacle.rect.x -= late
+            obstacle.prev_pos = obstacle.rect.topleft
+        self.obstacle_index.append(obstacle)
+        self.obstacles.add(obstacle)
+        self.all_sprites.add(obstacle)
+        return obstacle
+
+    def despawn_obstacle(self, obstacle):
+        obstacle.kill()
+        self.obstacle_pools.despawn(obstacle.obstacle_type, obstacle)
 
     def update(self):
-        self.all_sprites.update()
-        self.obstacles.update()
+        """推进一个固定步长（1/FPS 秒），重力和滚动以步为单位，生成按游戏时间"""
+        with profiler.scope('update.sprites'):
+            self.all_sprites.update()
 
-        # 更新得分：检测玩家是否跨过障碍物
-        for obstacle in self.obstacles:
-            if obstacle.rect.right < self.player.rect.left:  # 玩家已跨过障碍物
+        # 更新得分：游标越过玩家左侧的障碍物即为已跨过
+        if self.obstacle_index.advance(self.player.rect.left):
+            for obstacle in self.obstacle_index.pop_passed():
                 if obstacle.obstacle_type == "enemy_one":
                     self.score += 1  # 跨过小障碍物加 1 分
                 elif obstacle.obstacle_type == "enemy_two":
                     self.score += 2  # 跨过大障碍物加 2 分
-                obstacle.kill()  # 移除障碍物
-
-        # 生成障碍物
-        if random.random() < self.obstacle_spawn_rate and not self.game_over:
-            if random.random() < 0.75:  # 75% 概率生成 enemy_one
-                obstacle = Obstacle("enemy_one")
-            else:  # 25% 概率生成 enemy_two
-                obstacle = Obstacle("enemy_two")
-            self.obstacles.add(obstacle)
-            self.all_sprites.add(obstacle)
-
-        # 碰撞检测
-        hits = pygame.sprite.spritecollide(self.player, self.obstacles, False)
-        if hits:
+                self.despawn_obstacle(obstacle)  # 移除障碍物
+
+        # 生成计划中到时间的障碍物
+        if not self.game_over:
+            now = (self.ticks + 1) / FPS  # 本步结束时的游戏时间
+            for entry in self.spawner.due(now):
+                self.spawn_obstacle(entry.kind, int((now - entry.time) * FPS * entry.speed))
+
+        # 碰撞检测：只检测与玩家 x 范围重叠的障碍物，矩形相交后再逐像素确认
+        with profiler.scope('update.collisions'):
+            hit = self.obstacle_index.first_hit(self.player.rect, self.hits_player)
+        if hit is not None:
             self.game_over = True
+        self.ticks += 1
 
-    def draw(self):
-        # 绘制背景图
-        if self.background:
-            screen.blit(self.background, (0, 0))
+    def hits_player(self, obstacle):
+        player = self.player
+        return masks_overlap(player.rect, player.mask, obstacle.rect, obstacle.mask)
 
-        self.all_sprites.draw(screen)
+    def draw(self, alpha=1.0):
+        """
+        绘制一帧
+        :param alpha: 当前帧在上一模拟步和当前模拟步之间的位置，用于插值精灵坐标
+        """
+        # 绘制背景图（只恢复上一帧画过的区域）
+        renderer = self.renderer
+        renderer.begin(self.background)
 
-        # 显示得分
-        score_text = self.font.render(f'Score: {self.score}', True, GREEN)  # 使用绿色字体
-        text_rect = score_text.get_rect(topleft=(10, 10))  # 显示在屏幕左上角
-        screen.blit(score_text, text_rect)
+        with profiler.scope('draw.sprites'):
+            for sprite in self.all_sprites:
+                renderer.blit(sprite.image, lerp_pos(sprite.prev_pos, sprite.rect.topleft, alpha))
 
-        if self.game_over:
-            game_over_text = self.font.render('Game Over! Press SPACE to restart', True, RED)
-            screen.blit(game_over_text, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2))
+        # 显示得分
+        with profiler.scope('draw.hud'):
+            self.score_text.set(self.score)
+            self.score_text.draw(renderer)
+            if self.game_over:
+                self.game_over_text.draw(renderer)
 
-        pygame.display.flip()
+        self.latency_overlay.draw(renderer, (10, 60))
+        self.profiler_overlay.draw(renderer, (SCREEN_WIDTH - profiler.frames - 10, 10))
+        with profiler.scope('draw.present'):
+            renderer.end()
+        self.latency.frame_presented()
 
 
 def play_video(video_path):
-    try:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print(f"无法打开视频文件: {video_path}")
-            return
-
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                print("视频读取结束或发生错误")
-                break
-
-            try:
-                frame = cv2.resize(frame, (SCREEN_WIDTH, SCREEN_HEIGHT))
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_surface = pygame.surfarray.make_surface(frame.swapaxes(0, 1))
-                screen.blit(frame_surface, (0, 0))
-                pygame.display.update()
-            except Exception as e:
-                print(f"处理视频帧时出错: {e}")
-                break
-
-            # 检查用户是否按下 "Enter" 键
-            if any(event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN for event in pygame.event.get()):
-                break
-    except Exception as e:
-        print(f"播放视频时出错: {e}")
-    finally:
-        if 'cap' in locals():
-            cap.release()
+    """播放视频（后台解码、按视频帧率播放），按 Enter 跳过"""
+    result = VideoPlayer(video_path, (SCREEN_WIDTH, SCREEN_HEIGHT)).play(screen)
+    if result == 'quit':
+        pygame.quit()
+        sys.exit()
     print("视频播放结束")
 
 
-def start_screen():
+def start_screen(loader=None):
+    """
+    显示开始页面，等待玩家按 Enter
+    :param loader: 后台启动任务，显示其进度；按下 Enter 后若仍未完成则继续等待
+    """
     # 显示开始页面图片
     start_image = load_image("assets/start.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
     if start_image:
         screen.blit(start_image, (0, 0))
         pygame.display.update()
+    if loader is not None:
+        loader.mark("开始页面")
 
     # 播放开始音频
     try:
@@ -284,61 +460,129 @@ def start_screen():
     except pygame.error as e:
         print(f"加载开始音频时出错: {e}")
 
-    # 等待用户按下 "Enter" 键
+    # 等待用户按下 "Enter" 键，同时显示后台加载进度
+    progress_rect = pygame.Rect(SCREEN_WIDTH // 4, SCREEN_HEIGHT - 40, SCREEN_WIDTH // 2, 16)
+    loaded = loader is None
     waiting = True
-    while waiting:
+    while waiting or not loaded:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
                 waiting = False
-                pygame.mixer.music.stop()  # 停止播放音频
-                # 清空屏幕，停止显示开始页面
-                screen.fill(BLACK)
-                pygame.display.update()
+        if not loaded:
+            loaded = loader.done()  # 先取状态再画，保证最后画出的是 100%
+            pygame.display.update(loader.draw_progress(screen, progress_rect))
+            if loaded:
+                loader.mark("加载完成")
+        clock.tick(30)  # 等待期间不必空转
+    pygame.mixer.music.stop()  # 停止播放音频
+    # 清空屏幕，停止显示开始页面
+    screen.fill(BLACK)
+    pygame.display.update()
 
 
 def main():
-    start_screen()  # 显示开始页面并播放视频
-
-    try:
-        pygame.mixer.music.load("source/stand.mp3")  # 加载新的背景音乐
-        pygame.mixer.music.play(-1)  # 循环播放背景音乐
-    except pygame.error as e:
-        print(f"加载背景音乐时出错: {e}")
-
-    game = Game()
+    init_display()
+    loader = StartupLoader(STARTED_AT)
+    loader.mark("窗口")
+    preload_fonts()
+    loader.mark("字体")
+    # 耗时的准备工作在开始页面显示期间于后台完成（字体除外）
+    loader.add("资源", cache.preload, ASSET_MANIFEST)
+    loader.add("背景音乐", read_file, "source/stand.mp3")
+    loader.add("麦克风", open_microphone)
+    start_screen(loader)  # 显示开始页面
+
+    music = loader.result("背景音乐")
+    if music is not None:
+        try:
+            pygame.mixer.music.load(io.BytesIO(music), "mp3")  # 加载新的背景音乐
+            pygame.mixer.music.play(-1)  # 循环播放背景音乐
+        except pygame.error as e:
+            print(f"加载背景音乐时出错: {e}")
+
+    seed = random.randrange(2 ** 31)
+    game = Game(seed=seed)
+    game.recorder = ReplayWriter(session_path('sound_runner'), 'sound_runner', seed, 1.0 / FPS)
+    timestep = FixedTimestep(1.0 / FPS)
     running = True
 
-    p = pyaudio.PyAudio()
-    try:
-        stream = p.open(format=FORMAT,
-                        channels=CHANNELS,
-                        rate=RATE,
-                        input=True,
-                        frames_per_buffer=CHUNK)
+    microphone = loader.result("麦克风")
+    loader.shutdown()
+    if microphone is None:
+        pygame.quit()
+        sys.exit()
+    p, capture = microphone
+    game.calibrate(capture)  # 开始页面期间录到的声音只用来估计噪声底
+    loader.mark("进入游戏")
+    print("启动耗时:")
+    for line in loader.report():
+        print(f"  {line}")
 
+    try:
         while running:
-            running = game.handle_events()
+            profiler.begin_frame()
+            with profiler.scope('wait'):
+                frame_time = clock.tick(FPS) / 1000.0
+            now = time.perf_counter()
+            with profiler.scope('handle_events'):
+                running = game.handle_events()
+            steps = timestep.advance(frame_time)
             if not game.game_over:
-                game.check_sound(stream)
-                game.update()
+                with profiler.scope('update'):
+                    game.check_sound(capture)
+                    # 每个起音在它对应的模拟步之前作用，晚于最后一步的在本帧最后作用
+                    for tick_end in timestep.tick_times(now, steps):
+                        game.apply_inputs(tick_end)
+                        game.update()
+                        if game.game_over:
+                            break
+                    game.apply_inputs()
             else:
                 pygame.mixer.music.stop()  # 游戏结束后停止音乐
-            game.draw()
-            clock.tick(FPS)
+            with profiler.scope('draw'):
+                game.draw(timestep.alpha)
+            profiler.end_frame()
     except Exception as e:
         print(f"游戏运行错误: {e}")
     finally:
-        if 'stream' in locals():
-            stream.stop_stream()
-            stream.close()
+        capture.stop()
         p.terminate()
+        game.recorder.close(game.ticks, game.score)
+        print(f"本局录像已保存到 {game.recorder.path}")
+        print(f"资源缓存: {cache.stats()}")
+        for line in game.latency.summary():
+            print(line)
         pygame.quit()
         sys.exit()
 
 
+def replay_session(replay, render=False):
+    """
+    回放一局录像（replay.Replay）
+    :param render: 为 True 时按实时速度绘制，否则不绘制、以最快速度推进
+    :return: (总步数, 最终得分)
+    """
+    init_display()
+    game = Game(seed=replay.seed)
+    for tick in range(replay.ticks):
+        for event in replay.due(tick):
+            game.apply_input(event)
+        game.update()
+        if render:
+            if pygame.event.peek(pygame.QUIT):
+                break
+            game.draw()
+            clock.tick(round(1 / replay.step))
+        if game.game_over:
+            break
+    for event in replay.due(game.ticks):
+        game.apply_input(event)
+    return game.ticks, game.score
+
+
 if __name__ == '__main__':
     main()
     
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+按游戏时间预先排好的生成计划
+
+障碍物和金币不再每帧掷骰子决定是否生成，而是按“流”（一种间隔规律 + 一种生成内容）
+提前生成未来几秒的计划，按出现时间放进优先队列；每帧只取出已经到时间的条目。
+计划按块生成，每生成一块就检查一次公平性：相邻两个障碍物到达玩家的时间间隔不能小于
+一次跳跃所需的时间，不够时把后一个推迟。难度曲线决定生成时的速度和间隔。
+整个计划只由游戏时间和传入的随机数生成器决定，与帧率无关，相同种子得到相同的障碍物序列。
+"""
+import heapq
+import math
+from collections import namedtuple
+
+LOOKAHEAD = 3.0  # 计划至少覆盖到当前时间之后多少秒
+CHUNK = 2.0  # 每次生成的计划长度（秒）
+
+# 计划中的一个条目：出现时间、同时刻的先后序号、种类、y 坐标（None 表示由实体自己决定）、速度（像素/步）
+SpawnEntry = namedtuple('SpawnEntry', ['time', 'order', 'kind', 'y', 'speed'])
+
+# 一个生成流
+# interval(rng, level) 返回到下一个条目的秒数，make(rng, level) 返回 (种类, y, 速度)，
+# obstacle 为 True 的流参与公平性检查
+SpawnStream = namedtuple('SpawnStream', ['interval', 'make', 'obstacle'])
+
+
+def polled_interval(rng, low, high, fps):
+    """
+    旧代码每帧重新抽 uniform(low, high) 并与已经过的时间比较，第 t 秒那一帧生成的概率为
+    (t - low) / (high - low)，间隔的生存函数约为 exp(-fps * (t - low)^2 / (2 * (high - low)))。
+    按这个分布用一次随机数抽出间隔（逆变换），保持原来的生成密度（low=2、high=4、60 FPS 时平均约 2.2 秒）
+    """
+    u = 1.0 - rng.random()  # (0, 1]，避免 log(0)
+    return min(high, low + math.sqrt(-2 * (high - low) * math.log(u) / fps))
+
+
+class DifficultyCurve:
+    """
+    阶梯式难度：每 interval 秒提升一级，速度乘以 (1 + speed_increase)，生成间隔缩短 spacing_decrease，
+    间隔最多缩短到原来的 min_spacing
+    :param start_level: 开局时的等级
+    :param max_level: 等级上限，None 表示不限
+    """
+
+    def __init__(self, interval, speed_increase, spacing_decrease=0.0, min_spacing=1.0,
+                 start_level=0, max_level=None):
+        self.interval = interval
+        self.speed_increase = speed_increase
+        self.spacing_decrease = spacing_decrease
+        self.min_spacing = min_spacing
+        self.start_level = start_level
+        self.max_level = max_level
+
+    def level(self, t):
+        """:return: 游戏时间 t 秒时的等级"""
+        level = self.start_level + int(t // self.interval)
+        if self.max_level is not None:
+            level = min(level, self.max_level)
+        return level
+
+    def speed(self, level):
+        """:return: 该等级的速度倍数"""
+        return (1 + self.speed_increase) ** level
+
+    def spacing(self, level):
+        """:return: 该等级的生成间隔倍数"""
+        return max(self.min_spacing, 1 - self.spacing_decrease * level)
+
+
+class SpawnScheduler:
+    """
+    :param rng: random.Random，生成计划只用这个生成器
+    :param streams: SpawnStream 列表
+    :param difficulty: DifficultyCurve，为 None 时等级始终为 0
+    :param min_gap: 相邻障碍物到达玩家的最小时间间隔（秒），0 表示不检查
+    :param distance: 障碍物从生成位置到玩家的距离（像素），用于估计到达时间
+    :param fps: 每秒的模拟步数，速度以像素/步计
+    """
+
+    def __init__(self, rng, streams, difficulty=None, min_gap=0.0, distance=0, fps=60,
+                 lookahead=LOOKAHEAD, chunk=CHUNK):
+        self.rng = rng
+        self.streams = streams
+        self.difficulty = difficulty
+        self.min_gap = min_gap
+        self.distance = distance
+        self.fps = fps
+        self.lookahead = lookahead
+        self.chunk = chunk
+        self.reset()
+
+    def reset(self):
+        """清空计划，从游戏时间 0 重新开始"""
+        self.queue = []
+        self.horizon = 0.0  # 已生成计划的结束时间
+        self.order = 0
+        self.next_times = None  # 每个流下一个条目的时间，第一次生成时才抽取
+        self.last_arrival = float('-inf')  # 已排入计划的最后一个障碍物到达玩家的时间
+        self.chunks = 0  # 已生成的块数
+        self.delayed = 0  # 因公平性检查被推迟的障碍物数
+
+    def level(self, t):
+        return self.difficulty.level(t) if self.difficulty is not None else 0
+
+    def arrival(self, time, speed):
+        """障碍物在 time 出现、以 speed 像素/步移动时到达玩家的时间"""
+        return time + self.distance / (speed * self.fps)
+
+    def _generate(self):
+        """生成 [horizon, horizon + chunk) 内的计划并放进队列"""
+        rng = self.rng
+        start = self.horizon
+        end = start + self.chunk
+        if self.next_times is None:
+            self.next_times = [stream.interval(rng, self.level(0)) for stream in self.streams]
+        entries = []
+        for i, stream in enumerate(self.streams):
+            t = self.next_times[i]
+            while t < end:
+                level = self.level(t)
+                kind, y, speed = stream.make(rng, level)
+                entries.append([t, kind, y, speed, stream.obstacle])
+                t += stream.interval(rng, level)
+            self.next_times[i] = t
+        entries.sort(key=lambda entry: entry[0])
+        if self.min_gap > 0:
+            self._enforce_gap(entries)
+        for t, kind, y, speed, _ in entries:
+            heapq.heappush(self.queue, SpawnEntry(t, self.order, kind, y, speed))
+            self.order += 1
+        self.horizon = end
+        self.chunks += 1
+
+    def _enforce_gap(self, entries):
+        """公平性检查：按到达时间推迟过近的障碍物，保证每两个之间都来得及落地再起跳"""
+        last = self.last_arrival
+        for entry in entries:
+            if not entry[4]:
+                continue
+            arrival = self.arrival(entry[0], entry[3])
+            if arrival - last < self.min_gap:
+                entry[0] += last + self.min_gap - arrival
+                arrival = last + self.min_gap
+                self.delayed += 1
+            last = arrival
+        self.last_arrival = last
+
+    def due(self, now):
+        """
+        逐个取出出现时间不晚于 now 的条目，需要时先补充计划
+        :param now: 当前游戏时间（秒）
+        """
+        while self.horizon < now + self.lookahead:
+            self._generate()
+        queue = self.queue
+        while queue and queue[0].time <= now:
+            yield heapq.heappop(queue)
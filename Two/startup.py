@@ -0,0 +1,94 @@
+"""
+启动加载
+
+窗口和开始画面先显示出来，图像、音频和麦克风等耗时的准备工作交给后台线程（字体在主线程创建），
+开始画面一边等待玩家一边显示进度。每个任务和关键节点（窗口显示、开始画面、进入游戏）
+都记录距进程启动的时间，便于检查启动是否变慢。
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+STARTUP_WORKERS = 2
+
+
+class StartupLoader:
+    """
+    :param started_at: 进程启动的时间（time.perf_counter），作为各时间点的零点
+    :param workers: 后台线程数
+    """
+
+    def __init__(self, started_at=None, workers=STARTUP_WORKERS):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='startup')
+        self.futures = {}  # 任务名 -> Future
+        self.durations = {}  # 任务名 -> 耗时（秒）
+        self.finished = {}  # 任务名 -> 完成时距启动的秒数
+        self.marks = {}  # 节点名 -> 距启动的秒数
+
+    def add(self, name, func, *args):
+        """在后台运行 func(*args)，结果用 result(name) 取得"""
+        self.futures[name] = self.executor.submit(self._run, name, func, args)
+
+    def _run(self, name, func, args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            end = time.perf_counter()
+            self.durations[name] = end - start
+            self.finished[name] = end - self.started_at
+
+    def mark(self, name):
+        """记录一个启动节点"""
+        self.marks[name] = time.perf_counter() - self.started_at
+
+    @property
+    def progress(self):
+        """已完成任务的比例，范围 [0, 1]"""
+        if not self.futures:
+            return 1.0
+        return sum(future.done() for future in self.futures.values()) / len(self.futures)
+
+    def done(self):
+        return all(future.done() for future in self.futures.values())
+
+    def result(self, name, default=None):
+        """
+        等待任务完成并返回结果
+        :return: 任务的返回值，任务出错时打印错误并返回 default
+        """
+        try:
+            return self.futures[name].result()
+        except Exception as e:
+            print(f"启动任务 {name} 出错: {e}")
+            return default
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    def draw_progress(self, surface, rect, color=(255, 255, 255)):
+        """
+        画进度条
+        :return: 需要更新的屏幕区域
+        """
+        rect = pygame.Rect(rect)
+        pygame.draw.rect(surface, (0, 0, 0), rect)
+        pygame.draw.rect(surface, color, rect, 1)
+        inner = rect.inflate(-4, -4)
+        inner.width = int(inner.width * self.progress)
+        if inner.width > 0:
+            pygame.draw.rect(surface, color, inner)
+        return rect
+
+    def report(self):
+        """
+        :return: 启动节点和各任务耗时的文字说明
+        """
+        lines = [f"{name}: {seconds * 1000:.0f}ms" for name, seconds in self.marks.items()]
+        for name in self.futures:
+            if name in self.durations:
+                lines.append(f"  {name}: 耗时 {self.durations[name] * 1000:.0f}ms，"
+                             f"{self.finished[name] * 1000:.0f}ms 时完成")
+        return lines
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 游戏的模块都在上一级目录，以脚本方式运行，没有打包
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -0,0 +1,129 @@
+"""
+生成关键词识别测试用的 WAV
+
+没有真人录音时，用共振峰合成器按每个关键词的发音（声母的爆破/摩擦噪声、韵母的共振峰轨迹、声调）
+合成语音：keywords/ 下是模板，utterances/ 下是换了音高、语速和音色的另一组说法以及几段非关键词。
+运行一次即可重新生成：python tests/fixtures/make_fixtures.py
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from voice import KEYWORDS, SAMPLE_RATE, write_wav  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 发音片段：('burst', 中心频率) 爆破，('noise', 时长, 中心频率) 送气/摩擦，('gap', 时长) 闭塞，
+# ('vowel', 时长, 共振峰轨迹 [(F1, F2, F3), ...], 声调 (起点音高比例, 终点音高比例))
+WORDS = {
+    '跳': [('burst', 4000), ('noise', 0.05, 4500),
+          ('vowel', 0.32, [(300, 2300, 3000), (800, 1300, 2600), (350, 700, 2400)], (1.3, 0.8))],
+    '蹲': [('burst', 3000),
+          ('vowel', 0.30, [(350, 700, 2400), (500, 1400, 2500), (280, 1700, 2600)], (1.2, 1.2))],
+    '开始': [('burst', 1500), ('noise', 0.06, 1800),
+            ('vowel', 0.20, [(800, 1300, 2500), (350, 2200, 2900)], (1.2, 1.2)),
+            ('noise', 0.12, 2800),
+            ('vowel', 0.16, [(400, 1600, 2300), (400, 1600, 2300)], (1.0, 0.85))],
+    '二段跳': [('vowel', 0.18, [(500, 1400, 1600), (450, 1300, 1550)], (1.3, 0.85)),
+            ('gap', 0.04), ('burst', 3000),
+            ('vowel', 0.20, [(350, 700, 2400), (750, 1200, 2500), (280, 1700, 2600)], (1.3, 0.8)),
+            ('gap', 0.04), ('burst', 4000), ('noise', 0.04, 4500),
+            ('vowel', 0.28, [(300, 2300, 3000), (800, 1300, 2600), (350, 700, 2400)], (1.3, 0.8))],
+    # 不是关键词的说法，应当被拒绝
+    '妈': [('vowel', 0.35, [(750, 1200, 2500), (750, 1200, 2500)], (1.0, 1.0))],
+    '吃饭': [('noise', 0.12, 3200), ('vowel', 0.15, [(300, 1800, 2500), (300, 1800, 2500)], (1.0, 1.0)),
+           ('noise', 0.08, 1200), ('vowel', 0.22, [(800, 1300, 2500), (550, 1600, 2500)], (1.3, 0.8))],
+}
+
+# (音高 Hz, 语速, 共振峰缩放)：模板和测试语句用不同的“说话人”
+TEMPLATE_SPEAKERS = [(120, 1.0, 1.0), (200, 0.9, 1.08), (150, 1.1, 0.96)]
+TEST_SPEAKERS = [(135, 0.95, 1.02), (180, 1.05, 1.05)]
+
+
+def resonate(signal, freq, bandwidth):
+    """二阶谐振器，freq 可以是逐样本的数组"""
+    freq = np.broadcast_to(freq, signal.shape)
+    r = np.exp(-np.pi * bandwidth / SAMPLE_RATE)
+    a1 = 2 * r * np.cos(2 * np.pi * freq / SAMPLE_RATE)
+    a2 = -r * r
+    gain = 1 - r
+    out = np.zeros_like(signal)
+    y1 = y2 = 0.0
+    for i, x in enumerate(signal):
+        y = gain * x + a1[i] * y1 + a2 * y2
+        out[i] = y
+        y1, y2 = y, y1
+    return out
+
+
+def envelope(n, attack=0.01):
+    edge = min(int(attack * SAMPLE_RATE), n // 2)
+    env = np.ones(n)
+    if edge:
+        env[:edge] = np.linspace(0, 1, edge)
+        env[-edge:] = np.linspace(1, 0, edge)
+    return env
+
+
+def vowel(duration, track, tone, pitch, scale, rng):
+    n = int(duration * SAMPLE_RATE)
+    t = np.linspace(0, 1, n)
+    f0 = pitch * np.interp(t, [0, 1], tone) * (1 + 0.01 * rng.standard_normal())
+    phase = np.cumsum(f0 / SAMPLE_RATE)
+    source = (np.diff(np.floor(phase), prepend=0) > 0).astype(float)  # 声门脉冲串
+    source += 0.02 * rng.standard_normal(n)
+    points = np.linspace(0, 1, len(track))
+    out = np.zeros(n)
+    for k, bandwidth in enumerate((80, 100, 150)):
+        freq = np.interp(t, points, [formants[k] for formants in track]) * scale
+        out += resonate(source, freq, bandwidth) / (k + 1)
+    return out * envelope(n, 0.02)
+
+
+def noise(duration, center, scale, rng):
+    n = int(duration * SAMPLE_RATE)
+    return resonate(rng.standard_normal(n), center * scale, 1500) * 0.6 * envelope(n)
+
+
+def synthesize(word, speaker, seed):
+    """合成一遍 word，返回 [-1, 1] 的浮点样本"""
+    pitch, rate, scale = speaker
+    rng = np.random.default_rng(seed)
+    parts = []
+    for segment in WORDS[word]:
+        kind = segment[0]
+        if kind == 'burst':
+            parts.append(noise(0.015, segment[1], scale, rng) * 2)
+        elif kind == 'noise':
+            parts.append(noise(segment[1] * rate, segment[2], scale, rng))
+        elif kind == 'gap':
+            parts.append(np.zeros(int(segment[1] * rate * SAMPLE_RATE)))
+        else:
+            parts.append(vowel(segment[1] * rate, segment[2], segment[3], pitch, scale, rng))
+    samples = np.concatenate(parts)
+    samples = samples / np.abs(samples).max() * 0.5
+    return samples + rng.normal(0, 0.001, len(samples))  # 录音总有底噪，闭塞段不是数字静音
+
+
+def to_pcm(samples):
+    return (np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes()
+
+
+def main():
+    for sub in ('keywords', 'utterances'):
+        os.makedirs(os.path.join(HERE, sub), exist_ok=True)
+    for seed, word in enumerate(WORDS):
+        speakers = TEMPLATE_SPEAKERS if word in KEYWORDS else []
+        for i, speaker in enumerate(speakers):
+            write_wav(os.path.join(HERE, 'keywords', f'{word}_{i + 1}.wav'),
+                      to_pcm(synthesize(word, speaker, seed * 10 + i)))
+        for i, speaker in enumerate(TEST_SPEAKERS):
+            write_wav(os.path.join(HERE, 'utterances', f'{word}_{i + 1}.wav'),
+                      to_pcm(synthesize(word, speaker, 1000 + seed * 10 + i)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+环形缓冲区按累计位置读取的测试
+"""
+import numpy as np
+
+from audio_buffer import AudioRingBuffer
+
+
+def test_read_before_first_wrap_starts_at_zero():
+    """还没写满时，从负的位置读取只返回已写入的样本，不会读到末尾未写过的部分"""
+    buffer = AudioRingBuffer(100)
+    buffer.write(np.arange(1, 31, dtype=np.float32))
+    assert buffer.oldest() == 0
+    np.testing.assert_array_equal(buffer.read(-20), np.arange(1, 31))
+    np.testing.assert_array_equal(buffer.read(-20, 10), np.arange(1, 11))
+    np.testing.assert_array_equal(buffer.latest(50), np.arange(1, 31))
+
+
+def test_read_skips_overwritten_samples():
+    buffer = AudioRingBuffer(100)
+    for i in range(5):
+        buffer.write(np.arange(i * 30, (i + 1) * 30, dtype=np.float32))
+    assert buffer.oldest() == 50
+    np.testing.assert_array_equal(buffer.read(0), np.arange(50, 150))
+    np.testing.assert_array_equal(buffer.read(120, 140), np.arange(120, 140))
+
+
+def test_read_into_preallocated_output():
+    buffer = AudioRingBuffer(64)
+    buffer.write(np.arange(100, dtype=np.float32))
+    out = np.empty(64, dtype=np.float32)
+    result = buffer.read(90, out=out)
+    assert result.base is out
+    np.testing.assert_array_equal(result, np.arange(90, 100))
@@ -0,0 +1,76 @@
+"""
+起音检测的测试：单个样本的咔哒声不触发，拍手和说话的开头触发
+"""
+import numpy as np
+import pytest
+
+from audio_features import OnsetDetector
+
+RATE = 44100
+CHUNK = 1024
+
+
+def run(detector, chunks):
+    """依次处理各块，返回检测到的起音所在的块序号"""
+    return [i for i, chunk in enumerate(chunks) if detector.process(chunk) is not None]
+
+
+def background(count, seed=0):
+    """微弱的底噪，先喂给检测器让噪声底和通量统计稳定下来"""
+    rng = np.random.default_rng(seed)
+    return [rng.normal(0, 0.003, CHUNK).astype(np.float32) for _ in range(count)]
+
+
+def clap(seed=1, offset=0):
+    """衰减很快的宽带噪声，从块内 offset 处开始，返回两块"""
+    rng = np.random.default_rng(seed)
+    n = np.arange(2 * CHUNK - offset)
+    burst = np.zeros(2 * CHUNK, np.float32)
+    burst[offset:] = rng.normal(0, 0.3, len(n)) * np.exp(-n / 200.0)
+    return [burst[:CHUNK], burst[CHUNK:]]
+
+
+def voice(count=8):
+    """带谐波的浊音，持续若干块"""
+    t = np.arange(count * CHUNK) / RATE
+    samples = 0.2 * np.sin(2 * np.pi * 150 * t) * (1 + 0.5 * np.sin(2 * np.pi * 450 * t))
+    samples *= np.minimum(1, t / 0.01)  # 10 ms 的起音
+    return list(samples.astype(np.float32).reshape(count, CHUNK))
+
+
+def with_noise(chunks, seed=2):
+    return [chunk + noise for chunk, noise in zip(chunks, background(len(chunks), seed))]
+
+
+@pytest.mark.parametrize('amplitude', [0.5, 0.9])
+@pytest.mark.parametrize('width', [1, 3])
+def test_click_is_rejected(amplitude, width):
+    detector = OnsetDetector(RATE)
+    run(detector, background(40))
+    click = background(1, seed=3)[0]
+    click[500:500 + width] += amplitude
+    assert run(detector, [click] + background(10, seed=4)) == []
+
+
+@pytest.mark.parametrize('offset', [0, 700, 1000])
+def test_clap_is_accepted(offset):
+    detector = OnsetDetector(RATE)
+    run(detector, background(40))
+    onsets = run(detector, with_noise(clap(offset=offset)) + background(10, seed=4))
+    assert len(onsets) == 1 and onsets[0] <= 1
+
+
+def test_voice_is_accepted():
+    detector = OnsetDetector(RATE)
+    run(detector, background(40))
+    assert run(detector, with_noise(voice()) + background(10, seed=4)) == [0]
+
+
+def test_click_does_not_mask_following_clap():
+    """咔哒声之后紧跟的拍手仍然能触发"""
+    detector = OnsetDetector(RATE)
+    run(detector, background(40))
+    click = background(1, seed=3)[0]
+    click[500] += 0.9
+    onsets = run(detector, [click] + with_noise(clap()) + background(10, seed=4))
+    assert len(onsets) == 1 and 1 <= onsets[0] <= 2
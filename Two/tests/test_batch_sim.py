@@ -0,0 +1,19 @@
+"""
+批量模拟与逐个运行的 Simulation 对比
+"""
+from batch_sim import BatchSimulation, check_parity
+from runner_core import FPS
+
+
+def test_parity_with_collisions():
+    mismatch, crashes = check_parity(envs=20, steps=30 * FPS, seed=0)
+    assert mismatch is None, mismatch
+    assert crashes > 0  # 碰撞和结束的规则也被对比到
+
+
+def test_idle_players_die():
+    batch = BatchSimulation(8, seed=0)
+    batch.start()
+    for _ in range(30 * FPS):
+        batch.step()
+    assert batch.game_over.all()
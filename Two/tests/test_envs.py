@@ -0,0 +1,81 @@
+"""
+训练环境的测试：复用同一个 Game 的 reset 与新建 Game 的结果一致
+"""
+import random
+
+import numpy as np
+import pygame
+import pytest
+
+from animation import Animation
+from envs import RunnerEnv, SoundRunnerEnv
+
+STEPS = 1500
+
+
+def episode(env, seed, steps=STEPS):
+    """用固定种子的随机动作跑一局，返回每步的 (特征, 奖励, terminated)"""
+    obs, info = env.reset(seed=seed)
+    actions = random.Random(seed)
+    history = [(obs.copy(), 0, False)]
+    for _ in range(steps):
+        action = 1 if actions.random() < 0.05 else 0
+        obs, reward, terminated, truncated, _ = env.step(action)
+        history.append((obs.copy(), reward, terminated))
+        if terminated or truncated:
+            break
+    return history
+
+
+def assert_same(a, b):
+    assert len(a) == len(b)
+    for (obs_a, reward_a, done_a), (obs_b, reward_b, done_b) in zip(a, b):
+        np.testing.assert_array_equal(obs_a, obs_b)
+        assert (reward_a, done_a) == (reward_b, done_b)
+
+
+@pytest.mark.parametrize('env_class', [RunnerEnv, SoundRunnerEnv])
+def test_reset_matches_new_game(env_class):
+    env = env_class('features')
+    first = episode(env, 1)
+    game = env.game or env.sim
+    episode(env, 2)
+    again = episode(env, 1)
+    assert (env.game or env.sim) is game  # 每局 reset 而不是新建
+    assert len(first) > 100 and sum(reward for _, reward, _ in first) > 0
+    assert_same(first, again)
+    assert_same(first, episode(env_class('features'), 1))
+
+
+def round_player(monkeypatch):
+    """把玩家换成圆形的图像，矩形的四角是透明的，逐像素和矩形碰撞的结果才会不同"""
+    import runner_game
+
+    image = pygame.Surface((50, 50), pygame.SRCALPHA)
+    pygame.draw.circle(image, (0, 0, 255), (25, 25), 18)
+    animation = Animation([image], 0.5, [image])
+    monkeypatch.setattr(runner_game, 'load_player_animations',
+                        lambda: {'run': animation, 'jump': animation, 'slide': animation})
+
+
+def test_features_and_pixels_share_collisions(monkeypatch):
+    """两种观测的奖励和结束时机相同：特征观测不绘制，但碰撞规则与完整游戏一样是逐像素的"""
+    round_player(monkeypatch)
+    features = RunnerEnv('features')
+    pixels = RunnerEnv('pixels')
+    features.reset(seed=3)
+    pixels.reset(seed=3)
+    assert features.sim.hit_test is not None
+    actions = random.Random(3)
+    deaths = 0
+    for _ in range(6000):
+        action = 1 if actions.random() < 0.03 else 0
+        a = features.step(action)[1:]
+        b = pixels.step(action)[1:]
+        assert a == b
+        if a[1] or a[2]:
+            deaths += a[1]
+            seed = actions.randrange(1000)
+            features.reset(seed=seed)
+            pixels.reset(seed=seed)
+    assert deaths > 0
@@ -0,0 +1,48 @@
+"""
+输入总线的测试：整批取出时按采集时间排序，窗口内重复的同一动作合并为一个
+"""
+from input_bus import COALESCE_WINDOW, InputBus
+
+
+def drained(bus):
+    bus.drain()
+    return [(event.action, event.captured_at, event.strength) for event in bus.due()]
+
+
+def test_repeats_within_window_are_coalesced():
+    bus = InputBus()
+    bus.post('jump', 'sound', 1.00, 0.3)
+    bus.post('jump', 'sound', 1.05, 0.8)  # 同一次拍手的回声：合并，强度取最大值
+    bus.post('slide', 'keyboard', 1.02)  # 不同动作不合并
+    bus.post('jump', 'voice', 1.00 + COALESCE_WINDOW + 0.05, 0.5)  # 窗口之外，单独保留
+    assert drained(bus) == [('jump', 1.00, 0.8), ('slide', 1.02, 1.0),
+                            ('jump', 1.00 + COALESCE_WINDOW + 0.05, 0.5)]
+    assert bus.coalesced == 1
+
+
+def test_events_are_sorted_by_capture_time():
+    bus = InputBus()
+    bus.post('jump', 'voice', 2.0)  # 识别较慢的语音命令后到达，但采集得更早的键盘输入排在前面
+    bus.post('slide', 'keyboard', 1.5)
+    assert [action for action, _, _ in drained(bus)] == ['slide', 'jump']
+
+
+def test_window_is_measured_from_kept_event():
+    """窗口从保留下来的事件算起，连续的重复不会把窗口一直向后延长"""
+    bus = InputBus(coalesce=0.1)
+    for t in (0.0, 0.06, 0.12, 0.18):
+        bus.post('jump', 'sound', t)
+    assert [t for _, t, _ in drained(bus)] == [0.0, 0.12]
+    assert bus.coalesced == 2
+
+
+def test_due_keeps_later_events_for_next_step():
+    bus = InputBus()
+    bus.post('jump', 'keyboard', 1.0)
+    bus.post('slide', 'keyboard', 1.5)
+    bus.drain()
+    assert [event.action for event in bus.due(1.2)] == ['jump']
+    # 留在批次里的事件也参与下一次合并
+    bus.post('slide', 'keyboard', 1.55)
+    assert drained(bus) == [('slide', 1.5, 1.0)]
+    assert bus.coalesced == 1
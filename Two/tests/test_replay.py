@@ -0,0 +1,72 @@
+"""
+录像的测试：录下一局再回放，步数和得分与录制时一致
+"""
+import os
+import random
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import runner_game  # noqa: E402
+import sound_runner  # noqa: E402
+from input_bus import InputEvent  # noqa: E402
+from replay import NullVoice, Replay, ReplayError, ReplayWriter  # noqa: E402
+
+
+def record_runner(path, seed, steps=3000):
+    runner_game.init_display(texture=False)
+    game = runner_game.Game(seed=seed, voice_controller=NullVoice())
+    game.recorder = ReplayWriter(path, 'runner_game', seed, 1.0 / 60)
+    actions = random.Random(seed)
+    for _ in range(steps):
+        if actions.random() < 0.03:
+            game.apply_input(InputEvent(actions.choice(['jump', 'slide', 'start', 'double_jump']), 'keyboard', None))
+        game.update(1.0 / 60)
+    game.recorder.close(game.ticks, game.score)
+    return game.ticks, game.score
+
+
+def record_sound(path, seed, steps=20000):
+    sound_runner.init_display()
+    game = sound_runner.Game(seed=seed)
+    game.recorder = ReplayWriter(path, 'sound_runner', seed, 1.0 / 60)
+    actions = random.Random(seed)
+    while not game.game_over and game.ticks < steps:
+        if actions.random() < 0.03:
+            game.apply_input(InputEvent('jump', 'sound', None, actions.uniform(0.3, 1.0)))
+        game.update()
+    game.recorder.close(game.ticks, game.score)
+    return game.ticks, game.score
+
+
+@pytest.mark.parametrize('module, record', [(runner_game, record_runner), (sound_runner, record_sound)])
+def test_replay_round_trip(tmp_path, module, record):
+    path = str(tmp_path / 'session.rpl')
+    recorded = record(path, 1234)
+    replay = Replay.load(path)
+    assert replay.seed == 1234 and replay.inputs
+    assert tuple(replay.end) == recorded
+    assert recorded[1] > 0
+    assert module.replay_session(replay) == recorded
+
+
+def test_truncated_replay_still_loads(tmp_path):
+    """录制中途退出时没有结束记录，写到一半的记录被忽略"""
+    path = str(tmp_path / 'session.rpl')
+    record_sound(path, 7)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:-20])
+    replay = Replay.load(path)
+    assert replay.end is None
+    assert replay.ticks == replay.inputs[-1][0]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not_a_replay.rpl'
+    path.write_bytes(b'RIFF' + bytes(40))
+    with pytest.raises(ReplayError):
+        Replay.load(str(path))
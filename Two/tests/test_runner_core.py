@@ -0,0 +1,56 @@
+"""
+无界面模拟核心的测试
+"""
+from runner_core import FPS, GROUND_Y, Simulation, auto_jump_policy
+
+
+def trace(seed, seconds=120):
+    """用自动玩家跑 seconds 秒，记录每一步的得分、玩家位置和所有实体的位置"""
+    sim = Simulation(seed=seed)
+    states = []
+    for _ in range(seconds * FPS):
+        auto_jump_policy(sim)
+        sim.step(1.0 / FPS)
+        states.append((sim.score, sim.game_over, sim.player.rect.topleft,
+                       tuple(body.rect.topleft for body in sim.obstacles),
+                       tuple(body.rect.topleft for body in sim.coins)))
+    return states
+
+
+def test_same_seed_reproduces_game():
+    first = trace(7)
+    assert first == trace(7)
+    assert first != trace(8)
+
+
+def test_obstacles_stand_on_the_ground():
+    sim = Simulation(seed=0)
+    sim.start()
+    for _ in range(10 * FPS):
+        if sim.obstacles:
+            break
+        sim.step(1.0 / FPS)
+    assert sim.obstacles
+    for body in sim.obstacles:
+        assert body.rect.bottom == GROUND_Y
+
+
+def test_player_who_never_jumps_dies():
+    sim = Simulation(seed=0)
+    sim.start()
+    steps = 0
+    while not sim.game_over and steps < 30 * FPS:
+        sim.step(1.0 / FPS)
+        steps += 1
+    assert sim.game_over
+    assert sim.events[-1][0] == 'crash'
+
+
+def test_jumping_avoids_obstacles():
+    never, jumping = Simulation(seed=1), Simulation(seed=1)
+    never.start()
+    jumping.start()
+    never.run(20)
+    jumping.run(20, policy=auto_jump_policy)
+    assert never.game_over
+    assert jumping.score > never.score
@@ -0,0 +1,62 @@
+"""
+生成计划的测试：公平性检查保证相邻障碍物之间来得及跳过，金币不受影响
+"""
+import random
+
+import pytest
+
+from spawner import SpawnScheduler, SpawnStream
+
+FPS = 60
+DISTANCE = 700  # 障碍物从出现到到达玩家的像素距离
+MIN_GAP = 0.9
+
+
+def scheduler(seed, min_gap=MIN_GAP):
+    """障碍物每 0.1 秒一个、速度各不相同，远比 min_gap 密；金币每 0.05 秒一个"""
+    def make_obstacle(rng, level):
+        return 'obstacle', None, rng.uniform(4, 16)
+
+    def make_coin(rng, level):
+        return 'coin', None, 8
+
+    return SpawnScheduler(random.Random(seed), [
+        SpawnStream(lambda rng, level: 0.1, make_obstacle, True),
+        SpawnStream(lambda rng, level: 0.05, make_coin, False),
+    ], min_gap=min_gap, distance=DISTANCE, fps=FPS)
+
+
+def run(spawner, seconds=60):
+    """按帧取出到时间的条目，返回全部条目"""
+    entries = []
+    for tick in range(seconds * FPS):
+        entries.extend(spawner.due((tick + 1) / FPS))
+    return entries
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_obstacles_arrive_at_least_min_gap_apart(seed):
+    spawner = scheduler(seed)
+    entries = run(spawner)
+    arrivals = sorted(spawner.arrival(entry.time, entry.speed) for entry in entries if entry.kind == 'obstacle')
+    assert len(arrivals) > 30 and spawner.delayed > 0
+    gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+    assert min(gaps) >= MIN_GAP - 1e-9  # 跨过生成块的边界也成立
+
+
+def test_coins_are_not_delayed():
+    entries = run(scheduler(0))
+    coins = [entry.time for entry in entries if entry.kind == 'coin']
+    assert len(coins) == pytest.approx(60 / 0.05, abs=1)
+    assert all(b - a == pytest.approx(0.05) for a, b in zip(coins, coins[1:]))
+
+
+def test_without_min_gap_nothing_is_delayed():
+    spawner = scheduler(0, min_gap=0)
+    entries = run(spawner, 10)
+    assert spawner.delayed == 0
+    assert sum(entry.kind == 'obstacle' for entry in entries) == pytest.approx(10 / 0.1, abs=1)
+
+
+def test_same_seed_same_schedule():
+    assert run(scheduler(3), 20) == run(scheduler(3), 20)
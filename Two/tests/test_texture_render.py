@@ -0,0 +1,62 @@
+"""
+纹理渲染后端与 Surface 后端画出的同一帧逐像素比较（SDL 软件渲染器，dummy 视频驱动）
+"""
+import os
+
+import numpy as np
+import pygame
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import runner_game  # noqa: E402
+from replay import NullVoice  # noqa: E402
+
+FRAMES = 150
+TOLERANCE = 8  # 半透明混合的舍入不同，每个通道允许的差值
+
+
+@pytest.fixture
+def restore_display():
+    yield
+    runner_game.init_display(texture=False)  # 关闭纹理渲染的窗口，恢复默认后端
+
+
+def render_frame(texture):
+    """
+    用固定的种子和输入推进 FRAMES 步，返回最后一帧的 RGB 像素
+    纹理后端在 present 之前从渲染器读回（present 之后后备缓冲区的内容是未定义的）
+    """
+    runner_game.init_display(texture=texture, software=True)
+    game = runner_game.Game(seed=5, voice_controller=NullVoice())
+    game.particles.rng = np.random.default_rng(0)
+    frame = {}
+    if texture:
+        renderer = runner_game.texture_renderer
+        present = renderer.end
+
+        def end():
+            frame['pixels'] = pygame.image.tobytes(renderer.renderer.to_surface(), 'RGB')
+            present()
+
+        renderer.end = end
+    game.start()
+    for i in range(FRAMES):
+        if i % 40 == 0:
+            game.jump()
+            game.particles.create_explosion(400, 300, 50)  # 粒子是半透明的，覆盖混合模式
+        game.update(1.0 / 60)
+        game.draw(0.5)
+    if not texture:
+        frame['pixels'] = pygame.image.tobytes(game.screen, 'RGB')
+    width, height = runner_game.SCREEN_WIDTH, runner_game.SCREEN_HEIGHT
+    return np.frombuffer(frame['pixels'], np.uint8).reshape(height, width, 3).astype(int)
+
+
+def test_backends_draw_the_same_frame(restore_display):
+    surface = render_frame(False)
+    texture = render_frame(True)
+    assert surface.shape == texture.shape
+    assert len(np.unique(surface.reshape(-1, 3), axis=0)) > 3  # 画面里确实有精灵和粒子
+    assert np.abs(surface - texture).max() <= TOLERANCE
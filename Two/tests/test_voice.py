@@ -0,0 +1,100 @@
+"""
+本地关键词识别的测试，WAV 由 fixtures/make_fixtures.py 合成
+"""
+import os
+import time
+
+import numpy as np
+import pytest
+
+import voice
+from voice import (SAMPLE_RATE, VAD_END_FRAMES, VAD_FRAME, EnergyVAD, KeywordSpotter, VoiceController,
+                   default_backend, read_wav)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+KEYWORDS = os.path.join(FIXTURES, 'keywords')
+THRESHOLD = 8.0  # 合成语音的关键词距离都在 7 以内，非关键词在 9 以上
+RECOGNITION_BUDGET = 0.050  # 端点之后识别一条命令的耗时目标（秒）
+# 从说完到游戏拿到命令的目标（秒）：端点检测的静音等待加上识别耗时
+COMMAND_BUDGET = (VAD_END_FRAMES + 1) * VAD_FRAME / SAMPLE_RATE + RECOGNITION_BUDGET
+
+
+def utterance(name):
+    return os.path.join(FIXTURES, 'utterances', name + '.wav')
+
+
+@pytest.fixture(scope='module')
+def spotter():
+    spotter = KeywordSpotter(THRESHOLD)
+    assert spotter.load_templates(KEYWORDS) == 12
+    return spotter
+
+
+@pytest.mark.parametrize('name, keyword', [
+    ('开始_1', '开始'), ('开始_2', '开始'),
+    ('跳_1', '跳'), ('跳_2', '跳'),
+    ('蹲_1', '蹲'), ('二段跳_1', '二段跳'),
+])
+def test_recognizes_keywords(spotter, name, keyword):
+    assert spotter.recognize_wav(utterance(name)) == keyword
+
+
+@pytest.mark.parametrize('name', ['妈_1', '妈_2', '吃饭_1', '吃饭_2'])
+def test_rejects_other_words(spotter, name):
+    assert spotter.recognize_wav(utterance(name)) is None
+
+
+def stream(name, lead=0.5, tail=0.5, seed=0):
+    """在语句前后加上微弱的底噪，返回 (PCM 样本, 语句结束的样本位置)"""
+    pcm, rate = read_wav(utterance(name))
+    assert rate == SAMPLE_RATE
+    speech = np.frombuffer(pcm, dtype=np.int16)
+    rng = np.random.default_rng(seed)
+    samples = np.concatenate([np.zeros(int(lead * SAMPLE_RATE), np.int16), speech,
+                              np.zeros(int(tail * SAMPLE_RATE), np.int16)])
+    samples = samples + rng.normal(0, 10, len(samples)).astype(np.int16)
+    return samples, int(lead * SAMPLE_RATE) + len(speech)
+
+
+@pytest.mark.parametrize('name, command', [
+    ('开始_1', 'start'), ('跳_2', 'jump'), ('蹲_2', 'slide'), ('二段跳_2', 'double_jump'),
+])
+def test_command_latency(spotter, name, command):
+    """说完之后，端点检测的等待加上识别耗时要在目标之内"""
+    controller = VoiceController(spotter)  # 不调用 start()，识别在 process_frame 里同步完成
+    samples, speech_end = stream(name)
+    recognized = None
+    compute = 0.0
+    for i in range(0, len(samples) - VAD_FRAME + 1, VAD_FRAME):
+        begin = time.perf_counter()
+        controller.process_frame(samples[i:i + VAD_FRAME], (i + VAD_FRAME) / SAMPLE_RATE)
+        elapsed = time.perf_counter() - begin
+        result = controller.get_next_command()
+        if result is not None:
+            recognized, compute = result, elapsed
+            break
+    assert recognized is not None and recognized.name == command
+    # ended_at 是触发端点的那一帧读完的时间（音频时间）
+    endpoint_wait = recognized.ended_at - speech_end / SAMPLE_RATE
+    assert 0 <= endpoint_wait <= (VAD_END_FRAMES + 1) * VAD_FRAME / SAMPLE_RATE
+    assert compute < RECOGNITION_BUDGET
+    assert endpoint_wait + compute < COMMAND_BUDGET
+
+
+def test_pause_between_syllables_does_not_end_utterance():
+    """音节之间 200 ms 的停顿不能把一条命令切成两段"""
+    vad = EnergyVAD()
+    frames = [1.0] * 10 + [100.0] * 10 + [1.0] * 10 + [100.0] * 10 + [1.0] * (VAD_END_FRAMES + 5)
+    events = [(i, event) for i, event in enumerate(map(vad.feed, frames)) if event is not None]
+    assert events == [(12, 'start'), (40 + VAD_END_FRAMES - 1, 'end')]
+
+
+def test_default_backend_warns_without_templates(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(voice, 'GoogleRecognizer', lambda: 'online')
+    assert default_backend(str(tmp_path)) == 'online'
+    assert '警告' in capsys.readouterr().out
+
+
+def test_default_backend_uses_templates(monkeypatch):
+    monkeypatch.setattr(voice, 'GoogleRecognizer', lambda: pytest.fail("不应使用在线识别"))
+    assert isinstance(default_backend(KEYWORDS), KeywordSpotter)
@@ -0,0 +1,114 @@
+"""
+基于 SDL2 纹理的渲染后端
+
+用 pygame._sdl2.video 的 Window/Renderer/Texture 代替在 display.set_mode 的 Surface 上软件 blit：
+每个 Surface（精灵帧、背景层、粒子印章、HUD 文字）第一次绘制时上传成纹理并缓存，之后每帧只提交
+绘制命令。Renderer 设置了逻辑分辨率，窗口可以是任意尺寸，画面整体缩放并保持比例。
+接口与 DirtyRenderer 相同，screen 属性还支持 Surface 的 blit/blits/fill，原有的绘制代码不用改动。
+可以指定 SDL 的软件渲染器，在没有 GPU 的机器（或 dummy 视频驱动）上也能运行和测试。
+"""
+import weakref
+
+import pygame
+from pygame._sdl2.video import Renderer, Texture, Window
+
+
+class TextureRenderer:
+    """
+    :param title: 窗口标题
+    :param logical_size: 游戏的逻辑分辨率
+    :param window_size: 窗口尺寸，为 None 时与逻辑分辨率相同
+    :param software: 使用 SDL 的软件渲染器
+    :param vsync: 是否等待垂直同步
+    """
+
+    def __init__(self, title, logical_size, window_size=None, software=False, vsync=False):
+        self.window = Window(title, size=window_size or logical_size, resizable=True)
+        self.renderer = Renderer(self.window, accelerated=0 if software else -1, vsync=vsync)
+        self.renderer.logical_size = logical_size
+        self.size = logical_size
+        self.textures = weakref.WeakKeyDictionary()  # Surface -> 纹理，Surface 被回收时纹理一起释放
+        self.uploads = 0  # 上传纹理的次数
+        self.clear()
+
+    @property
+    def screen(self):
+        """绘制目标：支持 Surface 的 blit/blits/fill，供背景、粒子等直接往屏幕上画的代码使用"""
+        return self
+
+    def texture(self, image):
+        """取得 image 对应的纹理，第一次使用时上传"""
+        texture = self.textures.get(image)
+        if texture is None:
+            texture = self.textures[image] = Texture.from_surface(self.renderer, image)
+            self.uploads += 1
+        return texture
+
+    def refresh(self, image):
+        """image 的内容变了（例如重新拼了文字），下次绘制时重新上传"""
+        self.textures.pop(image, None)
+
+    def clear(self, color=(0, 0, 0)):
+        self.renderer.draw_color = color
+        self.renderer.clear()
+
+    def begin(self, background=None, full=False):
+        """
+        开始一帧
+        :param background: 整屏背景，为 None 表示调用者已自行画好背景
+        :param full: 与 DirtyRenderer 兼容，每帧总是整屏重画
+        """
+        if background is not None:
+            self.blit(background, (0, 0))
+
+    def blit(self, image, pos, area=None):
+        """
+        绘制 image（Surface.blit 的参数形式）
+        :param pos: 左上角，可以是坐标或 Rect
+        :param area: 只画 image 的这一部分
+        :return: 绘制的区域
+        """
+        texture = self.texture(image)
+        if area is None:
+            rect = pygame.Rect(pos[0], pos[1], image.get_width(), image.get_height())
+            texture.draw(dstrect=rect)
+        else:
+            area = pygame.Rect(area)
+            rect = pygame.Rect(pos[0], pos[1], area.width, area.height)
+            texture.draw(srcrect=area, dstrect=rect)
+        return rect
+
+    def blits(self, sequence, doreturn=True):
+        """Surface.blits 的形式，元素为 (image, pos) 或 (image, pos, area)"""
+        rects = [self.blit(*item) for item in sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None):
+        self.renderer.draw_color = color
+        if rect is None:
+            self.renderer.fill_rect(pygame.Rect((0, 0), self.size))
+        else:
+            self.renderer.fill_rect(pygame.Rect(rect))
+
+    def add(self, rect):
+        """与 DirtyRenderer 兼容；每帧整屏重画，不需要记录区域"""
+
+    def invalidate(self):
+        """与 DirtyRenderer 兼容"""
+
+    def end(self):
+        """显示本帧，并清空后备缓冲区（窗口比例不同时的留边也保持黑色）"""
+        self.renderer.present()
+        self.clear()
+
+    def present_surface(self, surface):
+        """把整张 Surface 上传并显示，用于加载画面等仍在 Surface 上绘制的内容"""
+        self.refresh(surface)
+        self.blit(surface, (0, 0))
+        self.end()
+
+    def close(self):
+        """按纹理、渲染器、窗口的顺序释放"""
+        self.textures.clear()
+        self.renderer = None
+        self.window.destroy()
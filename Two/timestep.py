@@ -0,0 +1,60 @@
+"""
+固定步长的游戏循环工具
+
+渲染帧率和模拟步长解耦：每帧把经过的真实时间放进累加器，按固定步长执行若干次模拟，
+剩余不足一步的时间作为插值系数 alpha 交给绘制，用上一步和当前步的位置插值出画面位置。
+"""
+
+
+class FixedTimestep:
+    """
+    :param step: 每个模拟步的时长（秒）
+    :param max_steps: 单帧最多追赶的步数，防止慢机器上越追越慢
+    """
+
+    def __init__(self, step=1.0 / 60, max_steps=8):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.ticks = 0  # 累计执行过的模拟步数
+
+    def advance(self, frame_time):
+        """
+        放入一帧经过的真实时间
+        :param frame_time: 距上一帧的秒数
+        :return: 本帧应执行的模拟步数
+        """
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            # 超出追赶上限的时间直接丢弃，只保留不足一步的余数
+            steps = self.max_steps
+            self.accumulator %= self.step
+        else:
+            self.accumulator -= steps * self.step
+        self.ticks += steps
+        return steps
+
+    def tick_times(self, now, steps):
+        """
+        估计本帧各模拟步对应的真实结束时间
+        :param now: 本帧的当前时间（与输入事件的时间戳同一时钟）
+        :param steps: advance() 返回的步数
+        :return: 按先后顺序的 steps 个时间
+        """
+        behind = self.accumulator  # 最后一步结束之后还没模拟的时间
+        return [now - behind - (steps - 1 - i) * self.step for i in range(steps)]
+
+    @property
+    def alpha(self):
+        """当前帧位于两个模拟步之间的位置，范围 [0, 1)"""
+        return self.accumulator / self.step
+
+    def reset(self):
+        self.accumulator = 0.0
+
+
+def lerp_pos(prev, current, alpha):
+    """在上一步和当前步的坐标之间插值，返回整数坐标"""
+    return (round(prev[0] + (current[0] - prev[0]) * alpha),
+            round(prev[1] + (current[1] - prev[1]) * alpha))
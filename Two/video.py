@@ -0,0 +1,178 @@
+"""
+后台解码的视频播放
+
+解码线程用 OpenCV 读取视频，把每帧缩放并转换成 RGB 后写进预先分配好的帧缓冲区，
+再放进有界的预取队列；主线程按视频自身的帧率取出帧显示。每个缓冲区在创建时就用
+pygame.image.frombuffer 包装成共享同一块内存的 Surface，显示时直接 blit，不再复制或新建 Surface。
+显示完的缓冲区归还给解码线程复用。主线程只在等待下一帧时短暂阻塞，随时可以按 Enter 跳过。
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+import pygame
+
+PREFETCH = 8  # 预取队列最多缓存的帧数
+DEFAULT_FPS = 30.0  # 视频没有记录帧率时使用
+
+
+class VideoPlayer:
+    """
+    :param path: 视频文件路径
+    :param size: 显示尺寸 (宽, 高)
+    :param prefetch: 预取的帧数
+    """
+
+    def __init__(self, path, size, prefetch=PREFETCH):
+        self.path = path
+        self.size = size
+        self.prefetch = prefetch
+        width, height = size
+        # 帧缓冲区和对应的共享内存 Surface，数量比预取队列多两个：一个正在显示，一个正在解码
+        self.buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(prefetch + 2)]
+        self.surfaces = [pygame.image.frombuffer(buffer, size, 'RGB') for buffer in self.buffers]
+        self.free = queue.Queue()
+        for i in range(len(self.buffers)):
+            self.free.put(i)
+        self.ready = queue.Queue(maxsize=prefetch)  # 已解码的缓冲区序号，None 表示结束
+        self.stopping = threading.Event()
+        self.thread = None
+        self.capture = None
+        self.fps = DEFAULT_FPS
+        self.decoded = 0
+        self.shown = 0
+        self.dropped = 0  # 落后于播放时间而跳过显示的帧数
+
+    def open(self):
+        """打开视频并开始后台解码，无法打开时返回 False"""
+        import cv2  # 只在播放视频时才导入
+
+        self.capture = cv2.VideoCapture(self.path)
+        if not self.capture.isOpened():
+            self.capture.release()
+            return False
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        if fps and fps > 0:
+            self.fps = fps
+        self.thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def _decode_loop(self):
+        import cv2
+
+        capture = self.capture
+        raw = None  # 复用的解码输出
+        scaled = np.empty_like(self.buffers[0])  # 复用的缩放输出（BGR）
+        try:
+            while not self.stopping.is_set():
+                ok, raw = capture.read(raw)
+                if not ok:
+                    break
+                index = self._take_free()
+                if index is None:
+                    break
+                buffer = self.buffers[index]
+                if raw.shape[:2] == scaled.shape[:2]:
+                    cv2.cvtColor(raw, cv2.COLOR_BGR2RGB, dst=buffer)
+                else:
+                    cv2.resize(raw, self.size, dst=scaled)
+                    cv2.cvtColor(scaled, cv2.COLOR_BGR2RGB, dst=buffer)
+                self.decoded += 1
+                if not self._put_ready(index):
+                    break
+        except cv2.error as e:
+            print(f"解码视频帧时出错: {e}")
+        finally:
+            capture.release()
+            self._put_ready(None)
+
+    def _take_free(self):
+        """等待一个空闲缓冲区，停止时返回 None"""
+        while not self.stopping.is_set():
+            try:
+                return self.free.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        return None
+
+    def _put_ready(self, index):
+        while not self.stopping.is_set():
+            try:
+                self.ready.put(index, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def frames(self):
+        """
+        按视频帧率依次返回应显示的 Surface（和缓冲区共享内存，下一次迭代后会被覆盖）
+        落后于播放时间时跳过过期的帧；等待期间每隔一小段时间返回 None，便于调用方处理事件
+        """
+        interval = 1.0 / self.fps
+        start = time.perf_counter()
+        frame = 0
+        current = None  # 正在显示的缓冲区
+        try:
+            while True:
+                try:
+                    index = self.ready.get(timeout=interval / 4)
+                except queue.Empty:
+                    yield None
+                    continue
+                if index is None:
+                    return
+                due = start + frame * interval
+                frame += 1
+                now = time.perf_counter()
+                if now - due > interval and not self.ready.empty():
+                    # 已经晚了一帧以上，而且下一帧已经解码好，直接跳过这一帧
+                    self.free.put(index)
+                    self.dropped += 1
+                    continue
+                while now < due:
+                    time.sleep(min(due - now, interval / 4))
+                    now = time.perf_counter()
+                    if now < due:
+                        yield None
+                if current is not None:
+                    self.free.put(current)
+                current = index
+                self.shown += 1
+                yield self.surfaces[index]
+        finally:
+            if current is not None:
+                self.free.put(current)
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def play(self, screen, skip_key=pygame.K_RETURN):
+        """
+        在 screen 上播放，直到播放完毕、按下 skip_key 或关闭窗口
+        :return: 'finished'、'skipped' 或 'quit'
+        """
+        if not self.open():
+            print(f"无法打开视频文件: {self.path}")
+            return 'finished'
+        result = 'finished'
+        try:
+            for surface in self.frames():
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        result = 'quit'
+                    elif event.type == pygame.KEYDOWN and event.key == skip_key:
+                        result = 'skipped'
+                if result != 'finished':
+                    break
+                if surface is not None:
+                    screen.blit(surface, (0, 0))
+                    pygame.display.flip()
+        finally:
+            self.stop()
+        return result
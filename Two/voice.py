@@ -0,0 +1,477 @@
+"""
+语音控制
+
+VoiceController 在后台线程里流式采集麦克风，用 VAD 切分语句后交给识别线程池，
+把识别出的文本转换成带时间戳的游戏命令（VoiceCommand）放进队列。
+识别后端可以替换：
+- KeywordSpotter：本地关键词识别，不需要网络，只识别游戏用到的少量关键词
+- GoogleRecognizer：原来的在线识别（recognize_google）
+
+本地关键词识别使用 MFCC 特征加动态时间规整（DTW）与录好的模板比对。
+模板是放在 KEYWORD_DIR 下的 WAV 文件，文件名为 “关键词_序号.wav”，例如 跳_1.wav、开始_2.wav，
+可以用 `python voice.py --record 跳` 对着麦克风录制。
+"""
+import os
+import queue
+import threading
+import time
+import wave
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from audio_buffer import AudioRingBuffer
+
+SAMPLE_RATE = 16000  # 识别使用的采样率
+KEYWORD_DIR = os.path.join('assets', 'keywords')  # 关键词模板目录
+KEYWORDS = ('跳', '蹲', '开始', '二段跳')
+
+# MFCC 参数
+FRAME_LENGTH = 400  # 25 ms
+FRAME_HOP = 160  # 10 ms
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+
+# 语音端点检测（VAD）参数
+VAD_FRAME = 320  # 每帧 20 ms
+VAD_RATIO = 3.0  # 能量超过噪声底多少倍算有声
+VAD_MIN_FLOOR = 1e-4  # 噪声底下限，防止数字静音时噪声底为 0
+VAD_START_FRAMES = 3  # 连续 60 ms 有声才算语音开始
+# 静音 240 ms 才结束语句：多音节命令的音节之间、塞音的闭塞段常有 100~200 ms 的停顿，
+# 等待太短会把“二段跳”切成几段；命令在端点之后才识别，这段等待直接计入命令延迟
+VAD_END_FRAMES = 12
+VAD_PREROLL_FRAMES = 10  # 语句向前多取 200 ms
+VAD_MAX_FRAMES = 100  # 语句最长 2 秒
+RECOGNIZER_WORKERS = 2
+
+# 识别出的命令，时间均为 time.perf_counter()：语音开始、语音结束、识别完成
+VoiceCommand = namedtuple('VoiceCommand', ['name', 'text', 'captured_at', 'ended_at', 'recognized_at'])
+
+
+class Recognizer:
+    """识别后端接口：把一段 16 位单声道 PCM 转成文本，无法识别时返回 None"""
+
+    def recognize(self, pcm, sample_rate):
+        raise NotImplementedError
+
+
+class GoogleRecognizer(Recognizer):
+    """在线识别，需要网络"""
+
+    def __init__(self, language='zh-CN'):
+        import speech_recognition as sr  # 只在使用在线识别时才导入
+
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, pcm, sample_rate):
+        import speech_recognition as sr
+
+        audio = sr.AudioData(pcm, sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            print(f"无法连接到Google语音识别服务: {e}")
+            return None
+
+
+def read_wav(path):
+    """
+    读取 WAV 文件
+    :return: (16 位单声道 PCM 字节, 采样率)
+    """
+    with wave.open(path, 'rb') as f:
+        channels = f.getnchannels()
+        width = f.getsampwidth()
+        rate = f.getframerate()
+        data = f.readframes(f.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: 只支持 16 位 WAV")
+    samples = np.frombuffer(data, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples.tobytes(), rate
+
+
+def write_wav(path, pcm, sample_rate=SAMPLE_RATE):
+    """保存 16 位单声道 PCM 为 WAV 文件"""
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm)
+
+
+def _mel_filterbank(sample_rate):
+    def hz_to_mel(hz):
+        return 2595 * np.log10(1 + hz / 700)
+
+    def mel_to_hz(mel):
+        return 700 * (10 ** (mel / 2595) - 1)
+
+    mels = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), N_MELS + 2)
+    bins = np.floor((N_FFT + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+    bank = np.zeros((N_MELS, N_FFT // 2 + 1))
+    for i in range(N_MELS):
+        left, center, right = bins[i], bins[i + 1], bins[i + 2]
+        if center > left:
+            bank[i, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[i, center:right] = (right - np.arange(center, right)) / (right - center)
+    return bank
+
+
+_FILTERBANK = _mel_filterbank(SAMPLE_RATE)
+_WINDOW = np.hamming(FRAME_LENGTH)
+_DCT = np.cos(np.pi / N_MELS * (np.arange(N_MELS) + 0.5)[None, :] * np.arange(N_MFCC)[:, None])
+
+
+def to_samples(pcm, sample_rate):
+    """16 位 PCM 转为 SAMPLE_RATE 采样率的浮点数组"""
+    samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768
+    if sample_rate != SAMPLE_RATE and len(samples):
+        n = int(len(samples) * SAMPLE_RATE / sample_rate)
+        samples = np.interp(np.linspace(0, len(samples) - 1, n), np.arange(len(samples)), samples)
+    return samples
+
+
+def trim_silence(samples, ratio=0.1):
+    """去掉首尾能量低于最大帧能量 ratio 倍的部分"""
+    n = len(samples) // FRAME_HOP
+    if n == 0:
+        return samples
+    energy = np.sqrt(np.mean(samples[:n * FRAME_HOP].reshape(n, FRAME_HOP) ** 2, axis=1))
+    voiced = np.nonzero(energy > energy.max() * ratio)[0]
+    if len(voiced) == 0:
+        return samples[:0]
+    return samples[voiced[0] * FRAME_HOP:(voiced[-1] + 1) * FRAME_HOP]
+
+
+def mfcc(samples):
+    """计算 MFCC 特征（已做倒谱均值归一化），形状为 (帧数, N_MFCC)"""
+    if len(samples) < FRAME_LENGTH:
+        samples = np.pad(samples, (0, FRAME_LENGTH - len(samples)))
+    emphasized = np.append(samples[0], samples[1:] - 0.97 * samples[:-1])
+    n = 1 + (len(emphasized) - FRAME_LENGTH) // FRAME_HOP
+    idx = np.arange(FRAME_LENGTH)[None, :] + FRAME_HOP * np.arange(n)[:, None]
+    frames = emphasized[idx] * _WINDOW
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    log_mel = np.log(power @ _FILTERBANK.T + 1e-10)
+    features = log_mel @ _DCT.T
+    return features - features.mean(axis=0)
+
+
+def dtw_distance(a, b):
+    """
+    带斜率约束的 DTW 距离（按路径长度归一化）
+    每一步只依赖前两行，因此可以按行向量化；两段长度相差超过一倍时返回无穷大
+    """
+    n, m = len(a), len(b)
+    if n > 2 * m or m > 2 * n:
+        return np.inf
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+    D = np.full((n, m), np.inf)
+    D[0, 0] = cost[0, 0]
+    for i in range(1, n):
+        c = cost[i]
+        best = np.full(m, np.inf)
+        best[1:] = D[i - 1, :-1]  # (i-1, j-1)
+        if m > 2:
+            best[2:] = np.minimum(best[2:], D[i - 1, :-2] + c[1:-1])  # (i-1, j-2)
+        if i >= 2:
+            best[1:] = np.minimum(best[1:], D[i - 2, :-1] + cost[i - 1, 1:])  # (i-2, j-1)
+        D[i] = c + best
+    return D[-1, -1] / (n + m)
+
+
+class KeywordSpotter(Recognizer):
+    """
+    本地关键词识别：与每个关键词的录音模板做 DTW 比对，取距离最小者
+    :param threshold: 最小距离超过该值时视为无法识别
+    """
+
+    def __init__(self, threshold=15.0):
+        self.threshold = threshold
+        self.templates = []  # (关键词, MFCC 特征)
+
+    def enroll(self, keyword, pcm, sample_rate):
+        """添加一个关键词模板"""
+        features = mfcc(trim_silence(to_samples(pcm, sample_rate)))
+        self.templates.append((keyword, features))
+
+    def load_templates(self, directory=KEYWORD_DIR):
+        """
+        从目录加载模板，文件名为 “关键词_序号.wav”
+        :return: 加载的模板数量
+        """
+        count = 0
+        if not os.path.isdir(directory):
+            return count
+        for name in sorted(os.listdir(directory)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() != '.wav':
+                continue
+            keyword = stem.rsplit('_', 1)[0]
+            self.enroll(keyword, *read_wav(os.path.join(directory, name)))
+            count += 1
+        return count
+
+    def score(self, pcm, sample_rate):
+        """
+        :return: (最接近的关键词, 距离)，没有模板或没有声音时返回 (None, inf)
+        """
+        samples = trim_silence(to_samples(pcm, sample_rate))
+        if len(samples) == 0 or not self.templates:
+            return None, np.inf
+        features = mfcc(samples)
+        best_keyword, best_distance = None, np.inf
+        for keyword, template in self.templates:
+            distance = dtw_distance(features, template)
+            if distance < best_distance:
+                best_keyword, best_distance = keyword, distance
+        return best_keyword, best_distance
+
+    def recognize(self, pcm, sample_rate):
+        keyword, distance = self.score(pcm, sample_rate)
+        if distance > self.threshold:
+            return None
+        return keyword
+
+    def recognize_wav(self, path):
+        return self.recognize(*read_wav(path))
+
+
+class TemplateRecorder(Recognizer):
+    """
+    录制模板用的后端：把 VAD 切出的每段语音保存为 “关键词_序号.wav”
+    :param keyword: 录制的关键词
+    :param directory: 模板目录
+    """
+
+    def __init__(self, keyword, directory=KEYWORD_DIR):
+        self.keyword = keyword
+        self.directory = directory
+        self.saved = []  # 已保存的文件路径
+        os.makedirs(directory, exist_ok=True)
+
+    def recognize(self, pcm, sample_rate):
+        index = 1
+        while os.path.exists(os.path.join(self.directory, f"{self.keyword}_{index}.wav")):
+            index += 1
+        path = os.path.join(self.directory, f"{self.keyword}_{index}.wav")
+        write_wav(path, pcm, sample_rate)
+        self.saved.append(path)
+        print(f"已保存 {path}")
+        return self.keyword
+
+
+def default_backend(directory=KEYWORD_DIR):
+    """有关键词模板时使用本地识别，否则给出警告并退回在线识别"""
+    spotter = KeywordSpotter()
+    if spotter.load_templates(directory):
+        return spotter
+    print(f"警告: {directory} 下没有关键词模板，语音命令将使用需要网络的在线识别。"
+          f"可以用 python voice.py --record 跳 录制模板")
+    return GoogleRecognizer()
+
+
+class EnergyVAD:
+    """
+    基于能量的语音端点检测，非语音段持续更新噪声底
+    feed(energy) 每帧调用一次，语音开始时返回 'start'，结束时返回 'end'，其余返回 None
+    """
+
+    def __init__(self, ratio=VAD_RATIO, start_frames=VAD_START_FRAMES,
+                 end_frames=VAD_END_FRAMES, max_frames=VAD_MAX_FRAMES):
+        self.ratio = ratio
+        self.start_frames = start_frames
+        self.end_frames = end_frames
+        self.max_frames = max_frames
+        self.noise_floor = None
+        self.in_speech = False
+        self.loud = 0  # 连续有声帧数
+        self.quiet = 0  # 语音中连续静音帧数
+        self.length = 0  # 当前语音段帧数
+
+    def feed(self, energy):
+        if self.noise_floor is None:
+            self.noise_floor = max(energy, VAD_MIN_FLOOR)
+            return None
+        loud = energy > self.noise_floor * self.ratio
+        if not self.in_speech:
+            if loud:
+                self.loud += 1
+                if self.loud >= self.start_frames:
+                    self.in_speech = True
+                    self.length = self.loud
+                    self.quiet = 0
+                    return 'start'
+            else:
+                self.loud = 0
+                self.noise_floor = max(0.95 * self.noise_floor + 0.05 * energy, VAD_MIN_FLOOR)
+            return None
+
+        self.length += 1
+        self.quiet = 0 if loud else self.quiet + 1
+        # 静音持续一小段或达到最长时长就提前结束，不必等固定的超时
+        if self.quiet >= self.end_frames or self.length >= self.max_frames:
+            self.in_speech = False
+            self.loud = 0
+            return 'end'
+        return None
+
+
+class VoiceController:
+    """
+    流式语音控制：采集线程按固定帧长读取麦克风写入环形缓冲区，用 VAD 切分语句，
+    切好的语句交给识别线程池处理，采集不会因为识别而中断。
+    :param backend: 识别后端（Recognizer），为 None 时由 default_backend() 选择
+    :param workers: 识别线程数
+    """
+
+    def __init__(self, backend=None, workers=RECOGNIZER_WORKERS):
+        self.backend = backend if backend is not None else default_backend()
+        self.workers = workers
+        self.command_queue = queue.Queue()
+        self.buffer = AudioRingBuffer(SAMPLE_RATE * 10, dtype=np.int16)
+        self.vad = EnergyVAD()
+        self.executor = None
+        self.running = True
+        self.thread = None
+        self.segment_start = 0  # 当前语句在缓冲区中的起始位置
+        self.captured_at = 0.0  # 当前语句开始的时间
+
+    def start(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='recognizer')
+        self.thread = threading.Thread(target=self._capture_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+        if self.executor:
+            self.executor.shutdown(wait=False)
+
+    def _capture_loop(self):
+        import speech_recognition as sr
+
+        with sr.Microphone(sample_rate=SAMPLE_RATE, chunk_size=VAD_FRAME) as source:
+            print("麦克风已就绪！")
+            while self.running:
+                try:
+                    data = source.stream.read(VAD_FRAME)
+                    self.process_frame(np.frombuffer(data, dtype=np.int16), time.perf_counter())
+                except Exception as e:
+                    print(f"语音识别错误: {e}")
+                    time.sleep(0.5)  # 增加错误后的等待时间
+
+    def process_frame(self, frame, now):
+        """
+        处理一帧采集到的音频
+        :param frame: int16 样本，长度为 VAD_FRAME
+        :param now: 这一帧读取完成的时间（time.perf_counter）
+        """
+        self.buffer.write(frame)
+        energy = float(np.sqrt(np.mean((frame / 32768.0) ** 2)))
+        event = self.vad.feed(energy)
+        if event == 'start':
+            # 向前多取一小段，保留起音
+            frames_back = self.vad.start_frames + VAD_PREROLL_FRAMES
+            self.segment_start = self.buffer.written - frames_back * VAD_FRAME
+            self.captured_at = now - self.vad.start_frames * VAD_FRAME / SAMPLE_RATE
+        elif event == 'end':
+            pcm = self.buffer.read(self.segment_start).tobytes()
+            if self.executor is not None:
+                self.executor.submit(self._recognize, pcm, self.captured_at, now)
+            else:
+                self._recognize(pcm, self.captured_at, now)
+
+    def feed_pcm(self, pcm):
+        """按帧送入一段 16 位 PCM（SAMPLE_RATE 采样率），用于离线测试录好的 WAV"""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        for i in range(0, len(samples) - VAD_FRAME + 1, VAD_FRAME):
+            self.process_frame(samples[i:i + VAD_FRAME], time.perf_counter())
+
+    def _recognize(self, pcm, captured_at, ended_at):
+        try:
+            text = self.backend.recognize(pcm, SAMPLE_RATE)
+        except Exception as e:
+            print(f"语音识别错误: {e}")
+            return
+        if text:
+            print(f"识别到: {text}")
+            self._process_command(text, captured_at, ended_at, time.perf_counter())
+        else:
+            print("无法识别语音")
+
+    def _process_command(self, text, captured_at=None, ended_at=None, recognized_at=None):
+        # “二段跳”也包含“跳”，需要先判断
+        if "二段跳" in text:
+            name = "double_jump"
+        elif "跳" in text:
+            name = "jump"
+        elif "蹲" in text:
+            name = "slide"
+        elif "开始" in text:
+            name = "start"
+        else:
+            return
+        self.command_queue.put(VoiceCommand(name, text, captured_at, ended_at, recognized_at))
+
+    def get_next_command(self):
+        try:
+            return self.command_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+def record_templates(keyword, takes=3, directory=KEYWORD_DIR):
+    """
+    对着麦克风把关键词说 takes 遍，每遍保存为一个模板
+    :return: 保存的文件路径列表
+    """
+    recorder = TemplateRecorder(keyword, directory)
+    controller = VoiceController(recorder, workers=1)
+    controller.start()
+    print(f"请说“{keyword}” {takes} 遍，每遍之间停顿一下")
+    try:
+        while len(recorder.saved) < takes:
+            time.sleep(0.1)
+    finally:
+        controller.stop()
+    return recorder.saved
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="用录好的 WAV 测试本地关键词识别，或录制关键词模板")
+    parser.add_argument('wavs', nargs='*', help="待识别的 WAV 文件")
+    parser.add_argument('--templates', default=KEYWORD_DIR, help="关键词模板目录")
+    parser.add_argument('--record', metavar='KEYWORD', help="录制这个关键词的模板")
+    parser.add_argument('--takes', type=int, default=3, help="录制的遍数")
+    args = parser.parse_args()
+
+    if args.record:
+        record_templates(args.record, args.takes, args.templates)
+        return
+
+    spotter = KeywordSpotter()
+    print(f"加载了 {spotter.load_templates(args.templates)} 个模板")
+    for path in args.wavs:
+        pcm, rate = read_wav(path)
+        start = time.perf_counter()
+        keyword, distance = spotter.score(pcm, rate)
+        elapsed = (time.perf_counter() - start) * 1000
+        result = keyword if distance <= spotter.threshold else None
+        print(f"{path}: {result}（距离 {distance:.2f}，耗时 {elapsed:.1f} ms）")
+
+
+if __name__ == '__main__':
+    main()